@@ -0,0 +1,243 @@
+"""
+Benchmark suite for the card engine hot paths.
+
+Times each hot path of ers.engine on fixed seeds and deals, so two runs on the same machine measure the same work:
+    add_card_to_pile: a pile growing from empty to 4, 52 and 416 cards, per card added.
+    draw_card: a 52 card hand played onto the pile and captured back, per card drawn.
+    is_valid_slap: a slap check on a 3 and a 52 card pile, with the default rules and with every rule.
+    shuffle_deck: one Fisher-Yates shuffle of a 52 and a 416 card shoe.
+    deal: dealing a shuffled deck to 2 players and setting up the GameState.
+    do_face_card: an Ace's chain of 4 number cards and the capture that ends it.
+    game: complete seeded games with the scalar and the batch engine, per game.
+
+Results are written as JSON with the Python, NumPy, platform and git commit they were measured on. A saved run can
+be compared with a new one, or two saved runs with each other, and the compare fails when any benchmark got slower
+by more than the threshold. Times on a busy machine vary by 20% or more from run to run, so the default threshold
+is 25% and, comparing against a new run, a benchmark that looks slower is run again and keeps its best time before
+it counts as a regression. Nothing here imports the interactive game or the keyboard library.
+
+Run with: python benchmarks/bench_engine.py [--output results.json] [--compare baseline.json [current.json]]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from ers.batch import BatchGame, decks_from_seeds
+from ers.cards import encode
+from ers.engine import GameState, Pile, Player, Rules, build_deck, deal_cards, seeded_deck, shuffle_deck
+from ers.slaps import SLAP_RULES
+
+# seeds of the games timed for games per second
+GAME_SEEDS = range(200)
+BATCH_SEEDS = range(2000)
+
+# number cards with no two alike, so no slap and no penalty in a chain
+NUMBER_CARDS = [encode(value, suit) for value, suit in zip(("2", "3", "4", "5", "6", "7", "8", "9"), "♦♥♣♠♦♥♣♠")]
+
+# returns a function adding size cards to an empty pile and the number of cards it adds
+def bench_add_card(size):
+    cards = (build_deck() * (size // 52 + 1))[:size]
+    pile = Pile([])
+    add = pile.add_card_to_pile
+
+    def run():
+        for card in cards:
+            add(card)
+        pile.pile.clear()
+    return run, size
+
+# returns a function playing a whole hand onto the pile and capturing it back, and the number of cards drawn
+def bench_draw_card():
+    player = Player(1, seeded_deck(0))
+    pile = Pile([])
+
+    def run():
+        draw = player.draw_card
+        for _ in range(52):
+            draw(pile)
+        player.hand.extend(pile.pile)
+        pile.pile.clear()
+    return run, 52
+
+# returns a function checking a pile of the given size for a slap
+def bench_slap(size, rules):
+    pile = Pile(seeded_deck(1)[:size], rules.slaps)
+    return pile.is_valid_slap, 1
+
+# returns a function shuffling a shoe of the given number of decks
+def bench_shuffle(decks):
+    deck = build_deck(decks)
+    rng = random.Random(0)
+    return (lambda: shuffle_deck(deck, rng)), 1
+
+# returns a function dealing a fixed deck into a new game
+def bench_deal():
+    deck = seeded_deck(0)
+    return (lambda: (deal_cards(deck, 2), GameState(deck=deck))), 1
+
+# returns a function playing one Ace's chain of 4 number cards, the two players taking turns to pay
+def bench_face_card():
+    game = GameState(deck=NUMBER_CARDS * 2)
+    first, second = game.players
+
+    def run():
+        # the first player pays and the second captures, then the other way around, so the hands never run out
+        game.do_face_card(second, 4)
+        game.do_face_card(first, 4)
+    return run, 2
+
+# returns a function playing the seeded games with the scalar engine
+def bench_scalar_games():
+    decks = [seeded_deck(seed) for seed in GAME_SEEDS]
+    return (lambda: [GameState(deck=list(deck)).play() for deck in decks]), len(decks)
+
+# returns a function playing the seeded games with the batch engine
+def bench_batch_games():
+    decks = decks_from_seeds(BATCH_SEEDS)
+    return (lambda: BatchGame(decks).run()), len(decks)
+
+# every benchmark by name, each makes a fresh (function, operations per call) when it is run
+BENCHMARKS = {
+    "add_card_to_pile[4]": lambda: bench_add_card(4),
+    "add_card_to_pile[52]": lambda: bench_add_card(52),
+    "add_card_to_pile[416]": lambda: bench_add_card(416),
+    "draw_card": bench_draw_card,
+    "is_valid_slap[3]": lambda: bench_slap(3, Rules()),
+    "is_valid_slap[52]": lambda: bench_slap(52, Rules()),
+    "is_valid_slap[52, all rules]": lambda: bench_slap(52, Rules(slap_rules=list(SLAP_RULES))),
+    "shuffle_deck[52]": lambda: bench_shuffle(1),
+    "shuffle_deck[416]": lambda: bench_shuffle(8),
+    "deal": bench_deal,
+    "do_face_card[ace]": bench_face_card,
+    "game[scalar]": bench_scalar_games,
+    "game[batch]": bench_batch_games,
+}
+
+# returns the best and median time per operation in nanoseconds, over repeat runs of about min_time seconds each
+def measure(make, repeat, min_time):
+    run, ops = make()
+    run()
+    # call run enough times per repeat to last at least min_time
+    number = 1
+    while True:
+        elapsed = timeit.timeit(run, number=number)
+        if(elapsed >= min_time):
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    times = sorted(timeit.repeat(run, number=number, repeat=repeat))
+    per_op = [t / (number * ops) * 1e9 for t in times]
+    return {"ns_per_op": per_op[0], "median_ns_per_op": per_op[len(per_op) // 2], "ops": number * ops}
+
+# returns the commit the benchmarks were run on, None outside a git checkout
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# returns where the benchmarks were run
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "keyboard_imported": "keyboard" in sys.modules,
+    }
+
+# runs the benchmarks whose names contain any of the filters, printing each as it finishes
+def run_all(filters, repeat, min_time):
+    results = {}
+    for name, make in BENCHMARKS.items():
+        if(filters and not any(part in name for part in filters)):
+            continue
+        results[name] = measure(make, repeat, min_time)
+        print(f"{name:<30} {results[name]['ns_per_op']:>14,.0f} ns/op", flush=True)
+    return {"environment": environment(), "results": results}
+
+# returns the names of the benchmarks in both results that got slower than the baseline by more than threshold
+def slower(baseline, current, threshold):
+    return [name for name, result in current["results"].items()
+            if name in baseline["results"] and result["ns_per_op"] / baseline["results"][name]["ns_per_op"] - 1 > threshold]
+
+# runs each named benchmark again up to rounds times while it stays too slow, keeping its best time
+def confirm(baseline, current, threshold, rounds, repeat, min_time):
+    for _ in range(rounds):
+        names = slower(baseline, current, threshold)
+        if(not names):
+            return
+        print(f"running again: {', '.join(names)}", flush=True)
+        for name in names:
+            again = measure(BENCHMARKS[name], repeat, min_time)
+            if(again["ns_per_op"] < current["results"][name]["ns_per_op"]):
+                current["results"][name] = again
+
+# prints each benchmark's change from the baseline and returns the names that got slower by more than threshold
+def compare(baseline, current, threshold):
+    regressions = slower(baseline, current, threshold)
+    print(f"{'benchmark':<30} {'baseline ns':>14} {'current ns':>14} {'change':>8}")
+    for name, result in current["results"].items():
+        if(name not in baseline["results"]):
+            continue
+        old = baseline["results"][name]["ns_per_op"]
+        new = result["ns_per_op"]
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<30} {old:>14,.0f} {new:>14,.0f} {new / old - 1:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the card engine hot paths.")
+    parser.add_argument("--output", default=None, help="file to write the results to as JSON")
+    parser.add_argument("--compare", nargs="+", default=None, metavar="RESULTS",
+                        help="baseline results to compare with, and saved current results instead of a new run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown, as a fraction, that counts as a regression")
+    parser.add_argument("--confirm", type=int, default=3,
+                        help="times a benchmark that looks slower than the baseline is run again before it counts")
+    parser.add_argument("--filter", nargs="+", default=None, help="only run benchmarks whose names contain one of these")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of each benchmark, the best one counts")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds each timed run lasts at least")
+    args = parser.parse_args()
+    if(args.compare is not None and len(args.compare) > 2):
+        parser.error("--compare takes a baseline and at most one current results file")
+
+    baseline = None
+    if(args.compare is not None):
+        with open(args.compare[0]) as file:
+            baseline = json.load(file)
+    if(args.compare is not None and len(args.compare) == 2):
+        with open(args.compare[1]) as file:
+            current = json.load(file)
+    else:
+        current = run_all(args.filter, args.repeat, args.min_time)
+        if(baseline is not None):
+            confirm(baseline, current, args.threshold, args.confirm, args.repeat, args.min_time)
+    if(args.output is not None):
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2)
+
+    if(baseline is not None):
+        print()
+        regressions = compare(baseline, current, args.threshold)
+        if(regressions):
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
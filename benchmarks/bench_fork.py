@@ -0,0 +1,74 @@
+"""
+Benchmark for branching games part way through.
+
+Plays seeded games with step and stops each at a random card. From each of these positions it takes a snapshot and
+plays three forks to the end: one left alone, one where player 1 slaps and one where player 2 slaps. It reports the
+cost of a snapshot and a fork next to copy.deepcopy of the game, and how often each player wins in each branch.
+
+Run with: python benchmarks/bench_fork.py [--positions 2000]
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ers.engine import GameState
+
+# returns the average seconds per call of function over the given number of calls
+def time_calls(function, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls
+
+# returns games stopped part way through, one per seed at a random card before its end
+def positions(count, seed):
+    rng = random.Random(seed)
+    games = []
+    for game_seed in range(count):
+        turns = GameState(game_seed).play().turns
+        game = GameState(game_seed)
+        game.advance(rng.randrange(turns))
+        games.append(game)
+    return games
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of snapshots and forks, and what slapping part way through changes.")
+    parser.add_argument("--positions", type=int, default=2000, help="games to stop part way through")
+    parser.add_argument("--seed", type=int, default=0, help="seed for where each game is stopped")
+    parser.add_argument("--calls", type=int, default=10000, help="calls timed for each copy")
+    args = parser.parse_args()
+
+    games = positions(args.positions, args.seed)
+    game = games[0]
+    snapshot = game.snapshot()
+    print(f"snapshot:      {time_calls(game.snapshot, args.calls) * 1e6:8.2f} us")
+    print(f"fork:          {time_calls(snapshot.fork, args.calls) * 1e6:8.2f} us")
+    print(f"copy.deepcopy: {time_calls(lambda: copy.deepcopy(game), args.calls // 10) * 1e6:8.2f} us")
+
+    # the branches and the number of games each player wins in them, index 0 for infinite games
+    branches = {"no slap": None, "player 1 slaps": 0, "player 2 slaps": 1}
+    wins = {name: [0, 0, 0] for name in branches}
+    start = time.perf_counter()
+    for game in games:
+        snapshot = game.snapshot()
+        for name, seat in branches.items():
+            fork = snapshot.fork()
+            if(seat is not None):
+                fork.slap(fork.players[seat])
+            wins[name][fork.play().winner] += 1
+    elapsed = time.perf_counter() - start
+
+    print()
+    print(f"{'branch':<16} {'player 1':>9} {'player 2':>9} {'infinite':>9}")
+    for name, (infinite, first, second) in wins.items():
+        print(f"{name:<16} {first / len(games):>9.3f} {second / len(games):>9.3f} {infinite / len(games):>9.3f}")
+    print(f"branches played to the end/sec: {len(games) * len(branches) / elapsed:,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark for the key input layer.
+
+Writes keys into a pipe read by TerminalKeys, the same way the terminal delivers them, and measures the time from
+each write to the game's await returning the key, and the CPU used while waiting for a key that never comes.
+
+Run with: python benchmarks/bench_keys.py [--keys 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ers.keys import TerminalKeys
+
+# writes one key at a time into the pipe, recording when each was written
+def press_keys(fd, count, interval, written):
+    for _ in range(count):
+        time.sleep(interval)
+        written.append(time.perf_counter_ns())
+        os.write(fd, b"w")
+
+async def measure(count, interval, idle):
+    read_fd, write_fd = os.pipe()
+    written = []
+    latency = []
+    async with TerminalKeys(read_fd) as keys:
+        writer = threading.Thread(target=press_keys, args=(write_fd, count, interval, written))
+        writer.start()
+        for i in range(count):
+            await keys.get()
+            latency.append(time.perf_counter_ns() - written[i])
+        writer.join()
+
+        # nothing is written now, so this only measures the cost of waiting
+        cpu = time.process_time()
+        try:
+            await asyncio.wait_for(keys.get(), idle)
+        except asyncio.TimeoutError:
+            pass
+        cpu = time.process_time() - cpu
+    os.close(read_fd)
+    os.close(write_fd)
+    return sorted(latency), cpu
+
+def main():
+    parser = argparse.ArgumentParser(description="Key press to handled latency and idle CPU use.")
+    parser.add_argument("--keys", type=int, default=2000, help="number of keys to press")
+    parser.add_argument("--interval", type=float, default=0.001, help="seconds between key presses")
+    parser.add_argument("--idle", type=float, default=2.0, help="seconds to wait with no key presses")
+    args = parser.parse_args()
+
+    latency, cpu = asyncio.run(measure(args.keys, args.interval, args.idle))
+    print(f"keys: {len(latency)}")
+    for q in (50, 90, 99):
+        print(f"p{q} latency: {latency[len(latency) * q // 100] / 1000:.1f} us")
+    print(f"max latency: {latency[-1] / 1000:.1f} us")
+    print(f"idle CPU: {cpu / args.idle * 100:.2f}% of one core")
+
+if __name__ == "__main__":
+    main()
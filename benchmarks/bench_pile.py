@@ -0,0 +1,78 @@
+"""
+Microbenchmark for moving cards between hands and the pile.
+
+Each round plays a hand of N cards onto the pile one at a time and then captures the whole pile back,
+so the pile grows from 0 to N cards. The deque backed Player/Pile from ers.engine are compared
+against the old list backed versions, which are kept here for reference.
+
+Run with: python benchmarks/bench_pile.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ers.cards import CARDS, Card
+from ers.engine import Player, Pile, build_deck
+
+# the list backed Player/Pile from before the switch to deques
+class ListPlayer:
+    def __init__(self, player, hand):
+        self.player = player
+        self.hand = hand
+
+    def draw_card(self, pile):
+        if(len(self.hand) >= 1):
+            card = self.hand[0]
+            if(isinstance(card, Card)):
+                if(isinstance(pile, ListPile)):
+                    pile.add_card_to_pile(card)
+                    self.hand.remove(card)
+                    return card
+        return Card("Joker", "Joker")
+
+class ListPile:
+    def __init__(self, pile):
+        self.pile = pile
+
+    def add_card_to_pile(self, card):
+        if(isinstance(card, Card)):
+            self.pile.reverse()
+            self.pile.append(card)
+            self.pile.reverse()
+
+# plays every card in the hand onto the pile, then puts the pile back under the hand
+def list_round(player, pile):
+    for _ in range(len(player.hand)):
+        player.draw_card(pile)
+    player.hand += pile.pile
+    pile.pile = []
+
+def deque_round(player, pile):
+    for _ in range(len(player.hand)):
+        player.draw_card(pile)
+    player.hand.extend(pile.pile)
+    pile.pile.clear()
+
+# returns the number of cards moved per second for a pile that grows to size cards
+def cards_per_sec(make_player, make_pile, play_round, size, as_objects=False, repeat=5):
+    cards = (build_deck() * (size // 52 + 1))[:size]
+    if(as_objects):
+        cards = [CARDS[card] for card in cards]
+    player = make_player(1, list(cards))
+    pile = make_pile([])
+    number = max(1, 20000 // size)
+    best = min(timeit.repeat(lambda: play_round(player, pile), number=number, repeat=repeat))
+    return size * number / best
+
+def main():
+    print(f"{'pile size':>10} {'list cards/s':>14} {'deque cards/s':>14} {'speedup':>8}")
+    for size in [4, 16, 52, 104, 208, 416, 1664]:
+        old = cards_per_sec(ListPlayer, ListPile, list_round, size, as_objects=True)
+        new = cards_per_sec(Player, Pile, deque_round, size)
+        print(f"{size:>10} {old:>14,.0f} {new:>14,.0f} {new / old:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark for how the cost of a turn scales with the number of players and decks.
+
+For every table size and shoe size, plays a fixed set of seeded games with the scalar GameState and the
+same deals with the NumPy BatchGame, and reports the time per card drawn. Games with more cards last
+longer, so the time per turn is what shows whether the engines themselves slow down.
+
+Run with: python benchmarks/bench_players.py [--games 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ers.batch import BatchGame, decks_from_seeds
+from ers.engine import GameState, Rules
+
+# returns the number of turns played and the seconds taken by the scalar engine
+def scalar_cost(decks, rules):
+    turns = 0
+    start = time.perf_counter()
+    for deck in decks:
+        turns += GameState(rules=rules, deck=deck.tolist()).play().turns
+    return turns, time.perf_counter() - start
+
+# returns the number of turns played and the seconds taken by the batch engine
+def batch_cost(decks, rules):
+    start = time.perf_counter()
+    result = BatchGame(decks, rules).run()
+    return int(result.turns.sum()), time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Time per turn by number of players and decks.")
+    parser.add_argument("--games", type=int, default=100, help="games played for each table and shoe size")
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3, 4, 6, 8])
+    parser.add_argument("--decks", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{'players':>7} {'decks':>5} {'mean turns':>10} {'scalar ns/turn':>14} {'batch ns/turn':>13}")
+    for players in args.players:
+        for count in args.decks:
+            rules = Rules(players=players, decks=count)
+            decks = decks_from_seeds(range(args.games), count)
+            turns, scalar = scalar_cost(decks, rules)
+            batch_turns, batch = batch_cost(decks, rules)
+            print(f"{players:>7} {count:>5} {turns / args.games:>10.0f} {scalar / turns * 1e9:>14,.0f} "
+                  f"{batch / batch_turns * 1e9:>13,.0f}")
+
+if __name__ == "__main__":
+    main()
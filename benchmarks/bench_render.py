@@ -0,0 +1,78 @@
+"""
+Benchmark for drawing the pile in the terminal.
+
+Plays a shuffled deck onto the pile one card at a time and draws the pile after every card, once the old way
+(a full terminal reset and one print per card, building the card art with f-strings) and once with the
+incremental Renderer. Output goes to an in-memory buffer, so this measures the work done and the bytes a slow
+terminal or SSH link would have to carry.
+
+Run with: python benchmarks/bench_render.py
+"""
+
+import io
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ers.cards import CARDS
+from ers.render import Renderer, pile_frame
+
+# the old Terminal_out.print_cards, kept here for reference
+def old_print_cards(pile):
+    print('\033c')
+    maxx = min(len(pile), 4) - 1
+    for card in range(maxx, -1, -1):
+        print(f'''
+                          ----------------------------
+                          |{pile[card].value:<26}|
+                          |                          |
+                          |                          |
+                          |                          |
+                          |                          |
+                          |                          |
+                          |{pile[card].suit:^26}|
+                          |                          |
+                          |                          |
+                          |                          |
+                          |                          |
+                          |                          |
+                          |                          |
+                          |{pile[card].value:>26}|
+                          ----------------------------      
+                                                               ''', end='')
+    print()
+
+# returns the seconds per frame and bytes per frame for drawing every pile in piles
+def measure(draw, piles, out):
+    start = time.perf_counter()
+    for pile in piles:
+        draw(pile)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(piles), len(out.getvalue().encode()) / len(piles)
+
+def main():
+    deck = list(CARDS[:52])
+    random.Random(0).shuffle(deck)
+    # the pile after each card, top card first, played over several rounds
+    piles = [deck[i::-1] for i in range(len(deck))] * 20
+
+    old_out = io.StringIO()
+    with redirect_stdout(old_out):
+        old_time, old_bytes = measure(old_print_cards, piles, old_out)
+
+    new_out = io.StringIO()
+    # no frame rate cap, so every frame is drawn
+    renderer = Renderer(new_out, fps=1e9)
+    new_time, new_bytes = measure(lambda pile: renderer.render(pile_frame(pile)), piles, new_out)
+
+    print(f"{'':>12} {'us/frame':>10} {'bytes/frame':>12}")
+    print(f"{'old':>12} {old_time * 1e6:>10.1f} {old_bytes:>12.0f}")
+    print(f"{'incremental':>12} {new_time * 1e6:>10.1f} {new_bytes:>12.0f}")
+    print(f"lines rewritten per frame: {renderer.lines_written / renderer.frames:.1f}")
+
+if __name__ == "__main__":
+    main()
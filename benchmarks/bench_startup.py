@@ -0,0 +1,80 @@
+"""
+Benchmark for start-up time.
+
+Starts a fresh interpreter many times for each target and times it from launch to exit, the cost every worker
+process, script and command pays before doing any work:
+    python: an empty interpreter, the floor everything else is measured against.
+    engine: import ers.engine, all the scalar engine needs.
+    worker: import ers.sim and play one single game chunk, what a headless simulation worker does.
+    play: import ers.play, the interactive frontend, without starting a game.
+Each target also reports which of the interactive modules it loaded, the keyboard library, ers.keys and
+ers.play, and headless targets should load none of them. --importtime lists the slowest imports of each target
+from python -X importtime.
+
+Run with: python benchmarks/bench_startup.py [--runs 20] [--importtime 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# modules a headless process should never load
+INTERACTIVE = ("keyboard", "ers.keys", "ers.play")
+
+# the code each target runs in its fresh interpreter
+TARGETS = {
+    "python": "pass",
+    "engine": "import ers.engine",
+    "worker": "from ers.sim import simulate_chunk; simulate_chunk(0, 0, 1)",
+    "play": "import ers.play",
+}
+
+# the line each target ends with, printing the interactive modules it loaded
+CHECK = f"\nimport sys; print(','.join(name for name in {INTERACTIVE!r} if name in sys.modules))"
+
+# returns the launch to exit times of runs fresh interpreters running code, in seconds, and the modules they loaded
+def time_target(code, runs):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        loaded = subprocess.run([sys.executable, "-c", code + CHECK], capture_output=True, text=True, env=env,
+                                check=True).stdout.strip()
+        times.append(time.perf_counter() - start)
+    return sorted(times), loaded
+
+# returns the top imports of code by cumulative time, as (microseconds, module) pairs
+def slowest_imports(code, top):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    lines = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env,
+                           check=True).stderr.splitlines()
+    imports = []
+    # each line is "import time: self | cumulative | module", after a header line
+    for line in lines[1:]:
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description="Time how long each part of ERS takes to start.")
+    parser.add_argument("--runs", type=int, default=20, help="fresh interpreters started for each target")
+    parser.add_argument("--importtime", type=int, default=0, metavar="TOP", help="list this many slowest imports")
+    args = parser.parse_args()
+
+    print(f"{'target':<8} {'best ms':>9} {'median ms':>10}  interactive modules loaded")
+    for name, code in TARGETS.items():
+        times, loaded = time_target(code, args.runs)
+        print(f"{name:<8} {times[0] * 1000:>9.1f} {times[len(times) // 2] * 1000:>10.1f}  {loaded or 'none'}")
+    for name, code in TARGETS.items():
+        if(args.importtime and name != "python"):
+            print()
+            print(f"{name}: slowest imports")
+            for micros, module in slowest_imports(code, args.importtime):
+                print(f"{micros / 1000:>9.1f} ms  {module}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Egyptian Rat Screw game engine.
+
+The engine has no side effects on import, so any number of games can be played in one interpreter.
+"""
+
+from ers.cards import Card
+from ers.engine import Player, Pile, Rules, GameState, GameResult, run_game
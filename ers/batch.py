@@ -0,0 +1,487 @@
+"""
+NumPy batch engine that plays many games in lockstep.
+
+Every game is held in arrays: each player's hand is a row of a 2-D int8 ring buffer with head/count pointers,
+the pile is a row of a 2-D int8 array with its length, and the turn, pending penalty and chain owner are per
+game arrays. Each step draws one card in every live game at once and finished games are dropped from the live
+set. The rules are the same as GameState's, so a deck gives the same winner, turns and captures in both engines.
+Infinite games are caught at the same checkpoints as in GameState, see ers.cycles, by comparing each checkpoint
+against one saved state per game with Brent's algorithm.
+
+Run with: python -m ers.batch --games 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ers.cards import JOKER, RANK
+from ers.engine import DEFAULT_RULES, MAX_DECKS, MAX_PLAYERS, Rules, build_deck, find_cycle_start, seeded_deck
+from ers.eventlog import CAPTURE, DRAW, FACE, EventLog, make_records
+from ers.slaps import EMPTY, RADIX
+
+RANK_TABLE = np.array(RANK, dtype=np.int8)
+
+# returns the number of slots each hand's ring buffer needs to hold every card, a power of two so wrapping is a mask
+def hand_slots(cards):
+    return 1 << max(cards - 1, 1).bit_length()
+
+# returns an (n, cards) int8 array holding the shoe of the given number of decks GameState would deal for each seed
+def decks_from_seeds(seeds, decks=1):
+    shoes = np.empty((len(seeds), len(build_deck(decks))), dtype=np.int8)
+    for i, seed in enumerate(seeds):
+        shoes[i] = seeded_deck(seed, decks)
+    return shoes
+
+# returns an (n, deck size) int8 array of independently shuffled copies of deck, all from one Generator call
+def shuffled_decks(games, rng, deck=None):
+    """
+    This function shuffles many decks at once, much faster than decks_from_seeds when the deals do not have to
+    match GameState's seeds.
+
+    Parameters:
+        games (int): The number of decks.
+        rng (Generator): The NumPy random Generator to draw from.
+        deck (list): The cards to shuffle, defaults to build_deck().
+
+    Returns:
+        An (games, len(deck)) int8 array, each row a uniformly random order of deck.
+    """
+
+    if(deck is None):
+        deck = build_deck()
+    rows = np.broadcast_to(np.asarray(deck, dtype=np.int8), (games, len(deck)))
+    # permuted shuffles every row on its own with Fisher-Yates
+    return rng.permuted(rows, axis=1)
+
+class BatchResult:
+    """
+    This class holds the outcome of every game in a batch.
+
+    Attributes:
+        winner (ndarray): The player number of each winner, 0 if the game is infinite, did not finish or nobody has cards.
+        turns (ndarray): The number of cards drawn in each game.
+        captures (ndarray): The number of piles won in each game.
+        cycle_start (ndarray): For infinite games, the number of cards drawn before they start repeating, otherwise 0.
+        cycle_length (ndarray): For infinite games, the number of turns in the cycle, otherwise 0.
+    """
+
+    def __init__(self, winner, turns, captures, cycle_start, cycle_length):
+        """
+        The constructor for BatchResult class.
+
+        Parameters:
+            winner (ndarray): The player number of each winner, 0 if the game is infinite or did not finish.
+            turns (ndarray): The number of cards drawn in each game.
+            captures (ndarray): The number of piles won in each game.
+            cycle_start (ndarray): For infinite games, the number of cards drawn before they start repeating, otherwise 0.
+            cycle_length (ndarray): For infinite games, the number of turns in the cycle, otherwise 0.
+        """
+
+        self.winner = winner
+        self.turns = turns
+        self.captures = captures
+        self.cycle_start = cycle_start
+        self.cycle_length = cycle_length
+
+    def __len__(self):
+        """
+        The function to get the number of games in the batch.
+
+        Returns:
+            An int.
+        """
+
+        return len(self.winner)
+
+class BatchGame:
+    """
+    This class plays a batch of games in lockstep.
+
+    Attributes:
+        players (int): The number of seats in every game.
+        slots (int): The length of each hand's ring buffer.
+        mask (int): slots - 1, wraps a slot number around the ring buffer.
+        hands (ndarray): One ring buffer row per hand, row players * game + seat.
+        head (ndarray): The slot of the next card drawn from each hand.
+        count (ndarray): The number of cards in each hand.
+        pile (ndarray): One row per game, bottom card first.
+        pile_len (ndarray): The number of cards in each pile.
+        turn (ndarray): The seat that draws next in each game.
+        pending (ndarray): The draws still owed for the current face card, 0 outside a chain.
+        owner (ndarray): The seat that played the current face card.
+        done (ndarray): Whether each game has finished.
+        turns (ndarray): The number of cards drawn in each game.
+        captures (ndarray): The number of piles won in each game.
+        live (ndarray): The indexes of the games still being played.
+        saved_seat (ndarray): The seat about to draw in each game's saved checkpoint state, -1 before the first.
+        saved_count (ndarray): The number of cards in each hand of each game's saved state.
+        saved_hands (ndarray): Each game's saved hands, in draw order and padded with -1.
+        saved_pile_len (ndarray): The number of cards in each game's saved pile.
+        saved_pile (ndarray): Each game's saved pile, bottom card first and padded with -1.
+        saved_turn (ndarray): The turn each saved state was taken on.
+        power (ndarray): The number of checkpoints to compare before replacing each saved state.
+        length (ndarray): The number of checkpoints since each saved state was taken.
+        cycle_rounds (ndarray): The cycle length in checkpoints of each infinite game, otherwise 0.
+        cycle_turns (ndarray): The cycle length in turns of each infinite game, otherwise 0.
+        log (EventLog): Where the games' events are logged, None to log nothing.
+        first_game (int): The game id the first game's events are logged under, the rest follow in order.
+    """
+
+    def __init__(self, decks, rules=None, log=None, first_game=0):
+        """
+        The constructor for BatchGame class. Deals each deck to the players in turn, like deal_cards.
+
+        Parameters:
+            decks (ndarray): An (n, cards) array of shuffled card codes, one shoe per game.
+            rules (Rules): The rule settings, defaults to DEFAULT_RULES.
+            log (EventLog): Where to log the games' events, None to log nothing.
+            first_game (int): The game id to log the first game's events under.
+        """
+
+        if(rules is None):
+            rules = DEFAULT_RULES
+        decks = np.asarray(decks, dtype=np.int8)
+        games, size = decks.shape
+        self.rules = rules
+        self.decks = decks
+        self.penalty = np.array(rules.penalty, dtype=np.int8)
+        self.slaps = rules.slaps
+        self.slap_table = np.frombuffer(rules.slaps.table, dtype=np.uint8).astype(bool)
+
+        players = rules.players
+        self.players = players
+        self.slots = hand_slots(size)
+        self.mask = self.slots - 1
+        self.hands = np.zeros((players * games, self.slots), dtype=np.int8)
+        self.head = np.zeros(players * games, dtype=np.int64)
+        self.count = np.zeros(players * games, dtype=np.int64)
+        for seat in range(players):
+            dealt = decks[:, seat::players]
+            self.hands[seat::players, :dealt.shape[1]] = dealt
+            self.count[seat::players] = dealt.shape[1]
+
+        self.pile = np.zeros((games, size), dtype=np.int8)
+        self.pile_len = np.zeros(games, dtype=np.int64)
+        self.turn = np.zeros(games, dtype=np.int8)
+        self.pending = np.zeros(games, dtype=np.int8)
+        self.owner = np.zeros(games, dtype=np.int8)
+        self.done = np.zeros(games, dtype=bool)
+        self.turns = np.zeros(games, dtype=np.int64)
+        self.captures = np.zeros(games, dtype=np.int64)
+        self.live = np.arange(games)
+
+        self.saved_seat = np.full(games, -1, dtype=np.int8)
+        self.saved_count = np.zeros((games, players), dtype=np.int64)
+        self.saved_hands = np.full((games, players, self.slots), -1, dtype=np.int8)
+        self.saved_pile_len = np.zeros(games, dtype=np.int64)
+        self.saved_pile = np.full((games, size), -1, dtype=np.int8)
+        self.saved_turn = np.zeros(games, dtype=np.int64)
+        self.power = np.ones(games, dtype=np.int64)
+        self.length = np.zeros(games, dtype=np.int64)
+        self.cycle_rounds = np.zeros(games, dtype=np.int64)
+        self.cycle_turns = np.zeros(games, dtype=np.int64)
+        self.log = log
+        self.first_game = first_game
+
+    def is_valid_slap(self, games):
+        """
+        This function checks the given games' piles against the compiled slap table of the rules.
+
+        Parameters:
+            games (ndarray): The indexes of the games to check.
+
+        Returns:
+            A boolean array.
+        """
+
+        # builds the same index the scalar Pile keeps, top card in the lowest digit
+        length = self.pile_len[games]
+        index = np.zeros(len(games), dtype=np.int64)
+        for position in reversed(range(self.slaps.depth)):
+            rank = RANK_TABLE[self.pile[games, np.maximum(length - 1 - position, 0)]]
+            index = index * RADIX + np.where(length > position, rank, EMPTY)
+        if(self.slaps.uses_bottom):
+            bottom = np.where(length > 0, RANK_TABLE[self.pile[games, 0]], EMPTY).astype(np.int64)
+            index += bottom * self.slaps.span
+        return self.slap_table[index]
+
+    def capture(self, games, seats):
+        """
+        This function adds each game's pile to the bottom of the given seat's hand, top card first, and clears it.
+
+        Parameters:
+            games (ndarray): The indexes of the games.
+            seats (ndarray): The seat winning the pile in each game.
+        """
+
+        length = self.pile_len[games]
+        rows = self.players * games + seats
+        tail = self.head[rows] + self.count[rows]
+
+        # k counts 0, 1, 2... within each game's pile
+        starts = np.cumsum(length) - length
+        k = np.arange(length.sum()) - np.repeat(starts, length)
+        cards = self.pile[np.repeat(games, length), np.repeat(length, length) - 1 - k]
+        self.hands[np.repeat(rows, length), (np.repeat(tail, length) + k) & self.mask] = cards
+
+        self.count[rows] += length
+        self.pile_len[games] = 0
+        self.captures[games] += 1
+
+    def ordered_state(self, games):
+        """
+        This function copies the given games' hands in draw order and piles bottom first, padded with -1.
+
+        Parameters:
+            games (ndarray): The indexes of the games.
+
+        Returns:
+            hands (ndarray): An (n, players, slots) array.
+            pile (ndarray): An (n, pile width) array.
+        """
+
+        slots = np.arange(self.slots)
+        rows = (self.players * games[:, None] + np.arange(self.players)).ravel()
+        hands = self.hands[rows[:, None], (self.head[rows, None] + slots) & self.mask]
+        hands[slots >= self.count[rows, None]] = -1
+
+        pile = self.pile[games].copy()
+        pile[np.arange(pile.shape[1]) >= self.pile_len[games, None]] = -1
+        return hands.reshape(len(games), self.players, self.slots), pile
+
+    def checkpoint(self, games, seats):
+        """
+        This function runs one step of Brent's algorithm on the given games, right before seats draw with no penalty owed.
+
+        Parameters:
+            games (ndarray): The indexes of the games at a checkpoint.
+            seats (ndarray): The seat about to draw in each game.
+
+        Returns:
+            A boolean array, True for the games whose state repeated.
+        """
+
+        self.length[games] += 1
+        count = self.count.reshape(-1, self.players)[games]
+        pile_len = self.pile_len[games]
+
+        # only copy out the cards of games whose seat and card counts already match the saved state
+        repeated = ((self.saved_seat[games] == seats) & (self.saved_count[games] == count).all(axis=1)
+                    & (self.saved_pile_len[games] == pile_len))
+        matching = games[repeated]
+        if(len(matching)):
+            hands, pile = self.ordered_state(matching)
+            repeated[repeated] = ((hands == self.saved_hands[matching]).all(axis=(1, 2))
+                                  & (pile == self.saved_pile[matching]).all(axis=1))
+        found = games[repeated]
+        self.cycle_rounds[found] = self.length[found]
+        self.cycle_turns[found] = self.turns[found] - self.saved_turn[found]
+
+        # replace the saved state every time the number of checkpoints since it reaches a power of two
+        save = ~repeated & (self.length[games] == self.power[games])
+        saving = games[save]
+        if(len(saving)):
+            self.saved_hands[saving], self.saved_pile[saving] = self.ordered_state(saving)
+        self.saved_seat[saving] = seats[save]
+        self.saved_count[saving] = count[save]
+        self.saved_pile_len[saving] = pile_len[save]
+        self.saved_turn[saving] = self.turns[saving]
+        self.power[saving] *= 2
+        self.length[saving] = 0
+        return repeated
+
+    def is_game_over(self, games):
+        """
+        This function checks if at most one player still holds cards in the given games.
+
+        Parameters:
+            games (ndarray): The indexes of the games to check.
+
+        Returns:
+            A boolean array.
+        """
+
+        if(self.players == 2):
+            return (self.count[2 * games] == 0) | (self.count[2 * games + 1] == 0)
+        holding = np.count_nonzero(self.count.reshape(-1, self.players)[games], axis=1)
+        return holding < 2
+
+    def next_seat(self, games, seats):
+        """
+        This function gives the seat whose turn comes after the given seat, skipping players with no cards,
+        like GameState.next_player.
+
+        Parameters:
+            games (ndarray): The indexes of the games.
+            seats (ndarray): The current seat in each game.
+
+        Returns:
+            An int8 array of seats.
+        """
+
+        following = (seats + 1) % self.players
+        if(self.players == 2):
+            return following
+        # walk backwards so the closest seat holding cards is written last
+        found = following.copy()
+        for step in range(self.players - 1, 0, -1):
+            seat = (seats + step) % self.players
+            holding = self.count[self.players * games + seat] > 0
+            found[holding] = seat[holding]
+        return found
+
+    def step(self):
+        """
+        This function draws one card in every live game and applies the face card and capture rules.
+
+        Returns:
+            The number of games still live.
+        """
+
+        games = self.live
+        seat = self.turn[games]
+        rows = self.players * games + seat
+
+        # draw the top card of each hand onto its pile, an empty hand draws the Joker and places nothing
+        has_card = self.count[rows] > 0
+        drawing = rows[has_card]
+        drawn_games = games[has_card]
+        card = np.full(len(games), JOKER, dtype=np.int8)
+        card[has_card] = self.hands[drawing, self.head[drawing]]
+        self.head[drawing] = (self.head[drawing] + 1) & self.mask
+        self.count[drawing] -= 1
+        self.pile[drawn_games, self.pile_len[drawn_games]] = card[has_card]
+        self.pile_len[drawn_games] += 1
+        self.turns[games] += 1
+
+        # checks for an empty hand and invalid slap to ensure that the game is over
+        over = self.is_game_over(games)
+        over[over] = ~self.is_valid_slap(games[over])
+
+        times = self.penalty[card]
+        pending = self.pending[games]
+        owner = self.owner[games]
+        face = times > 0
+        paying = (pending > 0) & ~face
+        new_pending = np.where(face, times, np.where(paying, pending - 1, 0))
+        # a face card passes the penalty to the next seat, a number card outside a chain passes the turn
+        new_turn = np.where(paying, seat, self.next_seat(games, seat))
+        # running out during a penalty still gives the pile to the player who placed the face card
+        chain_over = over & (pending > 0)
+        won = (paying & (new_pending == 0)) | chain_over
+        new_pending[chain_over] = 0
+        new_turn[won] = owner[won]
+
+        self.pending[games] = new_pending
+        self.owner[games] = np.where(face, seat, owner)
+        self.turn[games] = new_turn
+        if(self.log is not None):
+            self.log_step(games, seat, card, times, won, owner)
+        self.capture(games[won], owner[won])
+
+        # the game only goes on after a capture if at least two players still hold cards
+        finished = over & ~chain_over
+        finished[won] = self.is_game_over(games[won])
+
+        # check for a repeat after every capture, and after every draw from an empty hand since those change nothing
+        check = (won & ~finished) | ((card == JOKER) & (pending == 0) & ~over)
+        finished[check] = self.checkpoint(games[check], new_turn[check])
+        self.done[games[finished]] = True
+        self.live = games[~finished]
+        return len(self.live)
+
+    def log_step(self, games, seats, cards, times, won, owner):
+        """
+        This function logs one step's draws, face cards and captures, like GameState.logged_draw and logged_capture.
+        Each game's events are written in the order they happened, but the games are mixed together.
+
+        Parameters:
+            games (ndarray): The indexes of the games that drew.
+            seats (ndarray): The seat that drew in each game.
+            cards (ndarray): The card drawn in each game.
+            times (ndarray): The penalty of each card drawn.
+            won (ndarray): Whether each game ends a chain this step.
+            owner (ndarray): The seat that wins the pile in each game that ends a chain.
+        """
+
+        ids = self.first_game + games
+        turns = self.turns[games]
+        face = times > 0
+        captured = games[won]
+        size = self.pile_len[captured]
+        top = self.pile[captured, size - 1]
+        records = np.concatenate([make_records(ids, turns, seats, cards, DRAW),
+                                  make_records(ids[face], turns[face], seats[face], cards[face], FACE, times[face]),
+                                  make_records(ids[won], turns[won], owner[won], top, CAPTURE, size)])
+        self.log.write_records(records)
+
+    def run(self, max_turns=None):
+        """
+        This function plays every game until it finishes.
+
+        Parameters:
+            max_turns (int): Stops after this many draws even if some games are still live, None plays on.
+
+        Returns:
+            A BatchResult.
+        """
+
+        steps = 0
+        while len(self.live) and (max_turns is None or steps < max_turns):
+            self.step()
+            steps += 1
+        return self.result()
+
+    def result(self):
+        """
+        This function summarizes the batch so far.
+
+        Returns:
+            A BatchResult, the winner of each game is the first player who still holds cards, 0 if nobody does.
+        """
+
+        infinite = self.cycle_turns > 0
+        holding = self.count.reshape(-1, self.players) > 0
+        winner = np.where(holding.any(axis=1), holding.argmax(axis=1) + 1, 0)
+        winner[~self.done | infinite] = 0
+
+        # infinite games are rare, so their cycle start is found by replaying them one at a time
+        cycle_start = np.zeros(len(winner), dtype=np.int64)
+        for game in np.flatnonzero(infinite):
+            cycle_start[game] = find_cycle_start(self.decks[game].tolist(), self.rules, int(self.cycle_turns[game]))
+        return BatchResult(winner, self.turns.copy(), self.captures.copy(), cycle_start, self.cycle_turns.copy())
+
+# plays one game for each seed and returns a BatchResult
+def run_batch(seeds, rules=None, max_turns=None):
+    if(rules is None):
+        rules = DEFAULT_RULES
+    return BatchGame(decks_from_seeds(seeds, rules.decks), rules).run(max_turns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a batch of ERS games in lockstep and report games/sec.")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest follow in order")
+    parser.add_argument("--players", type=int, default=2, choices=range(2, MAX_PLAYERS + 1), help="players per game")
+    parser.add_argument("--decks", type=int, default=1, choices=range(1, MAX_DECKS + 1), help="decks in the shoe")
+    parser.add_argument("--events", default=None, help="binary event log to append every game's events to, by seed")
+    args = parser.parse_args()
+
+    rules = Rules(players=args.players, decks=args.decks)
+    decks = decks_from_seeds(range(args.seed, args.seed + args.games), args.decks)
+    log = None if args.events is None else EventLog(args.events)
+    start = time.perf_counter()
+    result = BatchGame(decks, rules, log, args.seed).run()
+    if(log is not None):
+        log.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"games: {len(result)}")
+    print(f"player 1 wins: {np.mean(result.winner == 1):.4f}")
+    print(f"infinite games: {np.count_nonzero(result.cycle_length)}")
+    print(f"mean turns: {result.turns.mean():.1f}")
+    print(f"games/sec: {len(result) / elapsed:,.0f}")
+
+if __name__ == "__main__":
+    main()
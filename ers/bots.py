@@ -0,0 +1,631 @@
+"""
+Bot players that slap, so simulated games include the slapping part of ERS.
+
+Every card is placed pace seconds after the one before, and each pile can be slapped until the next card covers it.
+A Bot decides how it slaps:
+    reaction_times: how long it takes to slap each pile it can win, inf where it misses the slap.
+    false_slap_gaps: how many cards go by before each time it slaps by mistake.
+Both sample a whole block at once with NumPy, which the game hands out one at a time. Subclasses can override
+either to plug in other behaviour.
+
+Slaps are resolved by an event scheduler instead of stepping the clock: a heap of (time, seat) slap events. When a
+slappable card lands, each bot's reaction is drawn and only the fastest is pushed, since any slower one would find
+the pile already taken. Each bot's next false slap is always waiting on the heap, sampled once per false slap
+rather than once per card. After every card the events due before the next card are popped in time order: a slap
+on a slappable pile wins it, and a slap on any other pile burns a card. The game keeps the slap table index up to
+date as cards land, so most cards only cost one table lookup and one look at the top of the heap. With 8 bots a
+card still costs about 1.7 times what it does in the plain engine, and about 2.4 times with a false_slap_rate of
+0.05, where a false slap comes every few cards and each one is a heap event, a sample and often a burn.
+
+Bots can slap back in after running out of cards. A burned card goes on top of the pile, like the interactive game,
+and a burn that makes the pile slappable is reacted to like a drawn card.
+Because bots are random, a game can no longer be found to repeat forever, so it stops after max_turns instead.
+Bot games can be stepped, snapshot and forked like any game. A snapshot carries the pending slap events, the unused
+samples and the random number generator, so a fork plays on exactly as the game it came from.
+
+Run with: python -m ers.bots --players 8 --games 200
+"""
+
+import argparse
+import copy
+import math
+import time
+from heapq import heappop, heappush
+
+import numpy as np
+
+from ers.cards import JOKER, RANK
+from ers.engine import MAX_DECKS, MAX_PLAYERS, GameResult, GameState, Rules, Snapshot
+from ers.slaps import EMPTY, RADIX
+
+# what pushed a slap event, a reaction to a slappable pile or a mistake
+REACTION = 0
+FALSE_SLAP = 1
+
+# the number of reaction times or false slap gaps sampled for a bot at a time
+BLOCK = 64
+
+class Bot:
+    """
+    This class is a slapping policy: a log-normal reaction time, a chance to miss and a rate of false slaps.
+
+    Attributes:
+        reaction (float): The median seconds from a slappable card landing to the slap.
+        spread (float): The standard deviation of the log of the reaction time.
+        miss_rate (float): The chance of not slapping a slappable pile at all.
+        false_slap_rate (float): The chance of slapping by mistake after each card.
+    """
+
+    def __init__(self, reaction=0.35, spread=0.25, miss_rate=0.1, false_slap_rate=0.005):
+        """
+        The constructor for Bot class.
+
+        Parameters:
+            reaction (float): The median reaction time in seconds.
+            spread (float): The standard deviation of the log of the reaction time.
+            miss_rate (float): The chance of missing a slappable pile, between 0 and 1.
+            false_slap_rate (float): The chance of a false slap after each card, between 0 and 1.
+        """
+
+        if(not 0 < reaction < math.inf):
+            raise ValueError(f"reaction must be a positive number of seconds, not {reaction}")
+        if(not 0 <= spread < math.inf):
+            raise ValueError(f"spread must be at least 0, not {spread}")
+        if(not 0 <= miss_rate <= 1):
+            raise ValueError(f"miss_rate must be between 0 and 1, not {miss_rate}")
+        if(not 0 <= false_slap_rate < 1):
+            raise ValueError(f"false_slap_rate must be at least 0 and below 1, not {false_slap_rate}")
+        self.reaction = reaction
+        self.spread = spread
+        self.miss_rate = miss_rate
+        self.false_slap_rate = false_slap_rate
+        self.mu = math.log(reaction)
+
+    def reaction_times(self, rng, size):
+        """
+        This function samples how long the bot takes to slap the next size slappable piles.
+
+        Parameters:
+            rng (numpy.random.Generator): The game's random numbers.
+            size (int): The number of piles.
+
+        Returns:
+            An array of seconds, inf for each pile the bot misses.
+        """
+
+        times = rng.lognormal(self.mu, self.spread, size)
+        times[rng.random(size) < self.miss_rate] = np.inf
+        return times
+
+    def false_slap_gaps(self, rng, size):
+        """
+        This function samples how many cards go by before each of the bot's next size false slaps.
+
+        Parameters:
+            rng (numpy.random.Generator): The game's random numbers.
+            size (int): The number of false slaps.
+
+        Returns:
+            An array of card counts, each at least 1, or None if the bot never slaps by mistake.
+        """
+
+        if(not self.false_slap_rate):
+            return None
+        # the number of cards until the first success of a false_slap_rate chance per card
+        return rng.geometric(self.false_slap_rate, size)
+
+class SlapGame(GameState):
+    """
+    This class is a game where every seat is a Bot that slaps.
+
+    Attributes:
+        bots (list): The Bot playing each seat.
+        rng (numpy.random.Generator): The random numbers the bots use.
+        pace (float): The seconds between cards, each pile can be slapped for this long.
+        max_turns (int): The number of cards after which the game stops unfinished.
+        table (bytes): The compiled slap table of the rules.
+        span (int): The number of combinations of the top cards the table looks at.
+        events (list): The heap of (time, seat, REACTION or FALSE_SLAP) slap events.
+        reactions (list): Each seat's sampled reaction times not yet used.
+        gaps (list): Each seat's sampled false slap gaps not yet used.
+        window (int): The slap table index of the top cards, kept up to date as cards land.
+        bottom (int): The rank of the bottom card, EMPTY for an empty pile.
+        bottom_weight (int): What the bottom rank is multiplied by in the index, 0 if no rule looks at it.
+        slapper (Player): The player who won the pile by slapping after the last card drawn, otherwise None.
+        good_slaps (list): The number of piles each seat won by slapping.
+        burns (list): The number of cards each seat burned for false slaps.
+    """
+
+    def __init__(self, bots, seed=None, rules=None, verbose=False, deck=None, pace=0.5, max_turns=100000, **options):
+        """
+        The constructor for SlapGame class.
+
+        Parameters:
+            bots (list): A Bot for each seat.
+            seed (int): The seed for the shuffle and the bots, None picks a random one.
+            rules (Rules): The rule settings, the number of players must match the bots.
+            verbose (bool): Whether to print the game as it is played.
+            deck (list): A shuffled deck of card codes to deal instead of shuffling one from seed.
+            pace (float): The seconds between cards.
+            max_turns (int): The number of cards after which the game stops unfinished.
+            options: log, game_id, counters and sink, passed on to GameState.
+        """
+
+        if(rules is None):
+            rules = Rules(players=len(bots))
+        if(len(bots) != rules.players):
+            raise ValueError(f"{len(bots)} bots for {rules.players} players")
+        super().__init__(seed, rules, verbose, deck, **options)
+        self.bots = list(bots)
+        self.rng = np.random.default_rng(seed)
+        self.pace = pace
+        self.max_turns = max_turns
+        self.table = rules.slaps.table
+        self.span = rules.slaps.span
+        self.window = self.span - 1
+        self.bottom = EMPTY
+        self.bottom_weight = self.span if rules.slaps.uses_bottom else 0
+        self.slapper = None
+        self.good_slaps = [0] * len(bots)
+        self.burns = [0] * len(bots)
+        self.reactions = [[] for _ in bots]
+        self.gaps = [[] for _ in bots]
+        self.events = []
+        for seat in range(len(bots)):
+            self.schedule_false_slap(seat, self.rng.random() * pace)
+
+    def schedule_false_slap(self, seat, after):
+        """
+        This function puts the seat's next false slap on the heap.
+
+        Parameters:
+            seat (int): The seat of the bot.
+            after (float): The time of its last false slap.
+        """
+
+        gaps = self.gaps[seat]
+        if(not gaps):
+            sampled = self.bots[seat].false_slap_gaps(self.rng, BLOCK)
+            if(sampled is None):
+                return
+            gaps.extend(sampled.tolist())
+        heappush(self.events, (after + gaps.pop() * self.pace, seat, FALSE_SLAP))
+
+    def place(self, card):
+        """
+        This function updates the slap table index for a card put on top of the pile.
+
+        Parameters:
+            card (int): The code of the card.
+        """
+
+        # the old top card moves up a digit and the card past the window drops off
+        self.window = self.window * RADIX % self.span + RANK[card]
+        if(self.bottom == EMPTY):
+            self.bottom = RANK[card]
+
+    def is_slappable(self):
+        """
+        This function checks the pile against the slap rules, like Pile.is_valid_slap but from the kept index.
+
+        Returns:
+            A boolean.
+        """
+
+        return self.table[self.window + self.bottom * self.bottom_weight] == 1
+
+    def draw(self, player):
+        """
+        This function draws like GameState.draw, then plays out the slaps until the next card.
+        The player who won the pile by slapping, if anyone did, is left in slapper.
+
+        Parameters:
+            player (Player): The player drawing.
+
+        Returns:
+            card (int): The code of the card drawn.
+        """
+
+        # GameState.draw, Player.draw_card and place written out, since this runs for every card
+        self.turns += 1
+        hand = player.hand
+        slappable = False
+        if(hand):
+            card = hand.popleft()
+            self.pile.pile.appendleft(card)
+            rank = RANK[card]
+            self.window = window = self.window * RADIX % self.span + rank
+            if(self.bottom == EMPTY):
+                self.bottom = rank
+            slappable = self.table[window + self.bottom * self.bottom_weight]
+        else:
+            card = JOKER
+        if(self.sink is not None):
+            self.sink.emit("draw", player=player.player, card=card)
+        # most cards cannot be slapped and land before any false slap is due, so nothing more happens
+        events = self.events
+        if(slappable or (events and events[0][0] < (self.turns + 1) * self.pace)):
+            self.slapper = self.slap_window(slappable)
+        else:
+            self.slapper = None
+        return card
+
+    def capture(self, player):
+        """
+        This function captures like GameState.capture and empties the slap table index.
+
+        Parameters:
+            player (Player): The player winning the pile.
+        """
+
+        GameState.capture(self, player)
+        self.window = self.span - 1
+        self.bottom = EMPTY
+
+    def slap_window(self, slappable):
+        """
+        This function plays out every slap from the card landing until the next card does.
+
+        Parameters:
+            slappable (bool): Whether the card just drawn made the pile slappable.
+
+        Returns:
+            The Player who won the pile by slapping, or None.
+        """
+
+        now = self.turns * self.pace
+        end = now + self.pace
+        events = self.events
+        if(slappable):
+            self.react(now, end)
+
+        winner = None
+        while events and events[0][0] < end:
+            when, seat, kind = heappop(events)
+            if(kind == FALSE_SLAP):
+                self.schedule_false_slap(seat, when)
+            # once the pile is won the rest of the slaps hit an empty pile and do nothing
+            if(winner is not None or not self.pile.pile):
+                continue
+            player = self.players[seat]
+            if(self.is_slappable()):
+                winner = player
+                self.slap_capture(player)
+            elif(player.hand):
+                self.burn(player)
+                # a burned card can make the pile slappable, and the bots react to it like to a drawn card
+                if(self.is_slappable()):
+                    self.react(when, end)
+        return winner
+
+    def react(self, now, end):
+        """
+        This function draws every bot's reaction to a pile that just became slappable and schedules the fastest,
+        since any slower one would find the pile already taken.
+
+        Parameters:
+            now (float): When the pile became slappable.
+            end (float): When the next card lands, a slap after it is too late.
+        """
+
+        fastest = end - now
+        for seat, reactions in enumerate(self.reactions):
+            if(not reactions):
+                reactions.extend(self.bots[seat].reaction_times(self.rng, BLOCK).tolist())
+            reaction = reactions.pop()
+            if(reaction < fastest):
+                fastest = reaction
+                fastest_seat = seat
+        # a miss is inf, so it is never the fastest
+        if(fastest < end - now):
+            heappush(self.events, (now + fastest, fastest_seat, REACTION))
+
+    def slap_capture(self, player):
+        """
+        This function gives the pile to a player who slapped it.
+
+        Parameters:
+            player (Player): The player who slapped.
+        """
+
+        self.good_slaps[player.player - 1] += 1
+        if(self.sink is not None):
+            self.sink.emit("slap", player=player.player, good=True)
+        if(self.log is not None):
+            self.log.slap(self.game_id, self.turns, player.player - 1, self.pile.pile[0], len(self.pile.pile))
+        # not self.capture, so a logged game records this as a slap rather than the end of a chain
+        type(self).capture(self, player)
+
+    def burn(self, player):
+        """
+        This function puts the top card of a player's hand on the pile for a false slap.
+
+        Parameters:
+            player (Player): The player who slapped.
+        """
+
+        card = player.hand.popleft()
+        self.pile.add_card_to_pile(card)
+        self.place(card)
+        self.burns[player.player - 1] += 1
+        if(self.sink is not None):
+            self.sink.emit("burn", player=player.player, card=card)
+        if(self.log is not None):
+            self.log.burn(self.game_id, self.turns, player.player - 1, card)
+
+    def do_face_card(self, player_turn, times):
+        """
+        This function makes the next player pay the penalty for a face card, with slaps after every card.
+
+        Parameters:
+            player_turn (Player): The player who placed the face card.
+            times (int): The number of cards the next player must draw.
+
+        Returns:
+            player_drawing (Player): The player who paid the penalty.
+            current_card (int): The code of the last card drawn, or the Joker if the chain ended early.
+            slapper (Player): The player who slapped the pile during the chain, or None.
+        """
+
+        player_drawing = self.next_player(player_turn)
+        penalty = self.rules.penalty
+        x = 0
+        while x < times:
+            current_card = self.draw(player_drawing)
+            if(self.slapper is not None):
+                return player_drawing, JOKER, self.slapper
+            if(self.is_game_over()):
+                self.capture(player_turn)
+                return player_drawing, JOKER, None
+
+            if(penalty[current_card]):
+                return player_drawing, current_card, None
+            x += 1
+
+        self.capture(player_turn)
+        return player_drawing, current_card, None
+
+    def play_rounds(self):
+        """
+        This function plays rounds until one player holds all the cards, nobody takes a last slappable pile,
+        or max_turns cards have been drawn.
+        """
+
+        player_turn = self.players[0]
+        penalty = self.rules.penalty
+        while self.turns < self.max_turns:
+            current_card = self.draw(player_turn)
+            slapper = self.slapper
+            if(slapper is None):
+                if(self.is_game_over()):
+                    break
+                times = penalty[current_card]
+                if(not times):
+                    player_turn = self.next_player(player_turn)
+                    continue
+
+                if(self.sink is not None):
+                    self.sink.emit("face_chain")
+                while times:
+                    player_drawing, current_card, slapper = self.do_face_card(player_turn, times)
+                    times = penalty[current_card]
+                    if(times):
+                        player_turn = player_drawing
+
+            # a slap ends the round like a chain, and the slapper starts the next one
+            if(slapper is not None):
+                player_turn = slapper
+            if(self.sink is not None):
+                self.sink.emit("round", player=player_turn.player, counts=self.hand_counts())
+            if(self.is_game_over()):
+                break
+
+    def step(self):
+        """
+        This function plays the next card of the game and the slaps until the card after it, the same card and
+        slaps play would, and stops. A slap ends the round, and the slapper draws next.
+
+        Returns:
+            The code of the card drawn, or None if the game is already over.
+        """
+
+        if(self.source is not None):
+            self.materialize()
+        if(self.over):
+            return None
+        if(not self.stepped):
+            self.begin()
+
+        player = self.turn
+        owner = self.owner
+        # like play_rounds, the game only stops at max_turns between rounds
+        if(owner is None and self.turns >= self.max_turns):
+            self.finish()
+            return None
+        card = self.draw(player)
+        if(self.slapper is not None):
+            # a slap ends the round like a chain, and the slapper starts the next one
+            self.owner = self.slapper
+            self.end_round()
+            return card
+        if(self.is_game_over()):
+            if(owner is None):
+                self.finish()
+            else:
+                self.capture(owner)
+                self.end_round()
+            return card
+
+        times = self.rules.penalty[card]
+        if(times):
+            # a face card starts a penalty or moves it on to the next player
+            if(owner is None and self.sink is not None):
+                self.sink.emit("face_chain")
+            self.owner = player
+            self.owed = times
+            self.turn = self.next_player(player)
+        elif(owner is None):
+            self.turn = self.next_player(player)
+        else:
+            self.owed -= 1
+            if(not self.owed):
+                # the penalty was paid in number cards, so whoever placed the last face card wins the pile
+                self.capture(owner)
+                self.end_round()
+        return card
+
+    def checkpoint(self, player_turn):
+        """
+        This function does nothing, since a bot game coming back to a state does not mean it repeats forever.
+
+        Parameters:
+            player_turn (Player): The player about to draw.
+        """
+
+    def snapshot(self):
+        """
+        This function freezes the game as it is now, with the bots' pending slaps and random numbers.
+
+        Returns:
+            A SlapSnapshot.
+        """
+
+        if(self.source is not None):
+            return self.source
+        return SlapSnapshot(self)
+
+    def result(self):
+        """
+        This function summarizes the game so far.
+
+        Returns:
+            A GameResult, the winner is 0 if the game stopped at max_turns.
+        """
+
+        if(not self.is_game_over()):
+            return GameResult(0, self.turns, self.captures)
+        return super().result()
+
+class SlapSnapshot(Snapshot):
+    """
+    This class is a frozen copy of a bot game part way through. Every game forked from it gets its own copy of the
+    bots' pending slaps and random numbers, so each fork plays on exactly as the game would have.
+
+    Attributes:
+        bots (list): The Bot playing each seat.
+        rng (numpy.random.Generator): The bots' random numbers, never drawn from, each fork copies it.
+        pace (float): The seconds between cards.
+        max_turns (int): The number of cards after which the game stops unfinished.
+        events (tuple): The heap of slap events.
+        reactions (tuple): Each seat's sampled reaction times not yet used, as tuples.
+        gaps (tuple): Each seat's sampled false slap gaps not yet used, as tuples.
+        window (int): The slap table index of the top cards.
+        bottom (int): The rank of the bottom card, EMPTY for an empty pile.
+        good_slaps (tuple): The number of piles each seat won by slapping.
+        burns (tuple): The number of cards each seat burned for false slaps.
+    """
+
+    def __init__(self, game):
+        """
+        The constructor for SlapSnapshot class.
+
+        Parameters:
+            game (SlapGame): The game to copy.
+        """
+
+        super().__init__(game)
+        self.bots = game.bots
+        self.rng = copy.deepcopy(game.rng)
+        self.pace = game.pace
+        self.max_turns = game.max_turns
+        self.events = tuple(game.events)
+        self.reactions = tuple(tuple(reactions) for reactions in game.reactions)
+        self.gaps = tuple(tuple(gaps) for gaps in game.gaps)
+        self.window = game.window
+        self.bottom = game.bottom
+        self.good_slaps = tuple(game.good_slaps)
+        self.burns = tuple(game.burns)
+
+    def fork(self, sink=None):
+        """
+        This function starts a new bot game from the snapshot.
+
+        Parameters:
+            sink (EventSink): Where the new game sends its events, None to send nothing.
+
+        Returns:
+            A SlapGame.
+        """
+
+        game = super().fork(sink)
+        game.rng = copy.deepcopy(self.rng)
+        # a tuple of heap entries in heap order is still a heap once it is a list again
+        game.events = list(self.events)
+        game.reactions = [list(reactions) for reactions in self.reactions]
+        game.gaps = [list(gaps) for gaps in self.gaps]
+        game.window = self.window
+        game.bottom = self.bottom
+        game.good_slaps = list(self.good_slaps)
+        game.burns = list(self.burns)
+        return game
+
+    def new_game(self, sink):
+        """
+        This function makes the empty bot game a fork fills in.
+
+        Parameters:
+            sink (EventSink): Where the new game sends its events, None to send nothing.
+
+        Returns:
+            A SlapGame with no cards.
+        """
+
+        # the seed only saves gathering entropy for random numbers fork replaces anyway
+        return SlapGame(self.bots, 0, self.rules, deck=[], pace=self.pace, max_turns=self.max_turns, sink=sink)
+
+# plays one game with the given bots and returns its result
+def run_bot_game(bots, seed=None, rules=None, **options):
+    return SlapGame(bots, seed, rules, **options).play()
+
+def main():
+    parser = argparse.ArgumentParser(description="Play ERS games between slapping bots and time them.")
+    parser.add_argument("--games", type=int, default=200, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest follow in order")
+    parser.add_argument("--players", type=int, default=2, choices=range(2, MAX_PLAYERS + 1), help="bots per game")
+    parser.add_argument("--decks", type=int, default=1, choices=range(1, MAX_DECKS + 1), help="decks in the shoe")
+    parser.add_argument("--reaction", type=float, default=0.35, help="median reaction time of every bot in seconds")
+    parser.add_argument("--miss-rate", type=float, default=0.1, help="chance a bot misses a slappable pile")
+    parser.add_argument("--false-slap-rate", type=float, default=0.005, help="chance a bot slaps by mistake per card")
+    args = parser.parse_args()
+
+    rules = Rules(players=args.players, decks=args.decks)
+    bots = [Bot(args.reaction, miss_rate=args.miss_rate, false_slap_rate=args.false_slap_rate)
+            for _ in range(args.players)]
+    seeds = range(args.seed, args.seed + args.games)
+
+    start = time.perf_counter()
+    plain_turns = sum(GameState(seed, rules).play().turns for seed in seeds)
+    plain = time.perf_counter() - start
+
+    wins = [0] * (args.players + 1)
+    turns = slaps = burns = 0
+    start = time.perf_counter()
+    for seed in seeds:
+        game = SlapGame(bots, seed, rules)
+        result = game.play()
+        wins[result.winner] += 1
+        turns += result.turns
+        slaps += sum(game.good_slaps)
+        burns += sum(game.burns)
+    slapping = time.perf_counter() - start
+
+    print(f"games: {args.games}")
+    for player in range(1, args.players + 1):
+        print(f"player {player} wins: {wins[player]} ({wins[player] / args.games:.4f})")
+    print(f"unfinished: {wins[0]}")
+    print(f"mean turns: {turns / args.games:.1f}, good slaps {slaps / args.games:.1f} and burns "
+          f"{burns / args.games:.1f} per game")
+    print(f"ns per card: {slapping / turns * 1e9:,.0f} with slapping, {plain / plain_turns * 1e9:,.0f} without")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Deal to outcome cache.
+
+With no slapping a game's outcome depends only on the shuffled deck and the rules, so a sweep that plays the same
+deals again can look the outcome up instead. The key is the deck's card codes as bytes, one byte per card, plus
+Rules.fingerprint. Recently used outcomes are kept in an in-memory LRU and everything is stored in a SQLite
+file that persists between runs.
+"""
+
+import sqlite3
+from collections import OrderedDict
+
+from ers.engine import GameResult
+
+class OutcomeCache:
+    """
+    This class stores the outcome of every deal played, in memory and optionally on disk.
+
+    Attributes:
+        capacity (int): The number of outcomes kept in memory.
+        memory (OrderedDict): The most recently used outcomes, oldest first.
+        connection (sqlite3.Connection): The on-disk store, None for a memory only cache.
+        unsaved (list): Outcomes not yet written to disk.
+        memory_hits (int): The number of lookups answered from memory.
+        disk_hits (int): The number of lookups answered from disk.
+        misses (int): The number of lookups that found nothing.
+    """
+
+    def __init__(self, path=None, capacity=100000):
+        """
+        The constructor for OutcomeCache class.
+
+        Parameters:
+            path (str): The SQLite file to use, created if needed, None keeps outcomes in memory only.
+            capacity (int): The number of outcomes kept in memory.
+        """
+
+        self.capacity = capacity
+        self.memory = OrderedDict()
+        self.connection = None
+        self.unsaved = []
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if(path is not None):
+            # WAL lets several worker processes read while one writes, the timeout waits out their writes
+            self.connection = sqlite3.connect(path, timeout=60)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS outcomes (
+                rules TEXT, deal BLOB, winner INTEGER, turns INTEGER, captures INTEGER,
+                cycle_start INTEGER, cycle_length INTEGER, PRIMARY KEY (rules, deal)) WITHOUT ROWID""")
+
+    def get(self, deck, rules):
+        """
+        This function looks up the outcome of a deal.
+
+        Parameters:
+            deck (list): The shuffled card codes, a list or an int8 array.
+            rules (Rules): The rules the deal is played with.
+
+        Returns:
+            A GameResult, or None if the deal has not been played.
+        """
+
+        key = (rules.fingerprint, bytes(deck))
+        row = self.memory.get(key)
+        if(row is not None):
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return GameResult(*row)
+
+        if(self.connection is not None):
+            row = self.connection.execute(
+                "SELECT winner, turns, captures, cycle_start, cycle_length FROM outcomes WHERE rules = ? AND deal = ?",
+                key).fetchone()
+            if(row is not None):
+                self.disk_hits += 1
+                self.remember(key, row)
+                return GameResult(*row)
+
+        self.misses += 1
+        return None
+
+    def put(self, deck, rules, result):
+        """
+        This function stores the outcome of a deal. It reaches disk on the next flush.
+
+        Parameters:
+            deck (list): The shuffled card codes, a list or an int8 array.
+            rules (Rules): The rules the deal was played with.
+            result (GameResult): The outcome.
+        """
+
+        key = (rules.fingerprint, bytes(deck))
+        row = (result.winner, result.turns, result.captures, result.cycle_start, result.cycle_length)
+        self.remember(key, row)
+        if(self.connection is not None):
+            self.unsaved.append(key + row)
+
+    def remember(self, key, row):
+        """
+        This function adds an outcome to the in-memory LRU, dropping the least recently used one when full.
+
+        Parameters:
+            key (tuple): The rules fingerprint and deal bytes.
+            row (tuple): The winner, turns, captures, cycle start and cycle length.
+        """
+
+        self.memory[key] = row
+        self.memory.move_to_end(key)
+        if(len(self.memory) > self.capacity):
+            self.memory.popitem(last=False)
+
+    def flush(self):
+        """
+        This function writes the unsaved outcomes to disk in one transaction.
+        """
+
+        if(self.connection is not None and self.unsaved):
+            with self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?)", self.unsaved)
+            self.unsaved = []
+
+    def close(self):
+        """
+        This function flushes and closes the on-disk store.
+        """
+
+        self.flush()
+        if(self.connection is not None):
+            self.connection.close()
+            self.connection = None
+
+    def stats(self):
+        """
+        This function gives the hit and miss counters.
+
+        Returns:
+            A dict with memory_hits, disk_hits and misses.
+        """
+
+        return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses}
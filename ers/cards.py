@@ -0,0 +1,91 @@
+"""
+Compact card encoding shared by every engine.
+
+A card is the small int rank * 4 + suit, where rank indexes VALUES and suit indexes SUITS. Everything the rules
+need to know about a card is precomputed into tuples indexed by that int, so rule checks are lookups instead of
+string comparisons. Card objects are only needed for display and are interned in the CARDS table.
+"""
+
+# the suits and values used to build a full deck
+SUITS = ('♦', '♥', '♣', '♠')
+VALUES = ('Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King')
+
+DECK_SIZE = len(SUITS) * len(VALUES)
+
+# drawn from an empty hand to indicate that someone won, it has its own rank so it never matches a real card
+JOKER = DECK_SIZE
+
+# rank numbers for the cards the rules single out
+ACE = VALUES.index('Ace')
+JACK = VALUES.index('Jack')
+QUEEN = VALUES.index('Queen')
+KING = VALUES.index('King')
+
+# the number of times the other player should draw for each face card
+DEFAULT_PENALTIES = {"Ace": 4, "King": 3, "Queen": 2, "Jack": 1}
+
+# lookup tables indexed by card code, the last entry of each is the Joker
+RANK = tuple(code // 4 for code in range(DECK_SIZE)) + (len(VALUES),)
+SUIT = tuple(code % 4 for code in range(DECK_SIZE)) + (len(SUITS),)
+IS_FACE = tuple(VALUES[RANK[code]] in DEFAULT_PENALTIES for code in range(DECK_SIZE)) + (False,)
+
+# returns the card code for a value and suit
+def encode(value, suit):
+    return VALUES.index(value) * 4 + SUITS.index(suit)
+
+# returns a tuple giving the number of draws owed for each card code, 0 for number cards and the Joker
+def penalty_table(penalties):
+    return tuple(penalties.get(VALUES[RANK[code]], 0) for code in range(DECK_SIZE)) + (0,)
+
+PENALTY = penalty_table(DEFAULT_PENALTIES)
+
+class Card:
+    """
+    This class is the display view of a card code.
+
+    Attributes:
+        value (str): The number/letter on the card.
+        suit (str): The suit of the card.
+        code (int): The card code, rank * 4 + suit.
+    """
+
+    __slots__ = ("value", "suit", "code")
+
+    def __init__(self, value, suit):
+        """
+        The constructor for Card class.
+
+        Parameters:
+            value (str): The number/letter on the card.
+            suit (str): The suit of the card.
+        """
+
+        self.value = value
+        self.suit = suit
+        if(value in VALUES and suit in SUITS):
+            self.code = encode(value, suit)
+        else:
+            self.code = JOKER
+
+    def __str__(self):
+        """
+        The function to print a Card object.
+
+        Returns:
+            A string containing its value followed by the suit.
+        """
+
+        return f"({self.value}, {self.suit})"
+
+    def is_face_card(self):
+        """
+        This function checks if a card is a Jack, Queen, King, or Ace.
+
+        Returns:
+            A boolean.
+        """
+
+        return IS_FACE[self.code]
+
+# one shared Card for every code, indexed by card code
+CARDS = tuple(Card(VALUES[RANK[code]], SUITS[SUIT[code]]) for code in range(DECK_SIZE)) + (Card("Joker", "Joker"),)
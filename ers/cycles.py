@@ -0,0 +1,71 @@
+"""
+Detects games that loop forever.
+
+Without slaps the game is deterministic, so once a game's state repeats it will repeat forever. Every cycle has
+to pass through the moments a pile is captured (or, when nobody has cards left, through the empty-handed draws),
+so the state is only checked at those checkpoints. There the state is small: whose turn it is, each hand, and
+the pile, which is empty after a capture.
+
+Brent's algorithm keeps a single saved state and compares every checkpoint against it exactly, doubling the
+distance between saves, so a game with a cycle of length L starting at checkpoint m is caught within about
+m + 2L checkpoints and memory stays constant. The first repeat found is usually some way into the cycle, so
+engine.find_cycle_start finds where it really starts, to the card, by replaying the game twice with one copy L cards
+ahead of the other until the two are in the same position.
+"""
+
+from copy import copy
+
+class CycleFound(Exception):
+    """
+    Raised inside a game when its state repeats, to unwind the game loop.
+    """
+
+class CycleDetector:
+    """
+    This class finds a cycle in the checkpoint states of a game with Brent's algorithm.
+
+    Attributes:
+        saved (tuple): The state being compared against, replaced every time power doubles.
+        saved_turn (int): The turn the saved state was taken on.
+        power (int): The number of checkpoints to compare before replacing saved.
+        length (int): The number of checkpoints since saved was taken.
+        rounds (int): The cycle length in checkpoints once found.
+        turns (int): The cycle length in cards drawn once found.
+    """
+
+    def __init__(self):
+        """
+        The constructor for CycleDetector class.
+        """
+
+        self.saved = None
+        self.saved_turn = 0
+        self.power = 1
+        self.length = 0
+        self.rounds = None
+        self.turns = None
+
+    def check(self, state, turn):
+        """
+        This function takes the state at each checkpoint.
+
+        Parameters:
+            state (tuple): The turn number and deques describing the game, compared with ==.
+            turn (int): The number of cards drawn so far.
+
+        Returns:
+            True once the state repeats.
+        """
+
+        self.length += 1
+        if(state == self.saved):
+            self.rounds = self.length
+            self.turns = turn - self.saved_turn
+            return True
+        if(self.length == self.power):
+            # copies the deques so later play does not change the saved state
+            self.saved = tuple(copy(part) for part in state)
+            self.saved_turn = turn
+            self.power *= 2
+            self.length = 0
+        return False
@@ -0,0 +1,957 @@
+import hashlib
+import json
+import random
+from collections import deque
+from copy import copy
+from itertools import islice
+
+from ers.cards import DECK_SIZE, DEFAULT_PENALTIES, JOKER, RANK, penalty_table
+from ers.cycles import CycleDetector, CycleFound
+from ers.slaps import DEFAULT_SLAPS, EMPTY, compile_slaps, is_double, is_marriage, is_sandwich
+from ers.sinks import TextSink
+
+# create an instance for each player
+class Player:
+    """
+    This class represents the player and their data.
+
+    Attributes:
+        player (int): The order in which the players will play.
+        hand (deque): The card codes held by the player, index 0 is the next card drawn.
+    """
+
+    def __init__(self, player, hand):
+        """
+        The constructor for Player class.
+
+        Parameters:
+            player (int): The order in which the players will play.
+            hand (list): A list of card codes held by the player.
+        """
+
+        self.player = player
+        self.hand = deque(hand) # card codes, drawn from the left and collected on the right
+
+    def draw_card(self, pile):
+        """
+        This function draws the top card from the player hand and puts it in the pile.
+
+        Parameters:
+            pile (Pile): The middle pile of card codes.
+
+        Returns:
+            card (int): The code of the card drawn.
+        """
+
+        # prevents drawing from an empty hand
+        if(self.hand):
+            # remove the top card of the hand and add it to the pile
+            card = self.hand.popleft()
+            pile.add_card_to_pile(card)
+            return card
+
+        # if the hand is empty, return a Joker card to indicate that someone won
+        return JOKER
+
+# represents the middle pile
+class Pile:
+    """
+    This class represents the middle pile of cards.
+
+    Attributes:
+        pile (deque): The card codes in the middle pile, index 0 is the top card.
+        slaps (SlapTable): The compiled slap rules.
+    """
+
+    def __init__(self, pile, slaps=None):
+        """
+        The constructor for Pile class.
+
+        Parameters:
+            pile (list): A list of card codes in the middle pile, index 0 is the top card.
+            slaps (SlapTable): The compiled slap rules, defaults to double, sandwich and marriage.
+        """
+
+        if(slaps is None):
+            slaps = compile_slaps()
+        self.pile = deque(pile)
+        self.slaps = slaps
+
+    def add_card_to_pile(self, card):
+        """
+        This function appends the given card to the middle pile. It does not remove a card from the player hand.
+
+        Parameters:
+            card (int): The code of the top card drawn from the player's hand.
+        """
+
+        # index 0 is the top card, so the new card goes on the left
+        self.pile.appendleft(card)
+
+    def top_ranks(self):
+        """
+        This function gives the ranks the slap rules look at.
+
+        Returns:
+            A tuple of the top, second, third, fourth and bottom ranks, EMPTY where there is no card.
+        """
+
+        ranks = [RANK[card] for card in islice(self.pile, 4)]
+        ranks += [EMPTY] * (4 - len(ranks))
+        ranks.append(RANK[self.pile[-1]] if self.pile else EMPTY)
+        return tuple(ranks)
+
+    # slap rule that allows the player to take the pile if the top and second to top card are the same
+    def is_double(self):
+        """
+        This function checks if the top two cards are the same.
+
+        Returns:
+            A boolean.
+        """
+
+        return is_double(*self.top_ranks())
+
+    # slap rule that allows the player to take the pile if the top and third to top card are the same
+    def is_sandwich(self):
+        """
+        This function checks if the top card and third to top card are the same.
+
+        Returns:
+            A boolean.
+        """
+
+        return is_sandwich(*self.top_ranks())
+
+    # slap rule that allows the player to take the pile if the top card is a King and the second to top card is a Queen or vice versa
+    def is_marriage(self):
+        """
+        This function checks if the top two cards are King and Queen respectively or vice versa.
+
+        Returns:
+            A boolean.
+        """
+
+        return is_marriage(*self.top_ranks())
+
+    # returns true if any of the rules turned on are met
+    def is_valid_slap(self):
+        """
+        This function checks if a slap is valid, with one lookup in the compiled slap table.
+
+        Returns:
+            A boolean.
+        """
+
+        return self.slaps.table[self.slaps.index(self.pile)] == 1
+
+# the largest table and shoe supported, a full shoe of MAX_DECKS decks is 416 cards
+MAX_PLAYERS = 8
+MAX_DECKS = 8
+
+class Rules:
+    """
+    This class holds the rule settings shared by every game played with it.
+
+    Attributes:
+        penalties (dict): The number of cards the next player must draw for each face card value.
+        penalty (tuple): The same numbers indexed by card code, 0 for number cards.
+        slap_rules (tuple): The names of the slap rules turned on, from ers.slaps.SLAP_RULES.
+        slaps (SlapTable): The slap rules compiled into a lookup table.
+        players (int): The number of players, dealt in and taking turns in seat order.
+        decks (int): The number of full decks shuffled together into the shoe.
+        fingerprint (str): A short string that is the same for any two Rules with the same settings.
+    """
+
+    def __init__(self, penalties=None, slap_rules=None, players=2, decks=1):
+        """
+        The constructor for Rules class.
+
+        Parameters:
+            penalties (dict): Face card value to number of draws, defaults to Ace=4, King=3, Queen=2, Jack=1.
+            slap_rules (list): Names of the slap rules to turn on, defaults to double, sandwich and marriage.
+            players (int): The number of players, from 2 to MAX_PLAYERS.
+            decks (int): The number of decks in the shoe, from 1 to MAX_DECKS.
+        """
+
+        if(not 2 <= players <= MAX_PLAYERS):
+            raise ValueError(f"players must be between 2 and {MAX_PLAYERS}, got {players}")
+        if(not 1 <= decks <= MAX_DECKS):
+            raise ValueError(f"decks must be between 1 and {MAX_DECKS}, got {decks}")
+
+        if(penalties is None):
+            penalties = DEFAULT_PENALTIES
+        if(slap_rules is None):
+            slap_rules = DEFAULT_SLAPS
+        self.penalties = dict(penalties)
+        self.penalty = penalty_table(self.penalties)
+        self.slap_rules = tuple(slap_rules)
+        self.slaps = compile_slaps(self.slap_rules)
+        self.players = players
+        self.decks = decks
+        self.fingerprint = rules_fingerprint(self.settings())
+
+    def settings(self):
+        """
+        This function gives the settings the rules were built from.
+
+        Returns:
+            A dict that can be passed to json.
+        """
+
+        return {"penalties": self.penalties, "slaps": sorted(self.slap_rules), "players": self.players,
+                "decks": self.decks}
+
+# bump this whenever a change to the engine changes the outcome of a deal, so cached outcomes are not reused
+RULES_VERSION = 2
+
+# returns a short hex string identifying a set of rule settings and RULES_VERSION
+def rules_fingerprint(settings):
+    text = json.dumps([RULES_VERSION, settings], sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+DEFAULT_RULES = Rules()
+
+class GameResult:
+    """
+    This class holds the outcome of one finished game.
+
+    Attributes:
+        winner (int): The player number of the winner, 0 for an infinite game.
+        turns (int): The number of cards drawn over the whole game.
+        captures (int): The number of times a pile was won.
+        cycle_start (int): For an infinite game, the number of cards drawn before it starts repeating, 0 if it repeats
+            from the deal, otherwise None.
+        cycle_length (int): For an infinite game, the number of turns in its cycle, otherwise None.
+    """
+
+    def __init__(self, winner, turns, captures, cycle_start=None, cycle_length=None):
+        """
+        The constructor for GameResult class.
+
+        Parameters:
+            winner (int): The player number of the winner, 0 for an infinite game.
+            turns (int): The number of cards drawn over the whole game.
+            captures (int): The number of times a pile was won.
+            cycle_start (int): For an infinite game, the number of cards drawn before it starts repeating.
+            cycle_length (int): For an infinite game, the number of turns in its cycle.
+        """
+
+        self.winner = winner
+        self.turns = turns
+        self.captures = captures
+        self.cycle_start = cycle_start
+        self.cycle_length = cycle_length
+
+    def is_infinite(self):
+        """
+        This function checks if the game was stopped because it repeats forever.
+
+        Returns:
+            A boolean.
+        """
+
+        return self.cycle_length is not None
+
+    def __repr__(self):
+        """
+        The function to print a GameResult object.
+
+        Returns:
+            A string containing the winner, turns and captures, and the cycle for an infinite game.
+        """
+
+        if(self.is_infinite()):
+            return (f"GameResult(infinite, turns={self.turns}, captures={self.captures}, "
+                    f"cycle_start={self.cycle_start}, cycle_length={self.cycle_length})")
+        return f"GameResult(winner={self.winner}, turns={self.turns}, captures={self.captures})"
+
+#---------------------------------------------------------------------------------------------------------------------------------------
+# main functions
+
+# creates an unshuffled shoe of the given number of full decks of card codes, one deck and suit at a time
+def build_deck(decks=1):
+    deck = []
+    for _ in range(decks):
+        for suit in range(DECK_SIZE // 13):
+            for rank in range(13):
+                deck.append(rank * 4 + suit)
+    return deck
+
+# randomizes order of the initial deck before dealing to the players, in place, with a Fisher-Yates shuffle
+def shuffle_deck(deck, rng=random):
+    # walk down from the last card, swapping each with a card at or below it, so every order is equally likely
+    for x in range(len(deck) - 1, 0, -1):
+        r = rng.randrange(x + 1)
+        deck[x], deck[r] = deck[r], deck[x]
+
+# returns a full shoe shuffled by a Random seeded with the given seed, so every engine deals the same game for a seed
+def seeded_deck(seed, decks=1):
+    deck = build_deck(decks)
+    shuffle_deck(deck, random.Random(seed))
+    return deck
+
+# deals the top card to each player in turn, returns one hand per player, earlier seats get any extra cards
+def deal_cards(deck, players=2):
+    return [deck[seat::players] for seat in range(players)]
+
+# given a face card code, returns the number of times the next player should draw, 0 for any other card
+def count_times(card, rules=DEFAULT_RULES):
+    return rules.penalty[card]
+
+# replays the game dealt from deck twice, one copy the given number of cards ahead of the other, and returns the
+# first turn where both are in the same position, the turn the game's cycle of that many cards starts on
+def find_cycle_start(deck, rules, length):
+    behind = GameState(rules=rules, deck=deck)
+    ahead = GameState(rules=rules, deck=deck)
+    for replay in (behind, ahead):
+        # the replays already know the game repeats, so they must not stop at the repeat
+        replay.checkpoint = replay.skip_checkpoint
+    ahead.advance(length)
+    while behind.position() != ahead.position():
+        behind.step()
+        ahead.step()
+    return behind.turns
+
+class Snapshot:
+    """
+    This class is a frozen copy of a game part way through, that any number of games can be forked from.
+    The hands and the pile are kept as bytes, which every fork shares until it plays a card of its own.
+
+    Attributes:
+        rules (Rules): The rule settings of the game.
+        deck (list): The deck the game was dealt from, None if the game was changed by hand and no longer follows it.
+        hands (tuple): Each player's card codes as bytes, in turn order, index 0 is the next card drawn.
+        pile (bytes): The card codes in the middle pile, index 0 is the top card.
+        turn (int): The number of the player about to draw.
+        owner (int): The number of the player owed the pile at the end of the penalty being paid, 0 if none is.
+        owed (int): The number of cards still to draw for the penalty.
+        turns (int): The number of cards drawn so far.
+        captures (int): The number of piles won so far.
+        over (bool): Whether the game has ended.
+        infinite (bool): Whether the game was found to repeat forever.
+        watch (CycleDetector): The cycle detector's state.
+    """
+
+    def __init__(self, game):
+        """
+        The constructor for Snapshot class.
+
+        Parameters:
+            game (GameState): The game to copy.
+        """
+
+        self.rules = game.rules
+        self.deck = game.deck
+        self.hands = tuple(bytes(hand) for hand in game.hands)
+        self.pile = bytes(game.pile.pile)
+        self.turn = game.turn.player
+        self.owner = 0 if game.owner is None else game.owner.player
+        self.owed = game.owed
+        self.turns = game.turns
+        self.captures = game.captures
+        self.over = game.over
+        self.infinite = game.infinite
+        self.watch = copy(game.watch)
+
+    def fork(self, sink=None):
+        """
+        This function starts a new game from the snapshot. The game reads the snapshot's hands and pile until it
+        changes them, and only then copies them.
+
+        Parameters:
+            sink (EventSink): Where the new game sends its events, None to send nothing.
+
+        Returns:
+            A GameState.
+        """
+
+        game = self.new_game(sink)
+        game.deck = self.deck
+        for player, hand in zip(game.players, self.hands):
+            player.hand = hand
+        game.hands = self.hands
+        game.pile.pile = self.pile
+        game.source = self
+        game.turn = game.players[self.turn - 1]
+        game.owner = game.players[self.owner - 1] if self.owner else None
+        game.owed = self.owed
+        game.turns = self.turns
+        game.captures = self.captures
+        game.over = self.over
+        game.infinite = self.infinite
+        game.watch = copy(self.watch)
+        game.stepped = True
+        return game
+
+    def new_game(self, sink):
+        """
+        This function makes the empty game a fork fills in. Snapshots of other kinds of game override it.
+
+        Parameters:
+            sink (EventSink): Where the new game sends its events, None to send nothing.
+
+        Returns:
+            A GameState with no cards.
+        """
+
+        return GameState(rules=self.rules, deck=[], sink=sink)
+
+class GameState:
+    """
+    This class holds everything one game needs, so any number of games can be played in the same interpreter.
+
+    Attributes:
+        rules (Rules): The rule settings for the game.
+        players (list): The Player objects, in turn order.
+        hands (tuple): Each player's hand deque, in turn order.
+        pile (Pile): The middle pile.
+        turns (int): The number of cards drawn so far.
+        captures (int): The number of piles won so far.
+        sink (EventSink): Where the game's events are sent as it is played, None to send nothing.
+        deck (list): The shuffled deck the game was dealt from.
+        watch (CycleDetector): Checks the state at every checkpoint for a repeat.
+        infinite (bool): Whether the game was found to repeat forever.
+        log (EventLog): Where the game's events are logged, None to log nothing.
+        game_id (int): The game id the events are logged under.
+        counters (GameCounters): What counts and times the game, None to count nothing.
+        turn (Player): The player about to draw, when played with step.
+        owner (Player): The player owed the pile at the end of the penalty being paid, None if no penalty is owed.
+        owed (int): The number of cards still to draw for the penalty.
+        over (bool): Whether the game has ended.
+        stepped (bool): Whether the game has been played with step rather than play.
+        source (Snapshot): The snapshot whose hands and pile the game still reads, None once it has its own.
+        cycle (GameResult): The result of an infinite game, kept so the start of its cycle is only found once.
+    """
+
+    def __init__(self, seed=None, rules=None, verbose=False, deck=None, log=None, game_id=0, counters=None, sink=None):
+        """
+        The constructor for GameState class. Builds, shuffles and deals a fresh deck.
+
+        Parameters:
+            seed (int): The seed for the shuffle, None picks a random one.
+            rules (Rules): The rule settings, defaults to DEFAULT_RULES.
+            verbose (bool): Whether to print the game as it is played, with a TextSink if no sink is given.
+            deck (list): A shuffled deck of card codes to deal instead of shuffling one from seed.
+            log (EventLog): Where to log the game's events, None to log nothing.
+            game_id (int): The game id to log the events under.
+            counters (GameCounters): What to count and time the game with, None to count nothing.
+            sink (EventSink): Where to send the game's events as it is played, None or a NullSink to send nothing.
+        """
+
+        if(rules is None):
+            rules = DEFAULT_RULES
+        self.rules = rules
+        if(deck is None):
+            deck = seeded_deck(seed, rules.decks)
+        self.deck = deck
+        self.players = [Player(seat + 1, hand) for seat, hand in enumerate(deal_cards(deck, rules.players))]
+        self.hands = tuple(player.hand for player in self.players)
+        self.pile = Pile([], rules.slaps)
+        self.turns = 0
+        self.captures = 0
+        if(verbose and sink is None):
+            sink = TextSink()
+        # a NullSink is the same as no sink, so a game without one never builds an event
+        self.sink = sink if sink is not None and sink.active else None
+        self.watch = CycleDetector()
+        self.infinite = False
+        self.log = log
+        self.game_id = game_id
+        if(log is not None):
+            # only a logged game pays for logging, its draw and capture are swapped for ones that log
+            self.draw = self.logged_draw
+            self.capture = self.logged_capture
+        self.counters = counters
+        if(counters is not None):
+            counters.attach(self)
+        self.turn = self.players[0]
+        self.owner = None
+        self.owed = 0
+        self.over = False
+        self.stepped = False
+        self.source = None
+        self.cycle = None
+
+    def next_player(self, player):
+        """
+        This function gives the player whose turn comes after the given player, skipping players with no cards.
+        If nobody else holds cards, the next seat plays anyway and draws the Joker.
+
+        Parameters:
+            player (Player): The current player.
+
+        Returns:
+            The next Player.
+        """
+
+        # player numbers start at 1, so the next seat's index is the player number
+        seats = len(self.players)
+        following = self.players[player.player % seats]
+        if(following.hand or seats == 2):
+            return following
+        for step in range(1, seats - 1):
+            skipping = self.players[(player.player + step) % seats]
+            if(skipping.hand):
+                return skipping
+        return following
+
+    def draw(self, player):
+        """
+        This function has the given player draw one card onto the pile.
+
+        Parameters:
+            player (Player): The player drawing.
+
+        Returns:
+            card (int): The code of the card drawn.
+        """
+
+        self.turns += 1
+        card = player.draw_card(self.pile)
+        if(self.sink is not None):
+            self.sink.emit("draw", player=player.player, card=card)
+        return card
+
+    def capture(self, player):
+        """
+        This function adds the whole pile to the bottom of the given player's hand and clears it.
+
+        Parameters:
+            player (Player): The player winning the pile.
+        """
+
+        player.hand.extend(self.pile.pile)
+        self.pile.pile.clear()
+        self.captures += 1
+
+    def logged_draw(self, player):
+        """
+        This function draws like draw and logs the card, and the start of a penalty if it is a face card.
+
+        Parameters:
+            player (Player): The player drawing.
+
+        Returns:
+            card (int): The code of the card drawn.
+        """
+
+        card = type(self).draw(self, player)
+        self.log.draw(self.game_id, self.turns, player.player - 1, card)
+        times = self.rules.penalty[card]
+        if(times):
+            self.log.face(self.game_id, self.turns, player.player - 1, card, times)
+        return card
+
+    def logged_capture(self, player):
+        """
+        This function captures like capture and logs the size of the pile won.
+
+        Parameters:
+            player (Player): The player winning the pile.
+        """
+
+        pile = self.pile.pile
+        self.log.capture(self.game_id, self.turns, player.player - 1, pile[0], len(pile))
+        type(self).capture(self, player)
+
+    # at the start of a round, stop the game if this state has been seen before
+    def checkpoint(self, player_turn):
+        """
+        This function checks the state for a repeat, right before player_turn draws with no penalty owed.
+
+        Parameters:
+            player_turn (Player): The player about to draw.
+        """
+
+        state = (player_turn.player, self.pile.pile) + self.hands
+        if(self.watch.check(state, self.turns)):
+            raise CycleFound()
+
+    def skip_checkpoint(self, player_turn):
+        """
+        This function does nothing, a checkpoint for replays of a game already known to repeat.
+
+        Parameters:
+            player_turn (Player): The player about to draw.
+        """
+
+    # if fewer than two players hold cards, return true
+    def is_game_over(self):
+        """
+        This function checks if at most one player still holds cards.
+
+        Returns:
+            A boolean.
+        """
+
+        holding = 0
+        for hand in self.hands:
+            if(hand):
+                holding += 1
+                if(holding == 2):
+                    return False
+        return True
+
+    # next player after the one who placed the face card draws x amount of times until they draw a face card or draw all number cards
+    def do_face_card(self, player_turn, times):
+        """
+        This function makes the next player pay the penalty for a face card.
+
+        Parameters:
+            player_turn (Player): The player who placed the face card.
+            times (int): The number of cards the next player must draw.
+
+        Returns:
+            player_drawing (Player): The player who paid the penalty.
+            current_card (int): The code of the last card drawn, or the Joker if the game ended during the penalty.
+        """
+
+        player_drawing = self.next_player(player_turn)
+        penalty = self.rules.penalty
+        x = 0
+        while x < times:
+            current_card = self.draw(player_drawing)
+            # checks for an empty hand and invalid slap to ensure that the game is over
+            if(self.is_game_over() and not self.pile.is_valid_slap()):
+                self.capture(player_turn)
+                return player_drawing, JOKER
+
+            # if a face card is drawn, return appropriate input data for the next execution of do_face_card, otherwise keep drawing
+            if(penalty[current_card]):
+                return player_drawing, current_card
+            x += 1
+
+        # if only number cards are drawn, add the pile to the bottom of the hand of the player who drew the face card
+        self.capture(player_turn)
+        # return a number card to indicate the round has been won, the person who drew the face card starts the round again
+        return player_drawing, current_card
+
+    def play(self):
+        """
+        This function plays the game until one player holds all the cards or the game starts repeating.
+
+        Returns:
+            A GameResult.
+        """
+
+        # a game already played with step, or forked, carries on from where it is
+        if(self.stepped):
+            self.advance()
+            return self.result()
+
+        if(self.sink is not None):
+            self.sink.emit("start", counts=self.hand_counts())
+        try:
+            self.play_rounds()
+        except CycleFound:
+            self.infinite = True
+        return self.finish()
+
+    def finish(self):
+        """
+        This function ends the game and sends its last event.
+
+        Returns:
+            A GameResult.
+        """
+
+        self.over = True
+        result = self.result()
+        if(self.sink is not None):
+            if(result.is_infinite()):
+                self.sink.emit("infinite", cycle_length=result.cycle_length, cycle_start=result.cycle_start)
+            else:
+                self.sink.emit("winner", player=result.winner)
+        return result
+
+    def play_rounds(self):
+        """
+        This function plays rounds until one player holds all the cards. The checkpoints stop it by raising CycleFound.
+        """
+
+        player_turn = self.players[0]
+        penalty = self.rules.penalty
+        while True:
+            current_card = self.draw(player_turn)
+
+            # checks for an empty hand and invalid slap to ensure that the game is over
+            if(self.is_game_over() and not self.pile.is_valid_slap()):
+                break
+
+            times = penalty[current_card]
+            if(not times):
+                # switch player turn
+                player_turn = self.next_player(player_turn)
+                # an empty hand changes nothing, so these draws can repeat without a capture
+                if(current_card == JOKER):
+                    self.checkpoint(player_turn)
+                continue
+
+            if(self.sink is not None):
+                self.sink.emit("face_chain")
+            # keep executing do_face_card, each face card drawn moves the penalty on, until a number card is drawn
+            while times:
+                player_drawing, current_card = self.do_face_card(player_turn, times)
+                times = penalty[current_card]
+                if(times):
+                    player_turn = player_drawing
+
+            if(self.sink is not None):
+                self.sink.emit("round", player=player_turn.player, counts=self.hand_counts())
+
+            if(self.is_game_over()):
+                break
+            # the player who won the round starts the next one
+            self.checkpoint(player_turn)
+
+    def step(self):
+        """
+        This function plays the next card of the game, the same card play would, and stops. Rounds, penalties and
+        the end of the game carry over from one step to the next, so a game can be paused, looked at, snapshot or
+        slapped between any two cards.
+
+        Returns:
+            The code of the card drawn, or None if the game is already over.
+        """
+
+        if(self.source is not None):
+            self.materialize()
+        if(self.over):
+            return None
+        if(not self.stepped):
+            self.begin()
+
+        player = self.turn
+        owner = self.owner
+        card = self.draw(player)
+        # checks for an empty hand and invalid slap to ensure that the game is over
+        if(self.is_game_over() and not self.pile.is_valid_slap()):
+            if(owner is None):
+                self.finish()
+            else:
+                self.capture(owner)
+                self.end_round()
+            return card
+
+        times = self.rules.penalty[card]
+        if(times):
+            # a face card starts a penalty or moves it on to the next player
+            if(owner is None and self.sink is not None):
+                self.sink.emit("face_chain")
+            self.owner = player
+            self.owed = times
+            self.turn = self.next_player(player)
+        elif(owner is None):
+            self.turn = self.next_player(player)
+            # an empty hand changes nothing, so these draws can repeat without a capture
+            if(card == JOKER):
+                self.check(self.turn)
+        else:
+            self.owed -= 1
+            if(not self.owed):
+                # the penalty was paid in number cards, so whoever placed the last face card wins the pile
+                self.capture(owner)
+                self.end_round()
+        return card
+
+    def advance(self, cards=None):
+        """
+        This function plays cards with step until the given number are drawn or the game ends.
+
+        Parameters:
+            cards (int): The number of cards to play, None to play to the end.
+
+        Returns:
+            The number of cards drawn.
+        """
+
+        start = self.turns
+        while not self.over and (cards is None or self.turns - start < cards):
+            self.step()
+        return self.turns - start
+
+    def begin(self):
+        """
+        This function starts a game played with step, sending its start event if no card has been drawn yet.
+        """
+
+        self.stepped = True
+        if(self.sink is not None and not self.turns):
+            self.sink.emit("start", counts=self.hand_counts())
+
+    def end_round(self):
+        """
+        This function ends the round, giving the next turn to the player who won the pile, and ends the game if
+        it is over or has started repeating.
+        """
+
+        winner = self.owner
+        self.owner = None
+        self.owed = 0
+        self.turn = winner
+        if(self.sink is not None):
+            self.sink.emit("round", player=winner.player, counts=self.hand_counts())
+        if(self.is_game_over()):
+            self.finish()
+        else:
+            # the player who won the round starts the next one
+            self.check(winner)
+
+    def check(self, player_turn):
+        """
+        This function runs the checkpoint for step, ending the game if it has started repeating.
+
+        Parameters:
+            player_turn (Player): The player about to draw.
+        """
+
+        try:
+            self.checkpoint(player_turn)
+        except CycleFound:
+            self.infinite = True
+            self.finish()
+
+    def slap(self, player):
+        """
+        This function has a player slap the pile between two cards, for playing out what would happen if they did.
+        A good slap wins the pile and the next turn, ending any penalty. A failed slap burns their top card.
+        The game no longer follows its deal afterwards, so its cycle detection starts again and an infinite game
+        gives no cycle start.
+
+        Parameters:
+            player (Player): The player slapping.
+
+        Returns:
+            A boolean, whether the slap won the pile.
+        """
+
+        if(self.source is not None):
+            self.materialize()
+        if(self.over):
+            return False
+        if(not self.stepped):
+            self.begin()
+        self.deck = None
+        self.watch = CycleDetector()
+
+        if(self.pile.pile and self.pile.is_valid_slap()):
+            self.slap_capture(player)
+            self.owner = player
+            self.end_round()
+            return True
+        if(player.hand):
+            self.burn(player)
+        return False
+
+    def slap_capture(self, player):
+        """
+        This function gives the pile to a player who slapped it.
+
+        Parameters:
+            player (Player): The player who slapped.
+        """
+
+        if(self.sink is not None):
+            self.sink.emit("slap", player=player.player, good=True)
+        self.capture(player)
+
+    def burn(self, player):
+        """
+        This function puts the top card of a player's hand on the pile for a failed slap.
+
+        Parameters:
+            player (Player): The player who slapped.
+        """
+
+        card = player.hand.popleft()
+        self.pile.add_card_to_pile(card)
+        if(self.sink is not None):
+            self.sink.emit("burn", player=player.player, card=card)
+
+    def snapshot(self):
+        """
+        This function freezes the game as it is now. Taking one copies each hand and the pile into bytes once,
+        and a game forked from a snapshot that has not played since gives back that same snapshot.
+
+        Returns:
+            A Snapshot.
+        """
+
+        if(self.source is not None):
+            return self.source
+        return Snapshot(self)
+
+    def fork(self, sink=None):
+        """
+        This function starts a new game from this one as it is now, which can be played without changing this one.
+
+        Parameters:
+            sink (EventSink): Where the new game sends its events, None to send nothing.
+
+        Returns:
+            A GameState.
+        """
+
+        return self.snapshot().fork(sink)
+
+    def materialize(self):
+        """
+        This function gives a forked game its own hands and pile, copied from its snapshot, before it changes them.
+        """
+
+        for player in self.players:
+            player.hand = deque(player.hand)
+        self.hands = tuple(player.hand for player in self.players)
+        self.pile.pile = deque(self.pile.pile)
+        self.source = None
+
+    def position(self):
+        """
+        This function gives everything the rest of a game played with step depends on.
+
+        Returns:
+            A tuple of the player about to draw, the player owed the pile or 0, the cards still owed, and the pile
+            and each hand as bytes.
+        """
+
+        owner = 0 if self.owner is None else self.owner.player
+        return (self.turn.player, owner, self.owed, bytes(self.pile.pile)) + tuple(bytes(hand) for hand in self.hands)
+
+    def hand_counts(self):
+        """
+        This function gives how many cards each player holds.
+
+        Returns:
+            A list with the number of cards in each hand, in turn order.
+        """
+
+        return [len(hand) for hand in self.hands]
+
+    def result(self):
+        """
+        This function summarizes the game so far.
+
+        Returns:
+            A GameResult, the winner is the first player who still holds cards, 0 if nobody does.
+        """
+
+        if(self.infinite):
+            # an infinite game has stopped for good, so finding where its cycle starts is only done once
+            if(self.cycle is None):
+                cycle_start = None
+                if(self.deck is not None):
+                    cycle_start = find_cycle_start(self.deck, self.rules, self.watch.turns)
+                self.cycle = GameResult(0, self.turns, self.captures, cycle_start, self.watch.turns)
+            return self.cycle
+
+        winner = 0
+        for player in self.players:
+            if(len(player.hand) > 0):
+                winner = player.player
+                break
+        return GameResult(winner, self.turns, self.captures)
+
+# plays one whole game without printing and returns its result
+def run_game(seed=None, rules=None):
+    return GameState(seed, rules).play()
@@ -0,0 +1,230 @@
+"""
+Compact binary log of game events.
+
+Every event is one fixed-width 16 byte record:
+    game (uint32): The game id.
+    turn (uint32): The number of cards drawn in the game so far, counting the one just drawn.
+    count (uint16): The penalty of a face card, or the number of cards won by a capture or slap, otherwise 0.
+    seat (uint8): The seat of the player, starting at 0.
+    card (uint8): The card code, the top card of the pile for a capture or slap.
+    kind (uint8): DRAW, FACE, CAPTURE, SLAP or BURN.
+followed by 3 bytes of padding. A file is a 16 byte header and then the records, so a log is read back by
+memory-mapping it as a NumPy structured array, and queries over any number of events never parse text.
+
+A face card is logged as a DRAW followed by a FACE, so the draws alone give every card played. Events of one game
+are always in order, but a batch writes the events of all its games step by step, mixed together, so the queries
+sort by game first.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+# the kinds of event
+DRAW = 0
+FACE = 1
+CAPTURE = 2
+SLAP = 3
+BURN = 4
+KINDS = ("draw", "face", "capture", "slap", "burn")
+
+MAGIC = b"ERSLOG"
+VERSION = 1
+HEADER = struct.Struct("<6sHH6x")
+RECORD = struct.Struct("<IIHBBB3x")
+EVENT_DTYPE = np.dtype({"names": ["game", "turn", "count", "seat", "card", "kind"],
+                        "formats": ["<u4", "<u4", "<u2", "u1", "u1", "u1"],
+                        "offsets": [0, 4, 8, 10, 11, 12],
+                        "itemsize": RECORD.size})
+
+class EventLog:
+    """
+    This class appends events to a log file through a buffer, so the file is written in large blocks.
+    Use it with a with statement, or call close, so the last events are written.
+
+    Attributes:
+        path (str): The log file.
+        file (file): The open log file.
+        buffer (bytearray): The records not yet written.
+        buffer_size (int): The number of bytes kept before they are written.
+        events (int): The number of events logged since the file was opened.
+    """
+
+    def __init__(self, path, buffer_size=1 << 20):
+        """
+        The constructor for EventLog class. Opens the file for appending, writing the header if it is new.
+
+        Parameters:
+            path (str): The log file.
+            buffer_size (int): The number of bytes kept before they are written.
+        """
+
+        self.path = path
+        self.file = open(path, "ab", buffering=0)
+        if(self.file.tell() == 0):
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            check_header(path)
+        self.buffer = bytearray()
+        self.buffer_size = buffer_size
+        self.events = 0
+
+    def __enter__(self):
+        """
+        This function lets the log be used in a with statement.
+
+        Returns:
+            This EventLog.
+        """
+
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        This function closes the log at the end of the with statement.
+        """
+
+        self.close()
+
+    def write(self, game, turn, seat, card, kind, count=0):
+        """
+        This function logs one event.
+
+        Parameters:
+            game (int): The game id.
+            turn (int): The number of cards drawn in the game so far.
+            seat (int): The seat of the player, starting at 0.
+            card (int): The card code.
+            kind (int): DRAW, FACE, CAPTURE, SLAP or BURN.
+            count (int): The face card's penalty or the number of cards won.
+        """
+
+        self.buffer += RECORD.pack(game, turn, count, seat, card, kind)
+        self.events += 1
+        if(len(self.buffer) >= self.buffer_size):
+            self.flush()
+
+    def draw(self, game, turn, seat, card):
+        """
+        This function logs a card drawn onto the pile, the Joker for a draw from an empty hand.
+        """
+
+        self.write(game, turn, seat, card, DRAW)
+
+    def face(self, game, turn, seat, card, penalty):
+        """
+        This function logs a face card starting or passing on a chain, after its draw.
+        """
+
+        self.write(game, turn, seat, card, FACE, penalty)
+
+    def capture(self, game, turn, seat, card, size):
+        """
+        This function logs a player winning the pile at the end of a chain, card being the top card.
+        """
+
+        self.write(game, turn, seat, card, CAPTURE, size)
+
+    def slap(self, game, turn, seat, card, size):
+        """
+        This function logs a good slap winning the pile, card being the top card.
+        """
+
+        self.write(game, turn, seat, card, SLAP, size)
+
+    def burn(self, game, turn, seat, card):
+        """
+        This function logs a card burned for a bad slap.
+        """
+
+        self.write(game, turn, seat, card, BURN)
+
+    def write_records(self, records):
+        """
+        This function logs many events at once.
+
+        Parameters:
+            records (ndarray): An array of EVENT_DTYPE.
+        """
+
+        self.buffer += np.ascontiguousarray(records, dtype=EVENT_DTYPE).tobytes()
+        self.events += len(records)
+        if(len(self.buffer) >= self.buffer_size):
+            self.flush()
+
+    def flush(self):
+        """
+        This function writes the buffered events to the file.
+        """
+
+        if(self.buffer):
+            self.file.write(self.buffer)
+            self.buffer = bytearray()
+
+    def close(self):
+        """
+        This function writes the buffered events and closes the file.
+        """
+
+        if(not self.file.closed):
+            self.flush()
+            self.file.close()
+
+# returns an array of EVENT_DTYPE with the given fields, for EventLog.write_records
+def make_records(game, turn, seat, card, kind, count=0):
+    records = np.zeros(len(game), dtype=EVENT_DTYPE)
+    records["game"] = game
+    records["turn"] = turn
+    records["seat"] = seat
+    records["card"] = card
+    records["kind"] = kind
+    records["count"] = count
+    return records
+
+# raises ValueError if the file is not an event log this version can read
+def check_header(path):
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+    if(len(header) < HEADER.size):
+        raise ValueError(f"{path} is too short to be an event log")
+    magic, version, size = HEADER.unpack(header)
+    if(magic != MAGIC or version != VERSION or size != RECORD.size):
+        raise ValueError(f"{path} is not a version {VERSION} event log")
+
+# returns every event in a log file as a read-only memory-mapped array of EVENT_DTYPE
+def read_events(path):
+    check_header(path)
+    records = (os.path.getsize(path) - HEADER.size) // RECORD.size
+    if(records == 0):
+        return np.zeros(0, dtype=EVENT_DTYPE)
+    return np.memmap(path, dtype=EVENT_DTYPE, mode="r", offset=HEADER.size, shape=(records,))
+
+# returns the events sorted by game, keeping each game's events in order
+def by_game(events):
+    game = events["game"]
+    if(len(game) < 2 or (game[1:] >= game[:-1]).all()):
+        return events
+    return events[np.argsort(game, kind="stable")]
+
+# returns the number of cards won by each capture
+def capture_sizes(events):
+    return events["count"][events["kind"] == CAPTURE]
+
+# returns the number of face cards played in the chain ended by each capture, in game order
+def chain_lengths(events):
+    events = by_game(events)
+    kind = events["kind"]
+    # faces[i] counts the face cards up to and including event i
+    faces = np.cumsum(kind == FACE)
+    ends = np.flatnonzero((kind == CAPTURE) | (kind == SLAP))
+    if(len(ends) == 0):
+        return np.zeros(0, dtype=np.int64)
+    # each chain starts after the last capture or slap of the same game, or at the start of the game
+    game = events["game"]
+    first = np.flatnonzero(np.r_[True, game[1:] != game[:-1]])
+    before_game = faces[first] - (kind[first] == FACE)
+    start = before_game[np.searchsorted(first, ends, side="right") - 1]
+    same_game = np.r_[False, game[ends[1:]] == game[ends[:-1]]]
+    start[same_game] = faces[ends[:-1]][same_game[1:]]
+    return faces[ends] - start
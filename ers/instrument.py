@@ -0,0 +1,264 @@
+"""
+Opt-in counters, phase timers and profiling for the scalar engine.
+
+GameCounters.attach swaps a game's draw, capture, slap check and, with timers on, do_face_card and checkpoint for
+wrappers that count and time them, on that one game only. The GameState class is never changed, so games
+played without counters run exactly the same code as before, with no check per card for whether to count.
+
+Counted for every game attached:
+    draws: every card drawn, including Jokers from empty hands.
+    chains: the face card chains started, and how many face cards each one had.
+    captures: the piles won, and how many cards each one moved.
+    slap checks: every call of Pile.is_valid_slap.
+With timers, the nanoseconds spent in each phase are added up too. Phases nest, since a face card chain draws and
+captures, so each phase's time includes the phases called from it.
+
+profile_game plays one game under cProfile, and optionally tracemalloc, for a closer look at a single deal.
+
+Run with: python -m ers.instrument --games 1000 [--timers] [--profile] [--memory]
+"""
+
+import argparse
+import cProfile
+import io
+import pstats
+import random
+import time
+import tracemalloc
+
+from ers.engine import DEFAULT_RULES, MAX_DECKS, MAX_PLAYERS, GameState, Rules
+
+# the phases timed with timers on
+PHASES = ("draw", "face_chain", "capture", "slap_check", "checkpoint")
+
+class GameCounters:
+    """
+    This class counts what happens in every game it is attached to.
+
+    Attributes:
+        games (int): The number of games attached.
+        draws (int): The number of cards drawn.
+        chains (int): The number of face card chains started.
+        chain_depths (dict): The number of chains that had each number of face cards.
+        captures (int): The number of piles won.
+        cards_captured (int): The number of cards moved by captures.
+        capture_sizes (dict): The number of captures of each pile size.
+        slap_checks (int): The number of times a pile was checked for a slap.
+        depth (int): The number of face cards in the chain being played, 0 outside a chain.
+        timers (bool): Whether the phases are timed.
+        phase_ns (dict): The nanoseconds spent in each phase, empty without timers.
+        phase_calls (dict): The number of calls of each phase, empty without timers.
+    """
+
+    def __init__(self, timers=False):
+        """
+        The constructor for GameCounters class.
+
+        Parameters:
+            timers (bool): Whether to time the phases as well as count.
+        """
+
+        self.games = 0
+        self.draws = 0
+        self.chains = 0
+        self.chain_depths = {}
+        self.captures = 0
+        self.cards_captured = 0
+        self.capture_sizes = {}
+        self.slap_checks = 0
+        self.depth = 0
+        self.timers = timers
+        self.phase_ns = {phase: 0 for phase in PHASES} if timers else {}
+        self.phase_calls = {phase: 0 for phase in PHASES} if timers else {}
+
+    def attach(self, game):
+        """
+        This function wraps the given game's methods so everything it does is counted here.
+
+        Parameters:
+            game (GameState): A game that has not started.
+        """
+
+        self.games += 1
+        self.depth = 0
+        penalty = game.rules.penalty
+        pile = game.pile
+        draw = game.draw
+        capture = game.capture
+        is_valid_slap = pile.is_valid_slap
+
+        def counted_draw(player):
+            card = draw(player)
+            self.draws += 1
+            if(penalty[card]):
+                if(not self.depth):
+                    self.chains += 1
+                self.depth += 1
+            return card
+
+        def counted_capture(player):
+            size = len(pile.pile)
+            self.captures += 1
+            self.cards_captured += size
+            self.capture_sizes[size] = self.capture_sizes.get(size, 0) + 1
+            # every capture ends a chain
+            self.chain_depths[self.depth] = self.chain_depths.get(self.depth, 0) + 1
+            self.depth = 0
+            capture(player)
+
+        def counted_slap():
+            self.slap_checks += 1
+            return is_valid_slap()
+
+        game.draw = counted_draw
+        game.capture = counted_capture
+        pile.is_valid_slap = counted_slap
+        if(self.timers):
+            game.draw = self.timed("draw", game.draw)
+            game.capture = self.timed("capture", game.capture)
+            pile.is_valid_slap = self.timed("slap_check", pile.is_valid_slap)
+            game.do_face_card = self.timed("face_chain", game.do_face_card)
+            game.checkpoint = self.timed("checkpoint", game.checkpoint)
+
+    def timed(self, phase, function):
+        """
+        This function wraps a function so the time spent in it is added to a phase.
+
+        Parameters:
+            phase (str): The phase the time counts towards.
+            function (function): The function to time.
+
+        Returns:
+            The wrapped function.
+        """
+
+        phase_ns = self.phase_ns
+        phase_calls = self.phase_calls
+        clock = time.perf_counter_ns
+
+        def run(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                # checkpoint ends the game by raising, which still counts
+                phase_ns[phase] += clock() - start
+                phase_calls[phase] += 1
+        return run
+
+    def merge(self, other):
+        """
+        This function adds another GameCounters' counts to this one.
+
+        Parameters:
+            other (GameCounters): The counters to add.
+        """
+
+        self.games += other.games
+        self.draws += other.draws
+        self.chains += other.chains
+        self.captures += other.captures
+        self.cards_captured += other.cards_captured
+        self.slap_checks += other.slap_checks
+        for mine, theirs in ((self.chain_depths, other.chain_depths), (self.capture_sizes, other.capture_sizes),
+                             (self.phase_ns, other.phase_ns), (self.phase_calls, other.phase_calls)):
+            for key, value in theirs.items():
+                mine[key] = mine.get(key, 0) + value
+
+    def to_dict(self):
+        """
+        This function gives the counts in a form json can write.
+
+        Returns:
+            A dict.
+        """
+
+        return {
+            "games": self.games,
+            "draws": self.draws,
+            "chains": self.chains,
+            "chain_depths": {str(depth): count for depth, count in sorted(self.chain_depths.items())},
+            "captures": self.captures,
+            "cards_captured": self.cards_captured,
+            "capture_sizes": {str(size): count for size, count in sorted(self.capture_sizes.items())},
+            "slap_checks": self.slap_checks,
+            "phase_ns": dict(self.phase_ns),
+            "phase_calls": dict(self.phase_calls),
+        }
+
+    def report(self):
+        """
+        This function describes the counts, per game and per event.
+
+        Returns:
+            A string of several lines.
+        """
+
+        games = max(self.games, 1)
+        mean_depth = sum(depth * count for depth, count in self.chain_depths.items()) / max(self.captures, 1)
+        lines = [f"games: {self.games}",
+                 f"draws: {self.draws} ({self.draws / games:.1f} per game)",
+                 f"chains started: {self.chains} ({self.chains / games:.1f} per game)",
+                 f"chain depth: mean {mean_depth:.2f}, max {max(self.chain_depths, default=0)} face cards",
+                 f"captures: {self.captures} ({self.captures / games:.1f} per game)",
+                 f"cards per capture: mean {self.cards_captured / max(self.captures, 1):.2f}, "
+                 f"max {max(self.capture_sizes, default=0)}",
+                 f"slap checks: {self.slap_checks} ({self.slap_checks / games:.1f} per game)"]
+        for phase in PHASES:
+            if(self.phase_calls.get(phase)):
+                lines.append(f"{phase}: {self.phase_ns[phase] / 1e6:.1f} ms over {self.phase_calls[phase]} calls, "
+                             f"{self.phase_ns[phase] / self.phase_calls[phase]:.0f} ns each")
+        return "\n".join(lines)
+
+# plays one game under cProfile, and tracemalloc if memory is True, and returns its result and a report
+def profile_game(seed, rules=None, memory=False, top=15):
+    if(rules is None):
+        rules = DEFAULT_RULES
+    profiler = cProfile.Profile()
+    if(memory):
+        tracemalloc.start()
+    profiler.enable()
+    result = GameState(seed, rules).play()
+    profiler.disable()
+
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(top)
+    if(memory):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        text.write(f"memory: {current / 1024:.1f} KiB still allocated, peak {peak / 1024:.1f} KiB\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            text.write(f"{stat}\n")
+    return result, text.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description="Count and time what happens in a batch of ERS games.")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest follow in order")
+    parser.add_argument("--players", type=int, default=2, choices=range(2, MAX_PLAYERS + 1), help="players per game")
+    parser.add_argument("--decks", type=int, default=1, choices=range(1, MAX_DECKS + 1), help="decks in the shoe")
+    parser.add_argument("--timers", action="store_true", help="time each phase as well as counting")
+    parser.add_argument("--profile", action="store_true", help="replay one game picked at random under cProfile")
+    parser.add_argument("--memory", action="store_true", help="trace memory with tracemalloc in the profiled game")
+    args = parser.parse_args()
+
+    rules = Rules(players=args.players, decks=args.decks)
+    counters = GameCounters(args.timers)
+    start = time.perf_counter()
+    for seed in range(args.seed, args.seed + args.games):
+        GameState(seed, rules, counters=counters).play()
+    elapsed = time.perf_counter() - start
+    print(counters.report())
+    print(f"games/sec: {args.games / elapsed:,.0f}")
+
+    if(args.profile or args.memory):
+        # the sample is picked from the seed, so the same command profiles the same game
+        sampled = args.seed + random.Random(args.seed).randrange(args.games)
+        result, report = profile_game(sampled, rules, args.memory)
+        print()
+        print(f"profiled game {sampled}: {result}")
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Event driven keyboard input for the interactive game.
+
+A backend puts every key press on an asyncio queue as a KeyEvent stamped with time.perf_counter_ns() the moment
+the backend saw it, and the game awaits KeyInput.get(). Nothing runs while the game waits for a key, so an idle
+game uses no CPU, and the stamp lets the game measure how long it took to act on each press.
+
+Backends:
+    TerminalKeys: reads the terminal in cbreak mode, the event loop watches stdin with select/epoll. Linux and macOS.
+        Input the event loop cannot watch, like a regular file or /dev/null, is read by a thread instead.
+    KeyboardKeys: the keyboard library's press hook. Windows, where the terminal cannot be watched by the event loop.
+    ScriptedKeys: plays back a list of (delay, key), for tests and headless runs.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+class KeyEvent:
+    """
+    This class is one key press.
+
+    Attributes:
+        key (str): The key pressed, lower case.
+        time_ns (int): time.perf_counter_ns() when the backend saw the press.
+    """
+
+    def __init__(self, key, time_ns):
+        """
+        The constructor for KeyEvent class.
+
+        Parameters:
+            key (str): The key pressed, lower case.
+            time_ns (int): time.perf_counter_ns() when the backend saw the press.
+        """
+
+        self.key = key
+        self.time_ns = time_ns
+
+    def __repr__(self):
+        """
+        The function to show a KeyEvent while debugging.
+
+        Returns:
+            A string with the key and time.
+        """
+
+        return f"KeyEvent({self.key!r}, {self.time_ns})"
+
+class KeyInput:
+    """
+    This class is the queue of key presses shared by every backend. Use it with async with, which starts
+    the backend inside the running event loop and stops it again.
+
+    Attributes:
+        queue (asyncio.Queue): The presses not yet handled, oldest first.
+    """
+
+    def __init__(self):
+        """
+        The constructor for KeyInput class.
+        """
+
+        self.queue = None
+
+    async def __aenter__(self):
+        """
+        This function makes the queue and starts the backend.
+
+        Returns:
+            This KeyInput.
+        """
+
+        self.queue = asyncio.Queue()
+        self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """
+        This function stops the backend.
+        """
+
+        self.close()
+
+    def open(self):
+        """
+        This function starts sending presses to the queue. Backends override it.
+        """
+
+    def close(self):
+        """
+        This function stops sending presses to the queue. Backends override it.
+        """
+
+    def put(self, key, time_ns=None):
+        """
+        This function adds a press to the queue.
+
+        Parameters:
+            key (str): The key pressed.
+            time_ns (int): When it was pressed, defaults to now.
+        """
+
+        if(time_ns is None):
+            time_ns = time.perf_counter_ns()
+        self.queue.put_nowait(KeyEvent(key.lower(), time_ns))
+
+    async def get(self):
+        """
+        This function waits for the next press.
+
+        Returns:
+            A KeyEvent.
+        """
+
+        return await self.queue.get()
+
+    def clear(self):
+        """
+        This function drops every press not yet handled.
+        """
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+class TerminalKeys(KeyInput):
+    """
+    This class reads key presses from a terminal or pipe, woken by the event loop when there is input.
+
+    Attributes:
+        fd (int): The file descriptor read from.
+        saved (list): The terminal settings to restore on close, None if fd is not a terminal.
+        thread (threading.Thread): The thread reading fd when the event loop cannot watch it, otherwise None.
+    """
+
+    def __init__(self, fd=None):
+        """
+        The constructor for TerminalKeys class.
+
+        Parameters:
+            fd (int): The file descriptor to read, defaults to stdin.
+        """
+
+        super().__init__()
+        if(fd is None):
+            fd = sys.stdin.fileno()
+        self.fd = fd
+        self.saved = None
+        self.thread = None
+
+    def open(self):
+        """
+        This function puts the terminal in cbreak mode, so each key arrives as soon as it is pressed without
+        being echoed while Ctrl-C still works, and asks the event loop to call read when input arrives.
+        """
+
+        if(os.isatty(self.fd)):
+            import termios
+            import tty
+            self.saved = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_reader(self.fd, self.read)
+        except PermissionError:
+            # epoll refuses regular files and /dev/null, which never block, so a thread reads them instead
+            self.thread = threading.Thread(target=self.read_in_thread, args=(loop,), daemon=True)
+            self.thread.start()
+
+    def read(self):
+        """
+        This function queues every key waiting on fd, all stamped with the time they were read.
+        """
+
+        time_ns = time.perf_counter_ns()
+        data = os.read(self.fd, 64)
+        if(not data):
+            # the other end closed, nothing more will come
+            asyncio.get_running_loop().remove_reader(self.fd)
+            return
+        self.put_keys(data, time_ns)
+
+    def read_in_thread(self, loop):
+        """
+        This function reads fd until it ends or the keys are closed, handing the keys to the event loop thread.
+
+        Parameters:
+            loop (asyncio.AbstractEventLoop): The event loop the game runs on.
+        """
+
+        thread = threading.current_thread()
+        while self.thread is thread:
+            data = os.read(self.fd, 64)
+            if(not data or self.thread is not thread):
+                return
+            try:
+                loop.call_soon_threadsafe(self.put_keys, data, time.perf_counter_ns())
+            except RuntimeError:
+                # the event loop has already stopped
+                return
+
+    def put_keys(self, data, time_ns):
+        """
+        This function queues every key in the bytes read, all with the same time.
+
+        Parameters:
+            data (bytes): The bytes read from fd.
+            time_ns (int): When they were read.
+        """
+
+        for key in data.decode(errors="ignore"):
+            self.put(key, time_ns)
+
+    def close(self):
+        """
+        This function stops watching fd and restores the terminal settings.
+        """
+
+        if(self.thread is None):
+            asyncio.get_running_loop().remove_reader(self.fd)
+        # a thread stuck in a read finds out it is no longer wanted once the read returns
+        self.thread = None
+        if(self.saved is not None):
+            import termios
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+            self.saved = None
+
+    def clear(self):
+        """
+        This function drops every press not yet handled, including ones the terminal has not passed on yet.
+        """
+
+        if(self.saved is not None):
+            import termios
+            termios.tcflush(self.fd, termios.TCIFLUSH)
+        super().clear()
+
+class KeyboardKeys(KeyInput):
+    """
+    This class gets key presses from the keyboard library, which calls back from its own thread.
+
+    Attributes:
+        hook (function): The keyboard library hook, removed on close.
+    """
+
+    def __init__(self):
+        """
+        The constructor for KeyboardKeys class.
+        """
+
+        super().__init__()
+        self.hook = None
+
+    def open(self):
+        """
+        This function hooks key presses and hands each one to the event loop thread.
+        """
+
+        import keyboard
+
+        loop = asyncio.get_running_loop()
+
+        def pressed(event):
+            loop.call_soon_threadsafe(self.put, event.name, time.perf_counter_ns())
+
+        self.hook = keyboard.on_press(pressed)
+
+    def close(self):
+        """
+        This function removes the hook.
+        """
+
+        import keyboard
+
+        if(self.hook is not None):
+            keyboard.unhook(self.hook)
+            self.hook = None
+
+class ScriptedKeys(KeyInput):
+    """
+    This class plays back scripted key presses, for tests and games without a keyboard.
+
+    Attributes:
+        script (iterable): (delay, key) pairs, each key pressed delay seconds after the one before.
+        task (asyncio.Task): The task pressing the keys.
+    """
+
+    def __init__(self, script):
+        """
+        The constructor for ScriptedKeys class.
+
+        Parameters:
+            script (iterable): (delay, key) pairs, a generator can go on for as long as the game needs.
+        """
+
+        super().__init__()
+        self.script = script
+        self.task = None
+
+    def open(self):
+        """
+        This function starts pressing the scripted keys.
+        """
+
+        self.task = asyncio.get_running_loop().create_task(self.press_keys())
+
+    async def press_keys(self):
+        """
+        This function presses each key once its delay has passed.
+        """
+
+        for delay, key in self.script:
+            await asyncio.sleep(delay)
+            self.put(key)
+
+    def close(self):
+        """
+        This function stops pressing keys.
+        """
+
+        if(self.task is not None):
+            self.task.cancel()
+            self.task = None
+
+# returns the backend for this platform
+def open_keys():
+    if(sys.platform == "win32"):
+        return KeyboardKeys()
+    return TerminalKeys()
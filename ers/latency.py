@@ -0,0 +1,287 @@
+"""
+Reaction time and input latency statistics for the interactive game.
+
+Times are kept in HDR style histograms: values below 2 ** SUB_BITS nanoseconds get a bucket each, and every power
+of two above that is split into 2 ** (SUB_BITS - 1) equal buckets, so any value is recorded to within about 1.6%
+whatever its size, and the memory used only grows with the number of different magnitudes seen.
+
+For each player the game records:
+    draw reaction: from the pile being shown to the player's draw key.
+    slap reaction: from the pile being shown to the player's slap key.
+    input latency: from the key being read to the game acting on it, the program's own lag.
+    slaps: how many were good and how many were burned.
+"""
+
+import json
+
+# buckets within each power of two are 2 ** (SUB_BITS - 1) wide, about 1.6% of the value for 7
+SUB_BITS = 7
+
+class LatencyHistogram:
+    """
+    This class counts values in log-linear buckets.
+
+    Attributes:
+        counts (dict): The number of values in each bucket, by bucket index.
+        count (int): The number of values recorded.
+        total (int): The sum of the values recorded.
+        min (int): The smallest value recorded, None before the first.
+        max (int): The largest value recorded, None before the first.
+    """
+
+    def __init__(self):
+        """
+        The constructor for LatencyHistogram class.
+        """
+
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        """
+        This function adds a value.
+
+        Parameters:
+            value (int): The value, in nanoseconds, negative values are counted as 0.
+        """
+
+        value = max(int(value), 0)
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if(self.min is None or value < self.min):
+            self.min = value
+        if(self.max is None or value > self.max):
+            self.max = value
+
+    def mean(self):
+        """
+        This function gives the average value.
+
+        Returns:
+            A float, 0 if nothing was recorded.
+        """
+
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """
+        This function gives a percentile of the values.
+
+        Parameters:
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            The lowest value of the bucket holding the percentile, clamped to the recorded min and max, 0 if empty.
+        """
+
+        if(not self.count):
+            return 0
+        rank = max(1, -(-q * self.count // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if(seen >= rank):
+                return min(max(bucket_value(index), self.min), self.max)
+        return self.max
+
+    def merge(self, other):
+        """
+        This function adds another histogram's values to this one.
+
+        Parameters:
+            other (LatencyHistogram): The histogram to add.
+        """
+
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if(value is not None):
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self):
+        """
+        This function gives the histogram in a form json can write.
+
+        Returns:
+            A dict with the summary numbers and the buckets as [lowest value, count] pairs.
+        """
+
+        return {
+            "count": self.count,
+            "min_ns": self.min,
+            "max_ns": self.max,
+            "mean_ns": self.mean(),
+            "p50_ns": self.percentile(50),
+            "p90_ns": self.percentile(90),
+            "p99_ns": self.percentile(99),
+            "buckets": [[bucket_value(index), self.counts[index]] for index in sorted(self.counts)],
+        }
+
+    def summary(self):
+        """
+        This function describes the histogram in one line, in milliseconds.
+
+        Returns:
+            A string.
+        """
+
+        if(not self.count):
+            return "none"
+        return (f"n {self.count}, p50 {self.percentile(50) / 1e6:.1f} ms, p90 {self.percentile(90) / 1e6:.1f} ms, "
+                f"p99 {self.percentile(99) / 1e6:.1f} ms, max {self.max / 1e6:.1f} ms")
+
+# returns the bucket a value goes in
+def bucket_index(value):
+    if(value < 1 << SUB_BITS):
+        return value
+    shift = value.bit_length() - SUB_BITS
+    # value >> shift keeps the top SUB_BITS bits, which run from 2 ** (SUB_BITS - 1) up
+    return (shift << (SUB_BITS - 1)) + (value >> shift)
+
+# returns the lowest value in a bucket
+def bucket_value(index):
+    if(index < 1 << SUB_BITS):
+        return index
+    half = 1 << (SUB_BITS - 1)
+    shift = index // half - 1
+    return (index - shift * half) << shift
+
+class PlayerReactions:
+    """
+    This class holds one player's reaction statistics.
+
+    Attributes:
+        draw_reaction (LatencyHistogram): From the pile being shown to the player's draw key.
+        slap_reaction (LatencyHistogram): From the pile being shown to the player's slap key.
+        input_latency (LatencyHistogram): From each key being read to the game acting on it.
+        good_slaps (int): The number of slaps that won the pile.
+        bad_slaps (int): The number of slaps that burned a card.
+    """
+
+    def __init__(self):
+        """
+        The constructor for PlayerReactions class.
+        """
+
+        self.draw_reaction = LatencyHistogram()
+        self.slap_reaction = LatencyHistogram()
+        self.input_latency = LatencyHistogram()
+        self.good_slaps = 0
+        self.bad_slaps = 0
+
+    def slap_accuracy(self):
+        """
+        This function gives the share of slaps that were good.
+
+        Returns:
+            A float between 0 and 1, None if the player never slapped.
+        """
+
+        slaps = self.good_slaps + self.bad_slaps
+        return self.good_slaps / slaps if slaps else None
+
+class ReactionLog:
+    """
+    This class records every player's reactions over a game.
+
+    Attributes:
+        players (dict): A PlayerReactions for each player number.
+    """
+
+    def __init__(self, players=2):
+        """
+        The constructor for ReactionLog class.
+
+        Parameters:
+            players (int): The number of players.
+        """
+
+        self.players = {player: PlayerReactions() for player in range(1, players + 1)}
+
+    def key(self, player, slap, event, shown_ns, handled_ns):
+        """
+        This function records a key the game acted on.
+
+        Parameters:
+            player (int): The player number whose key it was.
+            slap (bool): Whether it was a slap, otherwise a draw or collect.
+            event (KeyEvent): The key press.
+            shown_ns (int): When the pile the player reacted to was shown, None if it never was.
+            handled_ns (int): When the game acted on the key.
+        """
+
+        stats = self.players[player]
+        stats.input_latency.record(handled_ns - event.time_ns)
+        # a key pressed before the pile it would react to was shown is not a reaction to it
+        if(shown_ns is not None and event.time_ns >= shown_ns):
+            if(slap):
+                stats.slap_reaction.record(event.time_ns - shown_ns)
+            else:
+                stats.draw_reaction.record(event.time_ns - shown_ns)
+
+    def slap(self, player, good):
+        """
+        This function records whether a slap was good.
+
+        Parameters:
+            player (int): The player number who slapped.
+            good (bool): Whether the slap won the pile.
+        """
+
+        if(good):
+            self.players[player].good_slaps += 1
+        else:
+            self.players[player].bad_slaps += 1
+
+    def report(self):
+        """
+        This function describes every player's statistics.
+
+        Returns:
+            A string of several lines.
+        """
+
+        lines = []
+        for player, stats in self.players.items():
+            accuracy = stats.slap_accuracy()
+            accuracy = "no slaps" if accuracy is None else f"{accuracy:.0%} of {stats.good_slaps + stats.bad_slaps}"
+            lines.append(f"Player {player}:")
+            lines.append(f"    draw reaction: {stats.draw_reaction.summary()}")
+            lines.append(f"    slap reaction: {stats.slap_reaction.summary()}")
+            lines.append(f"    slap accuracy: {accuracy}")
+            lines.append(f"    input latency: {stats.input_latency.summary()}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        """
+        This function gives every player's statistics in a form json can write.
+
+        Returns:
+            A dict keyed by player number.
+        """
+
+        return {str(player): {"draw_reaction": stats.draw_reaction.to_dict(),
+                              "slap_reaction": stats.slap_reaction.to_dict(),
+                              "input_latency": stats.input_latency.to_dict(),
+                              "good_slaps": stats.good_slaps,
+                              "bad_slaps": stats.bad_slaps}
+                for player, stats in self.players.items()}
+
+    def save(self, path):
+        """
+        This function writes the statistics to a JSON file.
+
+        Parameters:
+            path (str): The file to write.
+        """
+
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
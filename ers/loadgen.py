@@ -0,0 +1,198 @@
+"""
+Load generator for the ERS server.
+
+Opens many connections at once, each playing whole games as a simple bot: it draws as soon as it is its turn, and
+keeps its own copy of the pile, using the same Pile rules as the server, so it slaps whenever the pile can be
+slapped. A small share of slaps can be made on purpose when the pile cannot be slapped, to exercise burns.
+
+The latency of an action is the time from sending draw or slap to reading the server's line that reports it, so it
+covers the network, the server's queue and the game logic. Latencies are kept in a LatencyHistogram, and the
+report gives the p50 and p99 with the games finished and games per second.
+
+Run with: python -m ers.loadgen --games 1000 --concurrency 100 [--port 7777 | --unix ers.sock]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from ers.cards import JOKER
+from ers.engine import Pile, Rules
+from ers.latency import LatencyHistogram
+
+class LoadClient:
+    """
+    This class is one connection playing games against the server.
+
+    Attributes:
+        reader (asyncio.StreamReader): Where the server's lines come from.
+        writer (asyncio.StreamWriter): Where commands to the server are written.
+        pile (Pile): The client's copy of the pile.
+        player (int): The client's player number in the current game.
+        sent (dict): When each unanswered command was sent, by command.
+        latency (LatencyHistogram): The nanoseconds from each command to its answer.
+        games (int): The number of games this client finished.
+        game_over (function): Called at the end of each game.
+        rng (random.Random): Decides the slaps made on purpose.
+        false_slap_rate (float): The chance of slapping a pile that cannot be slapped after each card.
+    """
+
+    def __init__(self, reader, writer, rules, latency, game_over, seed=None, false_slap_rate=0.0):
+        """
+        The constructor for LoadClient class.
+
+        Parameters:
+            reader (asyncio.StreamReader): Where the server's lines come from.
+            writer (asyncio.StreamWriter): Where commands to the server are written.
+            rules (Rules): The rule settings the server plays with.
+            latency (LatencyHistogram): Where the latencies are recorded, shared by every client.
+            game_over (function): Called at the end of each game.
+            seed (int): The seed of the slaps made on purpose.
+            false_slap_rate (float): The chance of slapping a pile that cannot be slapped after each card.
+        """
+
+        self.reader = reader
+        self.writer = writer
+        self.pile = Pile([], rules.slaps)
+        self.player = None
+        self.sent = {}
+        self.latency = latency
+        self.games = 0
+        self.game_over = game_over
+        self.rng = random.Random(seed)
+        self.false_slap_rate = false_slap_rate
+
+    def send(self, command):
+        """
+        This function sends a command and notes when, unless the same command is still unanswered.
+
+        Parameters:
+            command (str): draw or slap.
+        """
+
+        if(command in self.sent):
+            return
+        self.sent[command] = time.perf_counter_ns()
+        self.writer.write(command.encode() + b"\n")
+
+    def answered(self, command, player):
+        """
+        This function records the latency of a command when the server reports this client's action.
+
+        Parameters:
+            command (str): draw or slap.
+            player (int): The player number the server's line is about.
+        """
+
+        if(player == self.player and command in self.sent):
+            self.latency.record(time.perf_counter_ns() - self.sent.pop(command))
+
+    async def play(self):
+        """
+        This function plays games one after another until it is cancelled or the server closes the connection.
+        """
+
+        pile = self.pile.pile
+        while True:
+            self.sent.clear()
+            pile.clear()
+            self.writer.write(b"join\n")
+            while True:
+                line = await self.reader.readline()
+                if(not line):
+                    return
+                words = line.split()
+                kind = words[0]
+                if(kind == b"turn"):
+                    if(int(words[1]) == self.player):
+                        self.send("draw")
+                elif(kind == b"card"):
+                    self.answered("draw", int(words[1]))
+                    card = int(words[2])
+                    if(card != JOKER):
+                        self.pile.add_card_to_pile(card)
+                        if(self.pile.is_valid_slap() or self.rng.random() < self.false_slap_rate):
+                            self.send("slap")
+                elif(kind == b"capture"):
+                    # a capture answers the draw that collected the pile
+                    self.answered("draw", int(words[1]))
+                    pile.clear()
+                elif(kind == b"slap"):
+                    self.answered("slap", int(words[1]))
+                    if(words[2] == b"good"):
+                        pile.clear()
+                    elif(words[2] == b"burn"):
+                        self.pile.add_card_to_pile(int(words[3]))
+                        if(self.pile.is_valid_slap()):
+                            self.send("slap")
+                elif(kind == b"start"):
+                    self.player = int(words[2])
+                elif(kind == b"over"):
+                    self.games += 1
+                    self.game_over()
+                    break
+                elif(kind == b"error"):
+                    # the server refused a command, so no answer is coming for it
+                    self.sent.clear()
+
+# opens one connection to the server, over the Unix socket if unix_path is given
+async def connect(host, port, unix_path):
+    if(unix_path is not None):
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+# plays games on concurrency connections until the given number are done, returns the latencies, games and seconds
+async def run_load(games, concurrency, rules, host="127.0.0.1", port=7777, unix_path=None, seed=0,
+                   false_slap_rate=0.0):
+    latency = LatencyHistogram()
+    done = asyncio.Event()
+    # every player of a game sees it end, so the games are counted by seat
+    seats = [0]
+
+    def game_over():
+        seats[0] += 1
+        if(seats[0] >= games * rules.players):
+            done.set()
+
+    clients = []
+    for i in range(concurrency):
+        reader, writer = await connect(host, port, unix_path)
+        clients.append(LoadClient(reader, writer, rules, latency, game_over, seed + i, false_slap_rate))
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(client.play()) for client in clients]
+    # stop as soon as enough games are done, every client keeps joining until then so no game is left short of players
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    for client in clients:
+        client.writer.close()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return latency, seats[0] // rules.players, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many games against an ERS server and report its latency.")
+    parser.add_argument("--host", default="127.0.0.1", help="address of the server")
+    parser.add_argument("--port", type=int, default=7777, help="TCP port of the server")
+    parser.add_argument("--unix", default=None, help="Unix socket path of the server instead of TCP")
+    parser.add_argument("--players", type=int, default=2, help="players per game on the server")
+    parser.add_argument("--games", type=int, default=1000, help="total number of games to play")
+    parser.add_argument("--concurrency", type=int, default=100, help="number of connections open at once")
+    parser.add_argument("--false-slaps", type=float, default=0.01,
+                        help="chance of slapping a pile that cannot be slapped after each card")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the slaps made on purpose")
+    args = parser.parse_args()
+    if(args.concurrency % args.players):
+        parser.error("--concurrency must be a multiple of --players so every game fills")
+
+    latency, played, elapsed = asyncio.run(run_load(args.games, args.concurrency, Rules(players=args.players),
+                                                    args.host, args.port, args.unix, args.seed, args.false_slaps))
+    print(f"games: {played} in {elapsed:.2f} s ({played / elapsed:,.0f} games/sec)")
+    print(f"actions: {latency.count}")
+    print(f"latency: p50 {latency.percentile(50) / 1000:.0f} us, p99 {latency.percentile(99) / 1000:.0f} us, "
+          f"max {latency.max / 1000:.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Two player Egyptian Rat Screw in the terminal.
+
+The interactive frontend, played with the engine's Player and Pile on card codes. Keys are read with ers.keys:
+straight from the terminal on Linux and mac, and with the keyboard library on Windows, which ers.keys only
+imports once a game starts reading keys there. Nothing here runs on import, so the engine and the simulators
+never load any of it.
+
+Player 1 draws with q and slaps with w, player 2 draws with o and slaps with p. Winning a face card chain, the
+winner collects the pile with their slap key while the other player can still slap it.
+
+Run with: ers-play [--fast] [--turn-timeout 0]
+"""
+
+import argparse
+import asyncio
+import time
+from itertools import islice
+
+from ers.cards import CARDS
+from ers.engine import DEFAULT_RULES, Pile, Player, count_times, deal_cards, seeded_deck
+from ers.keys import KeyEvent, open_keys
+from ers.latency import ReactionLog
+from ers.render import Renderer, pile_frame
+from ers.sinks import TextSink
+from ers.timers import FAST, Deadlines, Pacing
+
+# the player each key belongs to, and the keys that slap
+KEY_PLAYER = {'q': 1, 'w': 1, 'o': 2, 'p': 2}
+SLAP_KEYS = ('w', 'p')
+
+class InteractiveGame:
+    """
+    This class is one game played from the keyboard.
+
+    Attributes:
+        player1 (Player): The player drawing with q and slapping with w.
+        player2 (Player): The player drawing with o and slapping with p.
+        pile (Pile): The middle pile.
+        pacing (Pacing): How long the game pauses.
+        keys (KeyInput): Where key presses come from.
+        deadlines (Deadlines): The end of the current pause.
+        reactions (ReactionLog): Each player's reaction times.
+        screen (Renderer): Draws the pile.
+        events (EventSink): Where the game's messages go.
+    """
+
+    def __init__(self, seed=None, pacing=None, keys=None, events=None):
+        """
+        The constructor for InteractiveGame class. Shuffles and deals the deck.
+
+        Parameters:
+            seed (int): The seed for the shuffle, None picks a random one.
+            pacing (Pacing): How long the game pauses, defaults to Pacing().
+            keys (KeyInput): Where key presses come from, defaults to the terminal or keyboard library.
+            events (EventSink): Where the game's messages go, defaults to writing them straight to the terminal.
+        """
+
+        hand1, hand2 = deal_cards(seeded_deck(seed), 2)
+        self.player1 = Player(1, hand1)
+        self.player2 = Player(2, hand2)
+        self.pile = Pile([], DEFAULT_RULES.slaps)
+        self.pacing = Pacing() if pacing is None else pacing
+        self.keys = open_keys() if keys is None else keys
+        self.deadlines = Deadlines()
+        self.reactions = ReactionLog(2)
+        self.screen = Renderer()
+        # game messages are written as soon as they happen, between frames of the pile
+        self.events = TextSink(buffer_lines=0, padded=True) if events is None else events
+
+    def show_pile(self):
+        """
+        This function draws up to the top 4 cards of the pile, fanned out with the top card on the right.
+        """
+
+        self.screen.render(pile_frame([CARDS[card] for card in islice(self.pile.pile, 4)]))
+
+    def capture(self, player):
+        """
+        This function adds the whole pile to the bottom of the given player's hand.
+
+        Parameters:
+            player (Player): The player winning the pile.
+        """
+
+        player.hand.extend(self.pile.pile)
+        self.pile.pile.clear()
+
+    def burn(self, player):
+        """
+        This function puts the top card of a player's hand on the pile after a failed slap.
+
+        Parameters:
+            player (Player): The player who slapped.
+        """
+
+        if(player.hand):
+            self.pile.add_card_to_pile(player.hand.popleft())
+        self.events.emit("burn", player=player.player)
+
+    def slap(self, player):
+        """
+        This function gives the pile to a player who slapped it, or burns a card of theirs if it could not be slapped.
+
+        Parameters:
+            player (Player): The player who slapped.
+
+        Returns:
+            A boolean, whether the slap won the pile.
+        """
+
+        good = self.pile.is_valid_slap()
+        self.reactions.slap(player.player, good)
+        if(good):
+            self.capture(player)
+            self.events.emit("slap", player=player.player, good=True)
+        else:
+            self.burn(player)
+        return good
+
+    # if either player's hand is empty, return true
+    def is_game_over(self):
+        """
+        This function checks if either player's hand is empty.
+
+        Returns:
+            A boolean.
+        """
+
+        return not self.player1.hand or not self.player2.hand
+
+    def record_key(self, event, slap):
+        """
+        This function records how fast a player reacted to the pile on screen and how long the game took to act on
+        their key.
+
+        Parameters:
+            event (KeyEvent): The key press.
+            slap (bool): Whether the key was a slap.
+        """
+
+        shown_ns = self.screen.last_ns if self.screen.frames else None
+        self.reactions.key(KEY_PLAYER[event.key], slap, event, shown_ns, time.perf_counter_ns())
+
+    async def draw_slap_loop(self, player_drawing):
+        """
+        This function waits for the player drawing to draw or for either player to slap. After a slap the slapper
+        plays the next card.
+
+        Parameters:
+            player_drawing (Player): The player whose turn it is.
+
+        Returns:
+            The code of the card played.
+        """
+
+        players = {1: self.player1, 2: self.player2}
+        draw_key = 'q' if player_drawing == self.player1 else 'o'
+        while True:
+            # waits for the next key press without using the CPU, keys pressed during a pause are skipped
+            event = await self.deadlines.next_key(self.keys, self.pacing.turn_timeout)
+            timed_out = event is None
+            if timed_out:
+                # out of time, draw for them
+                event = KeyEvent(draw_key, time.perf_counter_ns())
+            if event.key == draw_key:
+                current_card = player_drawing.draw_card(self.pile)
+                break
+            # slapping; "w" for player 1, "p" for player 2
+            if event.key in SLAP_KEYS:
+                slapper = players[KEY_PLAYER[event.key]]
+                self.slap(slapper)
+                current_card = slapper.draw_card(self.pile)
+                self.deadlines.lock(self.pacing.slap_lockout)
+                break
+        if not timed_out:
+            self.record_key(event, event.key in SLAP_KEYS)
+        # show the pile once the pause is over, without holding up the game
+        self.deadlines.lock(self.pacing.draw_delay)
+        self.deadlines.at_end(self.show_pile)
+        return current_card
+
+    async def collection_end_round_loop(self, player_turn):
+        """
+        This function waits for the winner of a round to collect the pile or for the other player to slap it.
+
+        Parameters:
+            player_turn (Player): The player who won the round.
+        """
+
+        collect_key = 'w' if player_turn == self.player1 else 'p'
+        while True:
+            event = await self.deadlines.next_key(self.keys, self.pacing.turn_timeout)
+            timed_out = event is None
+            if timed_out:
+                # out of time, collect for the winner
+                event = KeyEvent(collect_key, time.perf_counter_ns())
+            if event.key == collect_key:
+                self.capture(player_turn)
+                self.events.emit("collect", player=player_turn.player)
+            elif event.key in SLAP_KEYS:
+                self.slap(self.player1 if event.key == 'w' else self.player2)
+            else:
+                continue
+            # recorded once the key has been acted on, like in draw_slap_loop
+            if not timed_out:
+                # the winner's key collects, the other player's key is a slap
+                self.record_key(event, KEY_PLAYER[event.key] != player_turn.player)
+            self.deadlines.lock(self.pacing.slap_lockout)
+            return
+
+    async def do_face_card(self, player_turn, times):
+        """
+        This function makes the other player draw until they draw a face card or pay the whole penalty.
+
+        Parameters:
+            player_turn (Player): The player who placed the face card.
+            times (int): The number of cards the other player must draw.
+
+        Returns:
+            player_drawing (Player): The player who paid the penalty.
+            current_card (int): The code of the last card drawn.
+        """
+
+        player_drawing = self.player2 if player_turn == self.player1 else self.player1
+        x = 0
+        while x < times:
+            current_card = await self.draw_slap_loop(player_drawing)
+
+            # checks for an empty hand and invalid slap to ensure that the game is over
+            if(self.is_game_over() and not self.pile.is_valid_slap()):
+                break
+
+            # if a face card is drawn, the penalty moves on to the other player
+            if(count_times(current_card)):
+                return player_drawing, current_card
+            x += 1
+            self.deadlines.lock(self.pacing.draw_delay)
+
+        await self.collection_end_round_loop(player_turn)
+        return player_drawing, current_card
+
+    async def play(self):
+        """
+        This function plays the game, reading keys only while it runs.
+
+        Returns:
+            The winning player number, 0 if neither has won.
+        """
+
+        async with self.keys:
+            player_turn = self.player1
+            self.events.emit("start", counts=[len(self.player1.hand), len(self.player2.hand)])
+            while True:
+                current_card = await self.draw_slap_loop(player_turn)
+
+                # checks for an empty hand and invalid slap to ensure that the game is over
+                if(self.is_game_over() and not self.pile.is_valid_slap()):
+                    break
+
+                times = count_times(current_card)
+                if(times):
+                    # keep going while each penalty ends in another face card, switching players each time
+                    while times:
+                        player_turn, current_card = await self.do_face_card(player_turn, times)
+                        times = count_times(current_card)
+                    self.events.emit("round", player=2 if player_turn == self.player1 else 1,
+                                     counts=[len(self.player1.hand), len(self.player2.hand)])
+                    if(self.is_game_over()):
+                        break
+
+                # switch player turn
+                player_turn = self.player2 if player_turn == self.player1 else self.player1
+
+            # end game, after the last card is shown
+            await asyncio.sleep(self.deadlines.remaining())
+            self.screen.flush()
+
+        winner = 0
+        if(not self.player1.hand):
+            winner = 2
+        elif(not self.player2.hand):
+            winner = 1
+        if(winner):
+            self.events.emit("winner", player=winner)
+        return winner
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ers-play", description="Two player Egyptian Rat Screw in the terminal.")
+    parser.add_argument("--fast", action="store_true", help="no pauses, for testing")
+    parser.add_argument("--slap-lockout", type=float, default=5.0, help="seconds keys are ignored after a slap")
+    parser.add_argument("--draw-delay", type=float, default=0.5, help="seconds keys are ignored after each card")
+    parser.add_argument("--turn-timeout", type=float, default=None, help="seconds before a player's move is made for them")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the shuffle, random if not given")
+    parser.add_argument("--stats-json", default=None, help="file to write the reaction time statistics to")
+    args = parser.parse_args(argv)
+    if(args.fast):
+        pacing = Pacing(FAST.slap_lockout, FAST.draw_delay, args.turn_timeout)
+    else:
+        pacing = Pacing(args.slap_lockout, args.draw_delay, args.turn_timeout)
+
+    game = InteractiveGame(args.seed, pacing)
+    asyncio.run(game.play())
+    print(game.reactions.report())
+    if(args.stats_json is not None):
+        game.reactions.save(args.stats_json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Incremental terminal rendering for the interactive game.
+
+The Renderer keeps the last frame it drew. For each new frame it moves the cursor only to the lines that changed,
+rewrites them, and clears anything below the frame, all in one write. A frame rate cap merges frames that arrive
+too quickly, so only the newest one is drawn. The card art for every card is built once, at import.
+
+The pile is drawn fanned out so the whole frame fits on one screen, which cursor addressing needs: the cards under
+the top one show only their left edge, where the value is printed.
+"""
+
+import asyncio
+import sys
+import time
+from itertools import islice
+
+from ers.cards import SUITS, VALUES
+
+# the left margin of the pile and the columns of each covered card that stay visible
+INDENT = " " * 26
+FAN = 8
+
+# returns the lines of the ASCII art for one card
+def card_art(value, suit):
+    blank = "|" + " " * 26 + "|"
+    lines = ["-" * 28, f"|{value:<26}|"]
+    lines += [blank] * 5
+    lines.append(f"|{suit:^26}|")
+    lines += [blank] * 6
+    lines.append(f"|{value:>26}|")
+    lines.append("-" * 28)
+    return tuple(lines)
+
+# the art of every card by (value, suit), and the left edge of it that shows when another card covers it
+CARD_ART = {(value, suit): card_art(value, suit) for suit in SUITS for value in VALUES}
+CARD_EDGE = {key: tuple(line[:FAN] for line in art) for key, art in CARD_ART.items()}
+
+# returns the frame for the given Card objects, top card first, as a list of lines
+def pile_frame(cards):
+    if(not cards):
+        return [""]
+    shown = [(card.value, card.suit) for card in islice(cards, 4)]
+    # every card but the top one is covered by the next, so only its left edge shows
+    columns = [CARD_EDGE[key] for key in reversed(shown[1:])] + [CARD_ART[shown[0]]]
+    return [""] + [INDENT + "".join(row) for row in zip(*columns)]
+
+class Renderer:
+    """
+    This class draws frames to the terminal, rewriting only the lines that changed since the last one.
+
+    Attributes:
+        out (file): Where frames are written.
+        interval_ns (int): The shortest time between two frames.
+        previous (list): The lines of the last frame drawn, None before the first.
+        last_ns (int): When the last frame was drawn.
+        pending (list): A frame waiting for the cap to allow it, None if there is none.
+        timer (asyncio.TimerHandle): The scheduled draw of pending.
+        frames (int): The number of frames drawn.
+        lines_written (int): The number of lines written over all frames.
+    """
+
+    def __init__(self, out=None, fps=30):
+        """
+        The constructor for Renderer class.
+
+        Parameters:
+            out (file): Where frames are written, defaults to stdout.
+            fps (float): The most frames drawn per second.
+        """
+
+        if(out is None):
+            out = sys.stdout
+        self.out = out
+        self.interval_ns = int(1e9 / fps)
+        self.previous = None
+        self.last_ns = -self.interval_ns
+        self.pending = None
+        self.timer = None
+        self.frames = 0
+        self.lines_written = 0
+
+    def render(self, lines):
+        """
+        This function draws a frame now, or as soon as the frame rate cap allows, replacing any frame already waiting.
+        Outside an event loop the frame is always drawn now.
+
+        Parameters:
+            lines (list): The lines of the frame.
+        """
+
+        wait_ns = self.last_ns + self.interval_ns - time.perf_counter_ns()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if(wait_ns <= 0 or loop is None):
+            self.pending = lines
+            self.flush()
+        else:
+            self.pending = lines
+            if(self.timer is None):
+                self.timer = loop.call_later(wait_ns / 1e9, self.flush)
+
+    def flush(self):
+        """
+        This function draws the waiting frame, if there is one.
+        """
+
+        if(self.timer is not None):
+            self.timer.cancel()
+            self.timer = None
+        if(self.pending is None):
+            return
+
+        lines = self.pending
+        self.pending = None
+        parts = []
+        if(self.previous is None):
+            # the first frame starts from a clear screen
+            parts.append("\033[H\033[2J")
+        for row, line in enumerate(lines):
+            if(self.previous is None or row >= len(self.previous) or self.previous[row] != line):
+                # move to the start of the row, write it and clear the rest of the old line
+                parts.append(f"\033[{row + 1};1H{line}\033[K")
+                self.lines_written += 1
+        # clear everything under the frame, including messages printed since the last one
+        parts.append(f"\033[{len(lines) + 1};1H\033[J")
+        self.out.write("".join(parts))
+        self.out.flush()
+
+        self.previous = list(lines)
+        self.last_ns = time.perf_counter_ns()
+        self.frames += 1
+
+    def reset(self):
+        """
+        This function forgets the last frame, so the next one is drawn in full.
+        """
+
+        self.previous = None
@@ -0,0 +1,469 @@
+"""
+Multi-game ERS server on one asyncio event loop.
+
+Clients connect over TCP or a Unix socket and speak a line protocol, one command per line:
+    join: wait for a game, which starts as soon as enough players are waiting.
+    draw: play the top card of your hand on your turn, or collect the pile after winning a chain.
+    slap: slap the pile.
+    quit: leave.
+The server sends every player of a game the same lines:
+    wait: you are waiting for a game.
+    start <game> <player> <players>: a game started and you are this player number.
+    turn <player>: it is this player's turn to draw, or to collect the pile.
+    card <player> <code>: this player drew the card with this code.
+    capture <player> <cards>: this player collected the pile.
+    slap <player> good <cards>: this player slapped and won the pile.
+    slap <player> burn <code>: this player slapped a pile that could not be slapped and burned this card.
+    slap <player> late: this player slapped an empty pile, or a pile that could not be slapped with no card to burn.
+    over <player>: the game ended and this player won, 0 if it was abandoned.
+    error <message>: the last command was not allowed.
+
+Every game is a Match built on GameState, so cards are drawn, captured, slapped and burned with the game's own
+methods and slaps are checked with its Pile and slap rules. Without slaps a Match plays the same game as run_game
+for its seed, with one more draw per chain for collecting the pile. Each line is stamped with
+time.perf_counter_ns() when it is read. Commands for a game wait in a heap ordered by that stamp and are applied
+once the event loop has read everything that arrived together, so simultaneous slaps are decided by which one the
+server received first.
+
+Run with: python -m ers.server --port 7777 [--unix ers.sock] [--players 2]
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from heapq import heappop, heappush
+
+from ers.engine import MAX_DECKS, MAX_PLAYERS, GameState, Rules
+
+# the most bytes a player can leave unread before they are dropped, so a player who stops reading cannot grow the
+# server's buffers without limit
+MAX_UNREAD = 1 << 20
+
+class Match:
+    """
+    This class is one game being played over the network.
+
+    Attributes:
+        server (GameServer): The server hosting the game.
+        game_id (int): The number of the game, also its seed.
+        game (GameState): The cards and rules of the game.
+        clients (list): The Client in each seat.
+        turn (Player): The player who draws or collects next.
+        pending (int): The cards still owed for the current face card, 0 outside a chain.
+        owner (Player): The player who played the current face card.
+        collecting (bool): Whether the chain is over and the owner's next draw collects the pile.
+        over (bool): Whether the game has ended.
+        actions (list): The heap of (received time, order, seat, command) not yet applied.
+        flushing (bool): Whether applying the actions is already scheduled.
+        order (iterator): Breaks ties between commands received in the same nanosecond.
+    """
+
+    def __init__(self, server, game_id, clients, rules):
+        """
+        The constructor for Match class. Deals the game from its id.
+
+        Parameters:
+            server (GameServer): The server hosting the game.
+            game_id (int): The number of the game, also its seed.
+            clients (list): The Client in each seat.
+            rules (Rules): The rule settings.
+        """
+
+        self.server = server
+        self.game_id = game_id
+        self.game = GameState(game_id, rules)
+        self.clients = clients
+        self.turn = self.game.players[0]
+        self.pending = 0
+        self.owner = None
+        self.collecting = False
+        self.over = False
+        self.actions = []
+        self.flushing = False
+        self.order = itertools.count()
+
+    def start(self):
+        """
+        This function tells every player the game has started and whose turn it is.
+        """
+
+        for seat, client in enumerate(self.clients):
+            client.match = self
+            client.seat = seat
+            client.send(f"start {self.game_id} {seat + 1} {len(self.clients)}")
+        self.broadcast(f"turn {self.turn.player}")
+
+    def broadcast(self, line):
+        """
+        This function sends a line to every player in the game.
+
+        Parameters:
+            line (str): The line, without its newline.
+        """
+
+        for client in self.clients:
+            client.send(line)
+
+    def submit(self, seat, command, time_ns):
+        """
+        This function queues a player's command, to be applied in the order the server received it.
+
+        Parameters:
+            seat (int): The seat of the player.
+            command (str): draw or slap.
+            time_ns (int): When the server read the command.
+        """
+
+        heappush(self.actions, (time_ns, next(self.order), seat, command))
+        if(not self.flushing):
+            self.flushing = True
+            # by the time this runs the loop has read every line that arrived with this one
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        """
+        This function applies the queued commands, earliest received first.
+        """
+
+        self.flushing = False
+        while self.actions:
+            time_ns, order, seat, command = heappop(self.actions)
+            if(self.over):
+                self.clients[seat].send("error game over")
+            elif(command == "draw"):
+                self.draw(seat)
+            else:
+                self.slap(seat)
+            self.server.actions += 1
+
+    def draw(self, seat):
+        """
+        This function plays the player's top card, or collects the pile for the winner of a chain.
+
+        Parameters:
+            seat (int): The seat of the player.
+        """
+
+        game = self.game
+        player = game.players[seat]
+        if(player is not self.turn):
+            self.clients[seat].send("error not your turn")
+            return
+        if(self.collecting):
+            self.collecting = False
+            size = len(game.pile.pile)
+            game.capture(player)
+            self.broadcast(f"capture {player.player} {size}")
+            self.next_turn(player)
+            return
+
+        card = game.draw(player)
+        self.broadcast(f"card {player.player} {card}")
+        times = game.rules.penalty[card]
+        if(game.is_game_over() and not game.pile.is_valid_slap()):
+            if(self.pending):
+                # running out during a penalty, even on a face card, gives the pile to the player who placed the last
+                # face card, as in the engine
+                self.pending = 0
+                size = len(game.pile.pile)
+                game.capture(self.owner)
+                self.broadcast(f"capture {self.owner.player} {size}")
+                self.next_turn(self.owner)
+            else:
+                self.finish()
+            return
+
+        if(times):
+            self.pending = times
+            self.owner = player
+            self.next_turn(game.next_player(player))
+        elif(self.pending):
+            self.pending -= 1
+            if(not self.pending):
+                # the winner of the chain collects with their next draw, and anyone can still slap until then
+                self.collecting = True
+                self.next_turn(self.owner)
+            else:
+                self.next_turn(player)
+        else:
+            self.next_turn(game.next_player(player))
+
+    def slap(self, seat):
+        """
+        This function checks a player's slap: a good slap wins the pile, a bad one burns their top card.
+
+        Parameters:
+            seat (int): The seat of the player.
+        """
+
+        game = self.game
+        player = game.players[seat]
+        if(not game.pile.pile):
+            self.broadcast(f"slap {player.player} late")
+            return
+        if(game.pile.is_valid_slap()):
+            size = len(game.pile.pile)
+            game.slap_capture(player)
+            self.pending = 0
+            self.collecting = False
+            self.broadcast(f"slap {player.player} good {size}")
+            # the slapper starts the next round
+            self.next_turn(player)
+        elif(player.hand):
+            # like the interactive game, the burned card goes on top of the pile
+            game.burn(player)
+            self.broadcast(f"slap {player.player} burn {game.pile.pile[0]}")
+            if(game.is_game_over() and not game.pile.is_valid_slap()):
+                self.finish()
+        else:
+            self.broadcast(f"slap {player.player} late")
+
+    def next_turn(self, player):
+        """
+        This function passes the turn, ending the game if at most one player still holds cards.
+
+        Parameters:
+            player (Player): The player whose turn it is now.
+        """
+
+        if(self.game.is_game_over() and not self.collecting and not self.game.pile.is_valid_slap()):
+            self.finish()
+            return
+        self.turn = player
+        self.broadcast(f"turn {player.player}")
+
+    def finish(self):
+        """
+        This function ends the game and tells every player who won.
+        """
+
+        self.over = True
+        self.broadcast(f"over {self.game.result().winner}")
+        self.server.finished(self)
+
+    def abandon(self):
+        """
+        This function ends the game without a winner because a player left.
+        """
+
+        self.over = True
+        self.broadcast("over 0")
+        self.server.abandoned += 1
+        self.server.matches.pop(self.game_id, None)
+
+class Client:
+    """
+    This class is one connected player.
+
+    Attributes:
+        writer (asyncio.StreamWriter): Where lines to the player are written.
+        match (Match): The game the player is in, None while waiting.
+        seat (int): The player's seat in the game.
+        lines (list): The lines not yet written, as bytes.
+    """
+
+    def __init__(self, writer):
+        """
+        The constructor for Client class.
+
+        Parameters:
+            writer (asyncio.StreamWriter): Where lines to the player are written.
+        """
+
+        self.writer = writer
+        self.match = None
+        self.seat = None
+        self.lines = []
+
+    def send(self, line):
+        """
+        This function queues a line for the player. Lines queued in the same turn of the event loop are written
+        together, so a draw and the turn that follows it cost one write.
+
+        Parameters:
+            line (str): The line, without its newline.
+        """
+
+        if(not self.lines):
+            asyncio.get_running_loop().call_soon(self.flush)
+        self.lines.append(line.encode())
+
+    def flush(self):
+        """
+        This function writes the queued lines, dropping them if the player has gone. A player with more than
+        MAX_UNREAD bytes not yet sent is disconnected, which ends their game like leaving does.
+        """
+
+        if(not self.writer.is_closing()):
+            self.lines.append(b"")
+            self.writer.write(b"\n".join(self.lines))
+            if(self.writer.transport.get_write_buffer_size() > MAX_UNREAD):
+                self.writer.transport.abort()
+        self.lines = []
+
+class GameServer:
+    """
+    This class accepts players, puts them in games and runs every game on the one event loop.
+
+    Attributes:
+        rules (Rules): The rule settings of every game.
+        waiting (list): The Clients waiting for a game.
+        matches (dict): The games being played, by game id.
+        game_ids (iterator): The id, and seed, of each new game.
+        started (int): The number of games started.
+        completed (int): The number of games played to the end.
+        abandoned (int): The number of games ended because a player left.
+        actions (int): The number of draws and slaps applied.
+    """
+
+    def __init__(self, rules=None, first_game=0):
+        """
+        The constructor for GameServer class.
+
+        Parameters:
+            rules (Rules): The rule settings of every game, defaults to two players.
+            first_game (int): The id and seed of the first game, the rest follow in order.
+        """
+
+        if(rules is None):
+            rules = Rules()
+        self.rules = rules
+        self.waiting = []
+        self.matches = {}
+        self.game_ids = itertools.count(first_game)
+        self.started = 0
+        self.completed = 0
+        self.abandoned = 0
+        self.actions = 0
+
+    async def handle(self, reader, writer):
+        """
+        This function serves one connection until the player quits or disconnects.
+
+        Parameters:
+            reader (asyncio.StreamReader): Where the player's lines come from.
+            writer (asyncio.StreamWriter): Where lines to the player are written.
+        """
+
+        client = Client(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                time_ns = time.perf_counter_ns()
+                if(not line):
+                    break
+                command = line.decode(errors="ignore").strip().lower()
+                if(command in ("draw", "slap")):
+                    if(client.match is None):
+                        client.send("error not in a game")
+                    else:
+                        client.match.submit(client.seat, command, time_ns)
+                elif(command == "join"):
+                    self.join(client)
+                elif(command == "quit"):
+                    break
+                elif(command):
+                    client.send(f"error unknown command {command}")
+                # stop reading from a player who is not reading what they are sent
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(client)
+            writer.close()
+
+    def join(self, client):
+        """
+        This function puts a player in the queue, starting a game once enough are waiting.
+
+        Parameters:
+            client (Client): The player.
+        """
+
+        if(client.match is not None and not client.match.over):
+            client.send("error already in a game")
+            return
+        if(client in self.waiting):
+            client.send("error already waiting")
+            return
+        client.match = None
+        self.waiting.append(client)
+        client.send("wait")
+        if(len(self.waiting) >= self.rules.players):
+            clients = self.waiting[:self.rules.players]
+            del self.waiting[:self.rules.players]
+            match = Match(self, next(self.game_ids), clients, self.rules)
+            self.matches[match.game_id] = match
+            self.started += 1
+            match.start()
+
+    def leave(self, client):
+        """
+        This function removes a player who left, ending their game for everyone else.
+
+        Parameters:
+            client (Client): The player.
+        """
+
+        if(client in self.waiting):
+            self.waiting.remove(client)
+        match = client.match
+        if(match is not None and not match.over):
+            match.abandon()
+
+    def finished(self, match):
+        """
+        This function forgets a game that has ended.
+
+        Parameters:
+            match (Match): The game.
+        """
+
+        self.completed += 1
+        self.matches.pop(match.game_id, None)
+
+    def stats(self):
+        """
+        This function describes the server's counts in one line.
+
+        Returns:
+            A string.
+        """
+
+        return (f"games started {self.started}, completed {self.completed}, abandoned {self.abandoned}, "
+                f"playing {len(self.matches)}, waiting players {len(self.waiting)}, actions {self.actions}")
+
+# starts listening on a Unix socket if unix_path is given, otherwise on TCP, and returns the asyncio Server
+async def start_server(server, host="127.0.0.1", port=7777, unix_path=None):
+    if(unix_path is not None):
+        return await asyncio.start_unix_server(server.handle, unix_path)
+    return await asyncio.start_server(server.handle, host, port, backlog=4096)
+
+async def serve(server, host, port, unix_path, report):
+    listener = await start_server(server, host, port, unix_path)
+    print(f"listening on {unix_path or f'{host}:{port}'}", flush=True)
+    async with listener:
+        while True:
+            await asyncio.sleep(report)
+            print(server.stats(), flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many ERS games over TCP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=7777, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="Unix socket path to listen on instead of TCP")
+    parser.add_argument("--players", type=int, default=2, choices=range(2, MAX_PLAYERS + 1), help="players per game")
+    parser.add_argument("--decks", type=int, default=1, choices=range(1, MAX_DECKS + 1), help="decks in the shoe")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest follow in order")
+    parser.add_argument("--report", type=float, default=10.0, help="seconds between printing the server's counts")
+    args = parser.parse_args()
+
+    server = GameServer(Rules(players=args.players, decks=args.decks), args.seed)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix, args.report))
+    except KeyboardInterrupt:
+        print(server.stats())
+
+if __name__ == "__main__":
+    main()
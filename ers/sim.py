@@ -0,0 +1,261 @@
+"""
+Multi-process Monte Carlo runner.
+
+Games are split into fixed size chunks. Chunk i gets its own random stream, spawned from the root seed with
+numpy's SeedSequence, so streams never overlap and a run gives the same totals for any number of workers.
+All of a chunk's deals are shuffled in one vectorized call from that stream.
+Each worker plays its chunk and sends back a SimSummary of counts instead of per game objects.
+With --cache, each worker looks every deal up in an OutcomeCache first and only plays the ones it has not seen.
+
+Run with: ers-sim --games 10000000 --workers 32
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ers.batch import BatchGame, shuffled_decks
+from ers.engine import DEFAULT_RULES, MAX_DECKS, MAX_PLAYERS, GameResult, GameState, Rules, build_deck
+from ers.slaps import DEFAULT_SLAPS, SLAP_RULES
+
+# number of games each worker plays per task, large enough that sending the summary back is negligible
+CHUNK_SIZE = 10000
+
+class SimSummary:
+    """
+    This class holds the aggregate results of many games.
+
+    Attributes:
+        games (int): The number of games played.
+        wins (ndarray): The number of wins for each player number, index 0 counts games nobody won.
+        turn_counts (ndarray): The number of games that lasted each number of turns.
+        captures (int): The number of piles won over all games.
+        infinite (int): The number of games stopped because they repeat forever.
+        cache_hits (int): The number of games whose outcome came from the cache.
+        cache_misses (int): The number of games looked up in the cache and played.
+    """
+
+    def __init__(self, players=2):
+        """
+        The constructor for SimSummary class.
+
+        Parameters:
+            players (int): The number of players in each game.
+        """
+
+        self.games = 0
+        self.wins = np.zeros(players + 1, dtype=np.int64)
+        self.turn_counts = np.zeros(0, dtype=np.int64)
+        self.captures = 0
+        self.infinite = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_games(self, winner, turns, captures, infinite):
+        """
+        This function adds the results of some games.
+
+        Parameters:
+            winner (ndarray): The player number of each winner, 0 if nobody won.
+            turns (ndarray): The number of cards drawn in each game.
+            captures (ndarray): The number of piles won in each game.
+            infinite (ndarray): Whether each game was stopped because it repeats forever.
+        """
+
+        self.games += len(winner)
+        self.wins += np.bincount(winner, minlength=len(self.wins))
+        self.add_turn_counts(np.bincount(turns))
+        self.captures += int(np.sum(captures))
+        self.infinite += int(np.count_nonzero(infinite))
+
+    def add_turn_counts(self, turn_counts):
+        """
+        This function adds a turn histogram to this one, growing it if needed.
+
+        Parameters:
+            turn_counts (ndarray): The number of games that lasted each number of turns.
+        """
+
+        if(len(turn_counts) > len(self.turn_counts)):
+            turn_counts = turn_counts.copy()
+            turn_counts[:len(self.turn_counts)] += self.turn_counts
+            self.turn_counts = turn_counts
+        else:
+            self.turn_counts[:len(turn_counts)] += turn_counts
+
+    def merge(self, other):
+        """
+        This function adds another summary's counts to this one.
+
+        Parameters:
+            other (SimSummary): The summary to add.
+        """
+
+        self.games += other.games
+        self.wins += other.wins
+        self.add_turn_counts(other.turn_counts)
+        self.captures += other.captures
+        self.infinite += other.infinite
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+    def mean_turns(self):
+        """
+        This function gives the average game length.
+
+        Returns:
+            A float.
+        """
+
+        return float(np.dot(np.arange(len(self.turn_counts)), self.turn_counts)) / max(self.games, 1)
+
+    def turn_percentile(self, q):
+        """
+        This function gives a percentile of the game length.
+
+        Parameters:
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            The smallest number of turns that at least q percent of games took at most, 0 if no games were played.
+        """
+
+        if(not self.games):
+            return 0
+        cumulative = np.cumsum(self.turn_counts)
+        return int(np.searchsorted(cumulative, q / 100 * cumulative[-1]))
+
+# one OutcomeCache per file for each process, so its in-memory LRU lasts across chunks
+open_caches = {}
+
+# returns the cache for the given file, opening it the first time this process asks for it
+def worker_cache(path):
+    if(path not in open_caches):
+        # imported here so workers without a cache never load sqlite3
+        from ers.cache import OutcomeCache
+        open_caches[path] = OutcomeCache(path)
+    return open_caches[path]
+
+# returns the random Generator a chunk's deals are shuffled with, the chunk's own stream of the root seed
+def chunk_rng(root_seed, chunk):
+    return np.random.default_rng(np.random.SeedSequence(root_seed, spawn_key=(chunk,)))
+
+# plays one chunk of games and returns its SimSummary, skipping the deals already in the cache
+def simulate_chunk(root_seed, chunk, size, rules=None, engine="batch", max_turns=None, cache_path=None):
+    if(rules is None):
+        rules = DEFAULT_RULES
+    decks = shuffled_decks(size, chunk_rng(root_seed, chunk), build_deck(rules.decks))
+    winner = np.zeros(size, dtype=np.int64)
+    turns = np.zeros(size, dtype=np.int64)
+    captures = np.zeros(size, dtype=np.int64)
+    cycle_start = np.zeros(size, dtype=np.int64)
+    cycle_length = np.zeros(size, dtype=np.int64)
+
+    # fill in the outcomes the cache already knows
+    cache = None
+    todo = np.arange(size)
+    if(cache_path is not None):
+        cache = worker_cache(cache_path)
+        missing = []
+        for game in range(size):
+            known = cache.get(decks[game], rules)
+            if(known is None):
+                missing.append(game)
+            else:
+                winner[game], turns[game], captures[game] = known.winner, known.turns, known.captures
+                cycle_start[game] = known.cycle_start or 0
+                cycle_length[game] = known.cycle_length or 0
+        todo = np.array(missing, dtype=np.int64)
+
+    if(engine == "batch"):
+        result = BatchGame(decks[todo], rules).run(max_turns)
+        winner[todo], turns[todo], captures[todo] = result.winner, result.turns, result.captures
+        cycle_start[todo], cycle_length[todo] = result.cycle_start, result.cycle_length
+    else:
+        for game in todo:
+            outcome = GameState(rules=rules, deck=decks[game].tolist()).play()
+            winner[game], turns[game], captures[game] = outcome.winner, outcome.turns, outcome.captures
+            cycle_length[game] = outcome.cycle_length or 0
+            cycle_start[game] = outcome.cycle_start or 0
+
+    # a game cut off by max_turns has no outcome yet, so nothing is stored when there is a limit
+    if(cache is not None and max_turns is None):
+        for game in todo:
+            cache.put(decks[game], rules, GameResult(int(winner[game]), int(turns[game]), int(captures[game]),
+                                                     int(cycle_start[game]) or None, int(cycle_length[game]) or None))
+
+    summary = SimSummary(rules.players)
+    summary.add_games(winner, turns, captures, cycle_length > 0)
+    if(cache is not None):
+        summary.cache_hits = size - len(todo)
+        summary.cache_misses = len(todo)
+        cache.flush()
+    return summary
+
+# splits the games into chunks, plays them on a process pool and merges the summaries
+def simulate(games, workers=None, root_seed=0, rules=None, engine="batch", max_turns=None, chunk_size=CHUNK_SIZE,
+             cache_path=None):
+    if(rules is None):
+        rules = DEFAULT_RULES
+    sizes = [chunk_size] * (games // chunk_size)
+    if(games % chunk_size):
+        sizes.append(games % chunk_size)
+    chunks = range(len(sizes))
+
+    summary = SimSummary(rules.players)
+    if(workers == 1):
+        for chunk, size in zip(chunks, sizes):
+            summary.merge(simulate_chunk(root_seed, chunk, size, rules, engine, max_turns, cache_path))
+        return summary
+
+    count = len(sizes)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(simulate_chunk, [root_seed] * count, chunks, sizes, [rules] * count,
+                             [engine] * count, [max_turns] * count, [cache_path] * count):
+            summary.merge(part)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ers-sim", description="Play many computer ERS games across processes.")
+    parser.add_argument("--games", type=int, default=100000, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="root seed every game's deal is derived from")
+    parser.add_argument("--engine", choices=["batch", "scalar"], default="batch", help="engine used to play each chunk")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="games per worker task")
+    parser.add_argument("--max-turns", type=int, default=None, help="give up on games longer than this")
+    parser.add_argument("--cache", default=None, help="SQLite file of known deal outcomes to reuse and extend")
+    parser.add_argument("--players", type=int, default=2, choices=range(2, MAX_PLAYERS + 1), help="players per game")
+    parser.add_argument("--decks", type=int, default=1, choices=range(1, MAX_DECKS + 1), help="decks in the shoe")
+    parser.add_argument("--slaps", default=",".join(DEFAULT_SLAPS),
+                        help=f"comma separated slap rules, from {', '.join(SLAP_RULES)}")
+    args = parser.parse_args(argv)
+    slap_rules = [name for name in args.slaps.split(",") if name]
+    unknown = [name for name in slap_rules if name not in SLAP_RULES]
+    if(unknown):
+        parser.error(f"unknown slap rules: {', '.join(unknown)}")
+    if(args.games < 1):
+        parser.error("--games must be at least 1")
+    rules = Rules(slap_rules=slap_rules, players=args.players, decks=args.decks)
+
+    start = time.perf_counter()
+    summary = simulate(args.games, args.workers, args.seed, rules, args.engine, args.max_turns,
+                       chunk_size=args.chunk_size, cache_path=args.cache)
+    elapsed = time.perf_counter() - start
+
+    print(f"games: {summary.games}")
+    for player in range(1, len(summary.wins)):
+        print(f"player {player} wins: {summary.wins[player]} ({summary.wins[player] / summary.games:.4f})")
+    print(f"infinite games: {summary.infinite}")
+    if(summary.wins[0] > summary.infinite):
+        print(f"unfinished or drawn: {summary.wins[0] - summary.infinite}")
+    print(f"turns: mean {summary.mean_turns():.1f}, median {summary.turn_percentile(50)}, "
+          f"p99 {summary.turn_percentile(99)}, max {len(summary.turn_counts) - 1}")
+    if(args.cache is not None):
+        print(f"cache: {summary.cache_hits} hits, {summary.cache_misses} misses")
+    print(f"games/sec: {summary.games / elapsed:,.0f}")
+
+if __name__ == "__main__":
+    main()
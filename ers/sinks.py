@@ -0,0 +1,255 @@
+"""
+Event sinks: where a game sends what happens in it, instead of printing it.
+
+A game calls sink.emit(event, **fields) for each event, and each sink does something different with them:
+    NullSink: nothing. A game given one treats it as no sink at all, so it costs nothing.
+    TextSink: the text the games have always printed, held in a buffer and written a block of lines at a time.
+    JsonLinesSink: one JSON object per event, one per line, in a file.
+    RingSink: the last N events in memory, to look at after a game goes wrong.
+
+The events, with their fields:
+    start: counts, the cards in each hand.
+    draw: player, card, the code of the card drawn.
+    face_chain: a face card chain started.
+    round: player, counts, the player who won the round and the cards in each hand after.
+    slap: player, good, a slap and whether it won the pile.
+    burn: player, card, a failed slap and the card burned, if known.
+    collect: player, the winner of a round collecting the pile.
+    infinite: cycle_length, cycle_start, the game repeats forever.
+    winner: player, the game ended.
+"""
+
+import json
+import sys
+from collections import deque
+
+from ers.cards import CARDS
+
+# the text of each event, as lines, matching what the games print, padded for the interactive game's round counts
+def event_lines(event, fields, padded=False):
+    if(event == "draw"):
+        return [f"Player {fields['player']}: {CARDS[fields['card']]}"]
+    if(event == "start"):
+        return ["Start!"] + hand_lines(fields["counts"])
+    if(event == "face_chain"):
+        return ["Face card chain!"]
+    if(event == "round"):
+        return [f"Player {fields['player']} won the round!"] + round_hand_lines(fields["counts"], padded) + [""]
+    if(event == "slap"):
+        return [f"Player {fields['player']}: Good slap!" if fields["good"] else f"Player {fields['player']}: Slap!"]
+    if(event == "burn"):
+        return [f"Player {fields['player']}: Slap failed! Burn a card!"]
+    if(event == "collect"):
+        return [f"Player {fields['player']} collecting cards"]
+    if(event == "infinite"):
+        return [f"Infinite game! It repeats every {fields['cycle_length']} cards from card {fields['cycle_start']}."]
+    if(event == "winner"):
+        return [f"Player {fields['player']} wins!"]
+    return [f"{event}: {fields}"]
+
+# the lines giving the number of cards each player holds, spaced like the games' print(label, count)
+def hand_lines(counts):
+    return [f"Player {player} # of cards:  {count}" for player, count in enumerate(counts, 1)]
+
+# the lines giving the number of cards each player holds after a round, the interactive game pads the counts to 4
+# wide and the simulator has always printed the last seat with one space instead of two
+def round_hand_lines(counts, padded=False):
+    if(padded):
+        return [f"Player {player} # of cards: {count:>4}" for player, count in enumerate(counts, 1)]
+    lines = hand_lines(counts)
+    lines[-1] = f"Player {len(counts)} # of cards: {counts[-1]}"
+    return lines
+
+class EventSink:
+    """
+    This class is the interface every sink has. The base class ignores every event.
+
+    Attributes:
+        active (bool): Whether games should send events here at all.
+    """
+
+    active = True
+
+    def emit(self, event, **fields):
+        """
+        This function takes one event.
+
+        Parameters:
+            event (str): The kind of event.
+            fields: The event's fields.
+        """
+
+    def flush(self):
+        """
+        This function writes out any events still held.
+        """
+
+    def close(self):
+        """
+        This function flushes and releases anything the sink holds open.
+        """
+
+        self.flush()
+
+    def __enter__(self):
+        """
+        The function to use a sink in a with block.
+
+        Returns:
+            The sink.
+        """
+
+        return self
+
+    def __exit__(self, *exc):
+        """
+        The function that closes the sink at the end of a with block.
+        """
+
+        self.close()
+
+class NullSink(EventSink):
+    """
+    This class drops every event. Games treat it as having no sink, so nothing is wrapped or checked for it.
+    """
+
+    active = False
+
+class TextSink(EventSink):
+    """
+    This class writes events as the lines the games have always printed, a block at a time.
+
+    Attributes:
+        file (file): Where the lines are written, defaults to standard output.
+        buffer_lines (int): The number of lines held before writing, 0 writes every event at once.
+        padded (bool): Whether the counts after a round are padded, as the interactive game prints them.
+        lines (list): The lines not written yet.
+    """
+
+    def __init__(self, file=None, buffer_lines=1000, padded=False):
+        """
+        The constructor for TextSink class.
+
+        Parameters:
+            file (file): Where the lines are written, defaults to standard output.
+            buffer_lines (int): The number of lines held before writing, 0 writes every event at once.
+            padded (bool): Whether to pad the counts after a round, as the interactive game prints them.
+        """
+
+        self.file = file
+        self.buffer_lines = buffer_lines
+        self.padded = padded
+        self.lines = []
+
+    def emit(self, event, **fields):
+        """
+        This function adds an event's lines, writing them out once enough are held or the game ends.
+
+        Parameters:
+            event (str): The kind of event.
+            fields: The event's fields.
+        """
+
+        self.lines += event_lines(event, fields, self.padded)
+        if(len(self.lines) >= self.buffer_lines or event in ("winner", "infinite")):
+            self.flush()
+
+    def flush(self):
+        """
+        This function writes the lines held.
+        """
+
+        if(self.lines):
+            # standard output is looked up here so it follows any redirect made after the sink was made
+            file = sys.stdout if self.file is None else self.file
+            self.lines.append("")
+            file.write("\n".join(self.lines))
+            file.flush()
+            self.lines = []
+
+class JsonLinesSink(EventSink):
+    """
+    This class writes each event as a JSON object on its own line.
+
+    Attributes:
+        file (file): The file written to.
+        owned (bool): Whether the sink opened the file and closes it.
+    """
+
+    def __init__(self, path):
+        """
+        The constructor for JsonLinesSink class.
+
+        Parameters:
+            path (str): The file to append to, or an open text file.
+        """
+
+        self.owned = isinstance(path, str)
+        self.file = open(path, "a", buffering=1 << 16) if self.owned else path
+
+    def emit(self, event, **fields):
+        """
+        This function writes an event.
+
+        Parameters:
+            event (str): The kind of event.
+            fields: The event's fields.
+        """
+
+        fields["event"] = event
+        self.file.write(json.dumps(fields) + "\n")
+
+    def flush(self):
+        """
+        This function writes out the file's buffer.
+        """
+
+        self.file.flush()
+
+    def close(self):
+        """
+        This function flushes the file, and closes it if the sink opened it.
+        """
+
+        self.flush()
+        if(self.owned):
+            self.file.close()
+
+class RingSink(EventSink):
+    """
+    This class keeps the last events in memory, dropping the oldest.
+
+    Attributes:
+        events (deque): The (event, fields) pairs kept, oldest first.
+    """
+
+    def __init__(self, size=1000):
+        """
+        The constructor for RingSink class.
+
+        Parameters:
+            size (int): The number of events kept.
+        """
+
+        self.events = deque(maxlen=size)
+
+    def emit(self, event, **fields):
+        """
+        This function keeps an event, dropping the oldest if full.
+
+        Parameters:
+            event (str): The kind of event.
+            fields: The event's fields.
+        """
+
+        self.events.append((event, fields))
+
+    def text(self):
+        """
+        This function gives the events kept as the text a TextSink would have written.
+
+        Returns:
+            A string of several lines.
+        """
+
+        return "\n".join(line for event, fields in self.events for line in event_lines(event, fields))
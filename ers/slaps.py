@@ -0,0 +1,158 @@
+"""
+Slap rules as data.
+
+Each slap rule is a function of the ranks of the top cards of the pile (and the bottom card, for rules that need it)
+that says whether the pile can be slapped. A set of rules is compiled once into a SlapTable: a bytes object with one
+entry for every combination of those ranks, so checking for a valid slap is a single lookup however many rules are
+turned on. Both engines use the same compiled table.
+
+New rules can be added with the slap_rule decorator.
+"""
+
+from functools import lru_cache
+
+from ers.cards import KING, QUEEN, RANK, VALUES
+
+# the rank used for a position with no card in it
+EMPTY = len(VALUES)
+RADIX = EMPTY + 1
+
+# every known rule by name, see slap_rule
+SLAP_RULES = {}
+
+# the rules used when none are given
+DEFAULT_SLAPS = ("double", "sandwich", "marriage")
+
+# adds the decorated function to SLAP_RULES
+def slap_rule(name, depth, uses_bottom=False):
+    """
+    This function registers a slap rule.
+
+    Parameters:
+        name (str): The name used to turn the rule on.
+        depth (int): The number of top cards the rule looks at, up to 4.
+        uses_bottom (bool): Whether the rule looks at the bottom card.
+
+    Returns:
+        A decorator for a function taking the ranks (top, second, third, fourth, bottom), EMPTY where there is no
+        card, and returning whether the pile can be slapped.
+    """
+
+    def register(function):
+        SLAP_RULES[name] = (function, depth, uses_bottom)
+        return function
+    return register
+
+# slap rule that allows the player to take the pile if the top and second to top card are the same
+@slap_rule("double", 2)
+def is_double(top, second, third, fourth, bottom):
+    return second != EMPTY and top == second
+
+# slap rule that allows the player to take the pile if the top and third to top card are the same
+@slap_rule("sandwich", 3)
+def is_sandwich(top, second, third, fourth, bottom):
+    return third != EMPTY and top == third
+
+# slap rule that allows the player to take the pile if the top card is a King and the second to top card is a Queen or vice versa
+@slap_rule("marriage", 2)
+def is_marriage(top, second, third, fourth, bottom):
+    return (top == KING and second == QUEEN) or (top == QUEEN and second == KING)
+
+# slap rule that allows the player to take the pile if the top and bottom card are the same
+@slap_rule("top_bottom", 2, uses_bottom=True)
+def is_top_bottom(top, second, third, fourth, bottom):
+    return second != EMPTY and top == bottom
+
+# slap rule that allows the player to take the pile if the top two cards add up to ten, with Ace as one
+@slap_rule("tens", 2)
+def is_tens(top, second, third, fourth, bottom):
+    return top <= 9 and second <= 9 and (top + 1) + (second + 1) == 10
+
+# slap rule that allows the player to take the pile if the top four cards count up or down in a row
+@slap_rule("four_in_a_row", 4)
+def is_four_in_a_row(top, second, third, fourth, bottom):
+    if(fourth == EMPTY):
+        return False
+    step = second - top
+    return (step == 1 or step == -1) and third - second == step and fourth - third == step
+
+class SlapTable:
+    """
+    This class is a set of slap rules compiled into a lookup table.
+
+    Attributes:
+        names (tuple): The names of the rules turned on.
+        depth (int): The number of top cards the table looks at.
+        uses_bottom (bool): Whether the table looks at the bottom card.
+        span (int): The number of combinations of the top cards, RADIX ** depth.
+        table (bytes): 1 where the pile can be slapped, see index.
+    """
+
+    def __init__(self, names):
+        """
+        The constructor for SlapTable class. Evaluates every rule on every combination of ranks.
+
+        Parameters:
+            names (tuple): The names of the rules to turn on, from SLAP_RULES.
+        """
+
+        for name in names:
+            if(name not in SLAP_RULES):
+                raise ValueError(f"unknown slap rule {name!r}, expected one of {sorted(SLAP_RULES)}")
+        rules = [SLAP_RULES[name] for name in names]
+        self.names = tuple(names)
+        self.depth = max([depth for function, depth, uses_bottom in rules] + [1])
+        self.uses_bottom = any(uses_bottom for function, depth, uses_bottom in rules)
+        self.span = RADIX ** self.depth
+
+        size = self.span * (RADIX if self.uses_bottom else 1)
+        table = bytearray(size)
+        for index in range(size):
+            # the lowest digit of the window is the top card
+            ranks = [EMPTY] * 5
+            window = index % self.span
+            for position in range(self.depth):
+                ranks[position] = window % RADIX
+                window //= RADIX
+            if(self.uses_bottom):
+                ranks[4] = index // self.span
+            for function, depth, uses_bottom in rules:
+                if(function(*ranks)):
+                    table[index] = 1
+                    break
+        self.table = bytes(table)
+
+    def __reduce__(self):
+        """
+        This function pickles the table as its rule names, so worker processes compile it once instead of
+        receiving the whole table with every task.
+        """
+
+        return (compile_slaps, (self.names,))
+
+    def index(self, pile):
+        """
+        This function gives the position of a pile in the table.
+
+        Parameters:
+            pile (deque): The card codes in the pile, index 0 is the top card.
+
+        Returns:
+            An int, the ranks of the top depth cards as digits with the top card lowest, plus the bottom card's.
+        """
+
+        length = len(pile)
+        index = 0
+        for position in range(min(length, self.depth) - 1, -1, -1):
+            index = index * RADIX + RANK[pile[position]]
+        # the positions past the bottom card are EMPTY, the highest digit, so a short pile adds all of them
+        if(length < self.depth):
+            index += self.span - RADIX ** length
+        if(self.uses_bottom):
+            index += (RANK[pile[-1]] if length else EMPTY) * self.span
+        return index
+
+# returns the compiled table for a set of rule names, compiled only once per process
+@lru_cache(maxsize=None)
+def compile_slaps(names=DEFAULT_SLAPS):
+    return SlapTable(tuple(names))
@@ -0,0 +1,358 @@
+"""
+Parameter sweeps over rule variants, resumable from a SQLite results store.
+
+A sweep file is JSON giving the games to play at every point, and either a grid, whose every combination is a point,
+or a list of points, or both:
+    {"games": 1000000, "seed": 0, "chunk_size": 10000,
+     "base": {"players": 2},
+     "grid": {"penalties.Ace": [3, 4, 5], "slaps": [["double"], ["double", "sandwich"]], "players": [2, 4]},
+     "points": [{"bots": [{"reaction": 0.3}, {"reaction": 0.4}]}]}
+A point can set penalties, slaps, players, decks and bots, a list of Bot settings, one for each seat, for games with
+slapping. A dotted key like penalties.Ace changes one entry of the setting it is in, a number picks one seat of a
+list, like bots.1.reaction once base gives the bots, and anything a point leaves out comes from base and then from
+the default rules. Every point is checked before anything is played, so a misspelled setting or a bad value stops
+the sweep straight away with the setting's name.
+
+Each point is keyed by a hash of its settings, the seed and the chunk size, and its games are split into chunks as in
+ers.sim, chunk i dealt from its own random stream. Chunks run on a process pool and each one is written to the
+store as soon as it finishes. Running the same sweep again only plays the chunks the store does not have yet, so an
+interrupted sweep picks up where it stopped, and raising games or adding points only plays the new chunks.
+
+Run with: python -m ers.sweep sweep.json --store sweep.db [--workers 8] [--report]
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ers.batch import shuffled_decks
+from ers.bots import Bot, SlapGame
+from ers.cards import DEFAULT_PENALTIES, VALUES
+from ers.engine import Rules, build_deck, rules_fingerprint
+from ers.sim import CHUNK_SIZE, SimSummary, chunk_rng, simulate_chunk
+from ers.slaps import DEFAULT_SLAPS
+
+# the settings a point starts from before base and its own settings are applied, with the slap rules sorted like
+# every point's
+DEFAULT_POINT = {"penalties": DEFAULT_PENALTIES, "slaps": sorted(DEFAULT_SLAPS), "players": 2, "decks": 1, "bots": None}
+
+# the settings each Bot in a point's bots can have
+BOT_SETTINGS = ("reaction", "spread", "miss_rate", "false_slap_rate")
+
+# the names allowed in each setting that holds others, by its path with # for any position in a list
+SETTING_NAMES = {(): tuple(DEFAULT_POINT), ("penalties",): VALUES, ("bots", "#"): BOT_SETTINGS}
+
+# returns a copy of config with a setting changed, a dotted name changes one entry of a nested setting and a number
+# picks one entry of a list, so bots.0.reaction is the first seat's reaction, raises ValueError for a bad name
+def set_option(config, name, value):
+    config = copy.deepcopy(config)
+    parts = name.split(".")
+    target = config
+    path = ()
+    for depth, part in enumerate(parts):
+        if(isinstance(target, list)):
+            if(not part.isdigit() or int(part) >= len(target)):
+                raise ValueError(f"setting {name}: {'.'.join(parts[:depth])} has {len(target)} entries, numbered "
+                                 f"from 0")
+            part = int(part)
+            path += ("#",)
+        elif(isinstance(target, dict) and part in SETTING_NAMES.get(path, ())):
+            path += (part,)
+        elif(target is None):
+            raise ValueError(f"setting {name}: {'.'.join(parts[:depth])} is not set, give it in base first")
+        else:
+            raise ValueError(f"unknown setting {name}")
+        if(depth == len(parts) - 1):
+            target[part] = value
+        else:
+            target = target[part] if isinstance(target, list) else target.get(part)
+    return config
+
+# raises ValueError if a point cannot be played, so a bad sweep fails before any of it is played
+def check_point(point):
+    rules = point_rules(point)
+    if(point["bots"] is not None):
+        if(len(point["bots"]) != rules.players):
+            raise ValueError(f"{len(point['bots'])} bots for {rules.players} players")
+        for settings in point["bots"]:
+            Bot(**settings)
+
+# returns every point of the sweep, the combinations of the grid followed by the listed points
+def expand(sweep):
+    # a copy, so a sweep with no settings of its own gets a point it can change without changing the defaults
+    base = copy.deepcopy(DEFAULT_POINT)
+    for name, value in sweep.get("base", {}).items():
+        base = set_option(base, name, value)
+
+    points = []
+    grid = sweep.get("grid", {})
+    for name, values in grid.items():
+        if(not isinstance(values, list) or not values):
+            raise ValueError(f"grid setting {name} needs a list of at least one value")
+    if(grid):
+        names = list(grid)
+        for values in itertools.product(*(grid[name] for name in names)):
+            point = base
+            for name, value in zip(names, values):
+                point = set_option(point, name, value)
+            points.append(point)
+    for settings in sweep.get("points", []):
+        point = base
+        for name, value in settings.items():
+            point = set_option(point, name, value)
+        points.append(point)
+    if(not points):
+        points.append(base)
+    # the order slap rules are listed in does not change the games, so it does not change the key either
+    for point in points:
+        point["slaps"] = sorted(point["slaps"])
+        check_point(point)
+    return points
+
+# returns the Rules a point is played with
+def point_rules(point):
+    return Rules(point["penalties"], point["slaps"], point["players"], point["decks"])
+
+# returns the key of a point's results, which changes with anything that changes the games played
+def point_key(point, seed, chunk_size):
+    return rules_fingerprint({"point": point, "seed": seed, "chunk_size": chunk_size})
+
+# returns the sizes of the chunks the given number of games is split into
+def chunk_sizes(games, chunk_size):
+    sizes = [chunk_size] * (games // chunk_size)
+    if(games % chunk_size):
+        sizes.append(games % chunk_size)
+    return sizes
+
+# plays one chunk of a point with the batch engine, or with SlapGame if it has bots, returns its SimSummary and seconds
+def run_chunk(point, seed, chunk, size):
+    start = time.perf_counter()
+    rules = point_rules(point)
+    if(point["bots"] is None):
+        return simulate_chunk(seed, chunk, size, rules), time.perf_counter() - start
+
+    bots = [Bot(**settings) for settings in point["bots"]]
+    rng = chunk_rng(seed, chunk)
+    decks = shuffled_decks(size, rng, build_deck(rules.decks))
+    # each game's bots get their own seed from the chunk's stream, so the chunk plays the same however often it runs
+    game_seeds = rng.integers(2 ** 63, size=size)
+    winner = np.zeros(size, dtype=np.int64)
+    turns = np.zeros(size, dtype=np.int64)
+    captures = np.zeros(size, dtype=np.int64)
+    for game in range(size):
+        result = SlapGame(bots, int(game_seeds[game]), rules, deck=decks[game].tolist()).play()
+        winner[game], turns[game], captures[game] = result.winner, result.turns, result.captures
+    summary = SimSummary(rules.players)
+    summary.add_games(winner, turns, captures, np.zeros(size, dtype=bool))
+    return summary, time.perf_counter() - start
+
+class ResultStore:
+    """
+    This class keeps the finished chunks of every sweep point in a SQLite file.
+
+    Attributes:
+        connection (sqlite3.Connection): The SQLite file.
+    """
+
+    def __init__(self, path):
+        """
+        The constructor for ResultStore class.
+
+        Parameters:
+            path (str): The SQLite file, created if needed.
+        """
+
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS points (
+            key TEXT PRIMARY KEY, config TEXT, seed INTEGER, chunk_size INTEGER)""")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS chunks (
+            key TEXT, chunk INTEGER, games INTEGER, wins TEXT, turn_counts BLOB, captures INTEGER, infinite INTEGER,
+            seconds REAL, PRIMARY KEY (key, chunk)) WITHOUT ROWID""")
+
+    def add_point(self, key, point, seed, chunk_size):
+        """
+        This function records a point's settings, so a report can show them.
+
+        Parameters:
+            key (str): The point's key.
+            point (dict): The point's settings.
+            seed (int): The root seed its chunks are dealt from.
+            chunk_size (int): The games in each full chunk.
+        """
+
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO points VALUES (?, ?, ?, ?)",
+                                    (key, json.dumps(point, sort_keys=True), seed, chunk_size))
+
+    def done_chunks(self, key):
+        """
+        This function gives the chunks of a point already stored, with their sizes.
+
+        Parameters:
+            key (str): The point's key.
+
+        Returns:
+            A dict of chunk number to number of games.
+        """
+
+        return dict(self.connection.execute("SELECT chunk, games FROM chunks WHERE key = ?", (key,)))
+
+    def save_chunk(self, key, chunk, summary, seconds):
+        """
+        This function stores a finished chunk, replacing one of another size left by a sweep with a different number
+        of games.
+
+        Parameters:
+            key (str): The point's key.
+            chunk (int): The chunk number.
+            summary (SimSummary): The chunk's results.
+            seconds (float): The time the chunk took to play.
+        """
+
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                    (key, chunk, summary.games, json.dumps(summary.wins.tolist()),
+                                     summary.turn_counts.astype(np.int64).tobytes(), summary.captures,
+                                     summary.infinite, seconds))
+
+    def summary(self, key, players, sizes=None):
+        """
+        This function merges a point's stored chunks.
+
+        Parameters:
+            key (str): The point's key.
+            players (int): The number of players at the point.
+            sizes (list): The games in each chunk of the sweep, only chunks stored with exactly that many games are
+                merged. None merges every chunk.
+
+        Returns:
+            A SimSummary, and the number of chunks left out because they were stored with a different number of games.
+        """
+
+        summary = SimSummary(players)
+        left_out = 0
+        rows = self.connection.execute(
+            "SELECT chunk, games, wins, turn_counts, captures, infinite FROM chunks WHERE key = ?", (key,))
+        for chunk, games, wins, turn_counts, captures, infinite in rows:
+            if(sizes is not None and (chunk >= len(sizes) or games != sizes[chunk])):
+                # a last chunk played for a different number of games holds different deals, so it cannot be cut down
+                left_out += chunk < len(sizes)
+                continue
+            part = SimSummary(players)
+            part.games = games
+            part.wins = np.array(json.loads(wins), dtype=np.int64)
+            part.turn_counts = np.frombuffer(turn_counts, dtype=np.int64).copy()
+            part.captures = captures
+            part.infinite = infinite
+            summary.merge(part)
+        return summary, left_out
+
+    def close(self):
+        """
+        This function closes the SQLite file.
+        """
+
+        self.connection.close()
+
+# returns the (key, point, chunk, size) of every chunk the store does not have yet
+def pending_jobs(sweep, store):
+    seed = sweep.get("seed", 0)
+    chunk_size = sweep.get("chunk_size", CHUNK_SIZE)
+    jobs = []
+    for point in expand(sweep):
+        key = point_key(point, seed, chunk_size)
+        store.add_point(key, point, seed, chunk_size)
+        done = store.done_chunks(key)
+        for chunk, size in enumerate(chunk_sizes(sweep["games"], chunk_size)):
+            # a last chunk from a sweep with a different number of games is played again at this sweep's size
+            if(done.get(chunk) != size):
+                jobs.append((key, point, chunk, size))
+    return jobs
+
+# plays every chunk of the sweep not in the store yet on a process pool, saving each one as it finishes
+def run_sweep(sweep, store, workers=None, progress=True):
+    seed = sweep.get("seed", 0)
+    jobs = pending_jobs(sweep, store)
+    if(progress):
+        print(f"{len(jobs)} chunks to play", flush=True)
+    if(not jobs):
+        return 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_chunk, point, seed, chunk, size): (key, chunk) for key, point, chunk, size in jobs}
+        try:
+            for finished, future in enumerate(as_completed(futures), 1):
+                key, chunk = futures[future]
+                summary, seconds = future.result()
+                store.save_chunk(key, chunk, summary, seconds)
+                if(progress):
+                    print(f"chunk {finished}/{len(jobs)} done, {time.perf_counter() - start:.1f} s", flush=True)
+        except KeyboardInterrupt:
+            # finished chunks are already stored, the rest are played next time
+            for future in futures:
+                future.cancel()
+            raise
+    return len(jobs)
+
+# returns a line describing the settings of a point that differ from the defaults
+def describe(point):
+    changed = [f"{name}={json.dumps(value)}" for name, value in point.items() if value != DEFAULT_POINT[name]]
+    return ", ".join(changed) or "default rules"
+
+# prints the merged results of every point of the sweep that has chunks stored
+def report(sweep, store):
+    seed = sweep.get("seed", 0)
+    chunk_size = sweep.get("chunk_size", CHUNK_SIZE)
+    sizes = chunk_sizes(sweep["games"], chunk_size)
+    for point in expand(sweep):
+        key = point_key(point, seed, chunk_size)
+        summary, left_out = store.summary(key, point["players"], sizes)
+        print(f"{key}  {describe(point)}")
+        if(left_out):
+            print(f"    {left_out} stored chunk(s) played for a different number of games left out, run the sweep to "
+                  f"play them at this size")
+        if(not summary.games):
+            print("    no games yet")
+            continue
+        rates = " ".join(f"{summary.wins[player] / summary.games:.4f}" for player in range(1, len(summary.wins)))
+        print(f"    games {summary.games}, win rates {rates}, infinite {summary.infinite}, "
+              f"turns mean {summary.mean_turns():.1f} median {summary.turn_percentile(50)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep ERS rule variants, resuming from a results store.")
+    parser.add_argument("sweep", help="JSON file describing the sweep")
+    parser.add_argument("--store", default="sweep.db", help="SQLite file the finished chunks are kept in")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--games", type=int, default=None, help="games per point, instead of the sweep file's")
+    parser.add_argument("--report", action="store_true", help="only print the results stored so far")
+    args = parser.parse_args()
+
+    with open(args.sweep) as file:
+        sweep = json.load(file)
+    if(args.games is not None):
+        sweep["games"] = args.games
+    try:
+        expand(sweep)
+    except (TypeError, ValueError) as error:
+        parser.error(f"{args.sweep}: {error}")
+    store = ResultStore(args.store)
+    try:
+        if(not args.report):
+            run_sweep(sweep, store, args.workers)
+    except KeyboardInterrupt:
+        print("stopped, run again to resume")
+    finally:
+        report(sweep, store)
+        store.close()
+
+if __name__ == "__main__":
+    main()
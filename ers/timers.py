@@ -0,0 +1,121 @@
+"""
+Pacing and lockout timers for the interactive game.
+
+Pauses are deadlines instead of sleeps. After a slap or a draw the game sets a deadline and carries on reading
+keys: a key stamped before the deadline is counted, and the latest ones kept in Deadlines.ignored, but does not act,
+and redraws are scheduled on the event loop for when the pause ends. Nothing blocks, so no input is missed and nothing stops
+rendering while the game is paused. A turn can also time out, which plays the waiting move for the player.
+
+All times are on the time.perf_counter_ns() clock that KeyEvent stamps use.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+# the number of keys pressed during pauses that are kept, the oldest are dropped so a long session uses no more memory
+IGNORED_KEPT = 100
+
+class Pacing:
+    """
+    This class holds how long the game pauses.
+
+    Attributes:
+        slap_lockout (float): Seconds keys are ignored after a slap.
+        draw_delay (float): Seconds keys are ignored, and the redraw held back, after each card is played.
+        turn_timeout (float): Seconds a player has to draw or collect before it is done for them, None to wait forever.
+    """
+
+    def __init__(self, slap_lockout=5.0, draw_delay=0.5, turn_timeout=None):
+        """
+        The constructor for Pacing class.
+
+        Parameters:
+            slap_lockout (float): Seconds keys are ignored after a slap.
+            draw_delay (float): Seconds keys are ignored, and the redraw held back, after each card is played.
+            turn_timeout (float): Seconds a player has to draw or collect, None to wait forever.
+        """
+
+        self.slap_lockout = slap_lockout
+        self.draw_delay = draw_delay
+        self.turn_timeout = turn_timeout
+
+# no artificial delay at all, for testing
+FAST = Pacing(0, 0, None)
+
+class Deadlines:
+    """
+    This class keeps the time the current pause ends and the keys pressed during pauses.
+
+    Attributes:
+        until_ns (int): The time keys start acting again.
+        ignored (deque): The last IGNORED_KEPT KeyEvents pressed during a pause, oldest first.
+        ignored_count (int): The number of keys pressed during pauses.
+    """
+
+    def __init__(self):
+        """
+        The constructor for Deadlines class.
+        """
+
+        self.until_ns = 0
+        self.ignored = deque(maxlen=IGNORED_KEPT)
+        self.ignored_count = 0
+
+    def lock(self, seconds):
+        """
+        This function pauses for the given time, after any pause already running.
+
+        Parameters:
+            seconds (float): The length of the pause.
+        """
+
+        self.until_ns = max(self.until_ns, time.perf_counter_ns()) + int(seconds * 1e9)
+
+    def remaining(self):
+        """
+        This function gives the time left in the current pause.
+
+        Returns:
+            Seconds, 0 if there is no pause.
+        """
+
+        return max(self.until_ns - time.perf_counter_ns(), 0) / 1e9
+
+    def at_end(self, callback, *args):
+        """
+        This function schedules a callback on the event loop for when the current pause ends.
+
+        Parameters:
+            callback (function): Called with args, right away if there is no pause.
+        """
+
+        asyncio.get_running_loop().call_later(self.remaining(), callback, *args)
+
+    async def next_key(self, keys, timeout=None):
+        """
+        This function waits for the next key pressed outside a pause.
+
+        Parameters:
+            keys (KeyInput): Where the keys come from.
+            timeout (float): Seconds to wait after the pause ends, None to wait forever.
+
+        Returns:
+            A KeyEvent, or None if the time ran out.
+        """
+
+        end = None
+        if(timeout is not None):
+            end = max(self.until_ns, time.perf_counter_ns()) + int(timeout * 1e9)
+        while True:
+            wait = None
+            if(end is not None):
+                wait = max(end - time.perf_counter_ns(), 0) / 1e9
+            try:
+                event = await asyncio.wait_for(keys.get(), wait)
+            except asyncio.TimeoutError:
+                return None
+            if(event.time_ns >= self.until_ns):
+                return event
+            self.ignored.append(event)
+            self.ignored_count += 1
@@ -0,0 +1,68 @@
+"""
+Checks that the NumPy BatchGame plays every deal exactly like the scalar GameState.
+"""
+
+import numpy as np
+import pytest
+
+from ers.batch import BatchGame, decks_from_seeds
+from ers.engine import GameState, Rules
+
+SLAP_SETS = [
+    ["double", "sandwich", "marriage"],
+    [],
+    ["double"],
+    ["double", "sandwich", "top_bottom", "tens", "four_in_a_row"],
+]
+
+# reduced deck deals known to repeat forever, with the number of players they are dealt to and the slap rules
+CYCLING_DEALS = [
+    (2, [], [40, 8, 4, 8, 8, 12, 4, 40, 12, 40, 12, 4, 40, 4, 12, 8]),
+    (2, ["double"], [42, 13, 9, 14, 5, 6, 12, 43, 10, 41, 8, 15, 40, 4, 11, 7]),
+    (2, ["double"], [12, 9, 11, 19, 13, 5, 7, 10, 15, 17, 43, 16, 42, 8, 18, 14, 6, 4, 40, 41]),
+    (3, ["double"], [4, 43, 10, 13, 42, 7, 41, 8, 9, 40, 6, 14, 11, 12, 15, 5]),
+    (3, ["double"], [12, 9, 5, 10, 8, 6, 45, 14, 44, 4, 13, 46]),
+    (4, ["double"], [8, 40, 12, 4, 13, 10, 5, 41, 6, 42, 9, 14]),
+    (4, ["double"], [40, 41, 4, 5, 8, 6, 42, 9, 10]),
+]
+
+# returns the scalar results of each deal as (winner, turns, captures, cycle_start, cycle_length)
+def scalar_outcomes(decks, rules):
+    outcomes = []
+    for deck in decks:
+        result = GameState(rules=rules, deck=deck.tolist()).play()
+        outcomes.append((result.winner, result.turns, result.captures, result.cycle_start, result.cycle_length))
+    return outcomes
+
+# returns the batch results of the deals as (winner, turns, captures, cycle_start, cycle_length), None where not infinite
+def batch_outcomes(decks, rules):
+    result = BatchGame(decks, rules).run()
+    outcomes = []
+    for i in range(len(decks)):
+        infinite = result.cycle_length[i] > 0
+        outcomes.append((int(result.winner[i]), int(result.turns[i]), int(result.captures[i]),
+                         int(result.cycle_start[i]) if infinite else None,
+                         int(result.cycle_length[i]) if infinite else None))
+    return outcomes
+
+@pytest.mark.parametrize("slaps", SLAP_SETS)
+@pytest.mark.parametrize("decks", [1, 2])
+@pytest.mark.parametrize("players", [2, 3, 4])
+def test_batch_matches_scalar(players, decks, slaps):
+    rules = Rules(slap_rules=slaps, players=players, decks=decks)
+    deals = decks_from_seeds(range(40), decks)
+    assert batch_outcomes(deals, rules) == scalar_outcomes(deals, rules)
+
+@pytest.mark.parametrize("players, slaps, deal", CYCLING_DEALS)
+def test_batch_matches_scalar_on_cycles(players, slaps, deal):
+    rules = Rules(slap_rules=slaps, players=players)
+    deals = np.array([deal], dtype=np.int8)
+    scalar = scalar_outcomes(deals, rules)
+    assert scalar[0][4] is not None
+    assert batch_outcomes(deals, rules) == scalar
+
+def test_cycle_start_is_where_the_game_repeats():
+    # this deal is back where it was dealt after one cycle, so it repeats from the very first card
+    players, slaps, deal = CYCLING_DEALS[0]
+    result = GameState(rules=Rules(slap_rules=slaps, players=players), deck=deal).play()
+    assert (result.cycle_start, result.cycle_length) == (0, 1170)
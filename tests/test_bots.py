@@ -0,0 +1,124 @@
+"""
+Checks that bot games stepped, forked and slapped by hand play the same game as play.
+"""
+
+import pytest
+
+from ers.bots import FALSE_SLAP, Bot, SlapGame
+from ers.engine import Rules
+from ers.sinks import RingSink
+from tests.test_engine import draw_index
+
+BOTS = [Bot(), Bot(reaction=0.25, false_slap_rate=0.05), Bot(reaction=0.45, miss_rate=0.3), Bot(false_slap_rate=0)]
+
+GAMES = [(players, decks) for players in (2, 3, 4) for decks in (1, 2)]
+
+# returns a bot game with the given seed, players and decks
+def bot_game(seed, players, decks, **options):
+    return SlapGame(BOTS[:players], seed, Rules(players=players, decks=decks), **options)
+
+# returns everything a bot game ends with
+def outcome(game, result):
+    return repr(result), game.good_slaps, game.burns, game.hand_counts()
+
+@pytest.mark.parametrize("players, decks", GAMES)
+def test_stepping_plays_the_same_game(players, decks):
+    for seed in range(10):
+        sink = RingSink(10 ** 6)
+        game = bot_game(seed, players, decks, sink=sink)
+        played = outcome(game, game.play())
+        events = list(sink.events)
+
+        sink = RingSink(10 ** 6)
+        game = bot_game(seed, players, decks, sink=sink)
+        cards = 0
+        while game.step() is not None:
+            cards += 1
+        assert cards == game.turns
+        assert outcome(game, game.result()) == played
+        assert list(sink.events) == events
+
+@pytest.mark.parametrize("players, decks", GAMES)
+def test_fork_plays_the_rest_of_the_same_game(players, decks):
+    for seed in range(10):
+        sink = RingSink(10 ** 6)
+        game = bot_game(seed, players, decks, sink=sink)
+        played = outcome(game, game.play())
+        events = list(sink.events)
+        for cards in (0, 1, game.turns // 3, game.turns // 2):
+            game = bot_game(seed, players, decks)
+            game.advance(cards)
+            sink = RingSink(10 ** 6)
+            fork = game.fork(sink)
+            assert isinstance(fork, SlapGame)
+            assert outcome(fork, fork.play()) == played
+            assert list(sink.events) == events[draw_index(events, game.turns + 1):]
+            # the game forked from is not changed by the fork and plays on the same way
+            assert outcome(game, game.play()) == played
+
+def test_max_turns_stops_stepped_games_too():
+    game = bot_game(3, 4, 2, max_turns=200)
+    played = outcome(game, game.play())
+    assert played[0].startswith("GameResult(winner=0")
+    game = bot_game(3, 4, 2, max_turns=200)
+    game.advance(50)
+    fork = game.fork()
+    assert outcome(fork, fork.play()) == played
+
+def test_fork_leaves_its_snapshot_unchanged():
+    game = bot_game(5, 2, 1)
+    game.advance(60)
+    snapshot = game.snapshot()
+    before = repr(sorted(vars(snapshot).items(), key=lambda item: item[0]))
+    state = snapshot.rng.bit_generator.state
+    results = []
+    for seat in (None, 0, 1):
+        fork = snapshot.fork()
+        assert fork.snapshot() is snapshot
+        if(seat is not None):
+            fork.slap(fork.players[seat])
+        results.append(outcome(fork, fork.play()))
+        assert repr(sorted(vars(snapshot).items(), key=lambda item: item[0])) == before
+        assert snapshot.rng.bit_generator.state == state
+    assert results[0] == outcome(game, game.play())
+
+def test_slaps_by_hand_keep_every_card():
+    for seed in range(20):
+        game = bot_game(seed, 3, 1)
+        game.advance(seed)
+        for seat in (0, 1, 2):
+            game.slap(game.players[seat])
+            game.advance(7)
+            cards = sum(game.hand_counts()) + len(game.pile.pile)
+            assert cards == 52
+            # the slap table index the bots slap from still matches the pile
+            assert bool(game.is_slappable()) == (bool(game.pile.pile) and game.pile.is_valid_slap())
+        game.play()
+        assert sum(game.hand_counts()) + len(game.pile.pile) == 52
+
+@pytest.mark.parametrize("options", [{"reaction": 0}, {"reaction": -1}, {"spread": -0.1}, {"miss_rate": 1.5},
+                                     {"false_slap_rate": 1}, {"false_slap_rate": -0.01}])
+def test_bot_settings_are_checked(options):
+    name = next(iter(options))
+    with pytest.raises(ValueError, match=name):
+        Bot(**options)
+
+def test_bots_react_to_a_burn_that_makes_the_pile_slappable():
+    steady = {"reaction": 0.1, "spread": 0, "miss_rate": 0}
+    game = SlapGame([Bot(**steady), Bot(false_slap_rate=0, **steady)], 0)
+    game.turns = 10
+    now = game.turns * game.pace
+    # a 6 on the pile, and player 1 slaps by mistake with a 6 on top of their hand
+    game.pile.pile.clear()
+    game.capture(game.players[1])
+    game.pile.add_card_to_pile(20)
+    game.place(20)
+    game.players[0].hand.appendleft(21)
+    game.events = [(now + 0.05, 0, FALSE_SLAP)]
+
+    winner = game.slap_window(False)
+    assert game.burns == [1, 0]
+    # the double the burn made is slapped 0.1 seconds later
+    assert winner is game.players[0]
+    assert game.good_slaps == [1, 0]
+    assert not game.pile.pile
@@ -0,0 +1,79 @@
+"""
+Checks the deal to outcome cache and that a simulation gives the same totals with it.
+"""
+
+import numpy as np
+
+import ers.sim
+from ers.cache import OutcomeCache
+from ers.engine import GameState, Rules, seeded_deck
+from ers.sim import simulate_chunk
+
+# returns the deals of the given seeds and their outcomes under rules
+def played(seeds, rules):
+    deals = [seeded_deck(seed, rules.decks) for seed in seeds]
+    return deals, [GameState(rules=rules, deck=deal).play() for deal in deals]
+
+def test_outcomes_persist_across_instances(tmp_path):
+    path = str(tmp_path / "outcomes.db")
+    rules = Rules()
+    deals, results = played(range(20), rules)
+    cache = OutcomeCache(path)
+    for deal, result in zip(deals, results):
+        cache.put(deal, rules, result)
+    cache.close()
+
+    cache = OutcomeCache(path)
+    for deal, result in zip(deals, results):
+        assert repr(cache.get(deal, rules)) == repr(result)
+    assert cache.stats() == {"memory_hits": 0, "disk_hits": 20, "misses": 0}
+    # a deal read from disk is kept in memory for the next lookup
+    assert repr(cache.get(deals[0], rules)) == repr(results[0])
+    assert cache.memory_hits == 1
+    cache.close()
+
+def test_memory_keeps_only_the_most_recently_used():
+    rules = Rules()
+    deals, results = played(range(10), rules)
+    cache = OutcomeCache(capacity=4)
+    for deal, result in zip(deals, results):
+        cache.put(deal, rules, result)
+        assert len(cache.memory) <= 4
+    # using the oldest deal still kept saves it from the next eviction
+    assert cache.get(deals[6], rules) is not None
+    cache.put(deals[0], rules, results[0])
+    assert cache.get(deals[6], rules) is not None
+    assert cache.get(deals[7], rules) is None
+    assert cache.get(deals[1], rules) is None
+    assert len(cache.memory) == 4
+
+def test_rules_never_share_outcomes(tmp_path):
+    cache = OutcomeCache(str(tmp_path / "outcomes.db"))
+    deal = seeded_deck(3)
+    rules = [Rules(), Rules(slap_rules=["double"]), Rules(players=3), Rules(penalties={"Jack": 2})]
+    assert len({rule.fingerprint for rule in rules}) == len(rules)
+    cache.put(deal, rules[0], GameState(rules=rules[0], deck=deal).play())
+    cache.flush()
+    for rule in rules[1:]:
+        assert cache.get(deal, rule) is None
+    assert cache.get(deal, rules[0]) is not None
+    cache.close()
+
+def test_simulation_totals_match_with_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ers.sim, "open_caches", {})
+    path = str(tmp_path / "outcomes.db")
+    rules = Rules(slap_rules=["double"], players=3)
+    plain = simulate_chunk(7, 0, 200, rules)
+    first = simulate_chunk(7, 0, 200, rules, cache_path=path)
+    assert (first.cache_hits, first.cache_misses) == (0, 200)
+    second = simulate_chunk(7, 0, 200, rules, cache_path=path)
+    assert (second.cache_hits, second.cache_misses) == (200, 0)
+    # a new process reads the outcomes back from disk
+    monkeypatch.setattr(ers.sim, "open_caches", {})
+    third = simulate_chunk(7, 0, 200, rules, "scalar", cache_path=path)
+    assert (third.cache_hits, third.cache_misses) == (200, 0)
+    for summary in (first, second, third):
+        assert summary.games == plain.games
+        assert np.array_equal(summary.wins, plain.wins)
+        assert np.array_equal(summary.turn_counts, plain.turn_counts)
+        assert (summary.captures, summary.infinite) == (plain.captures, plain.infinite)
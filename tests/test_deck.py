@@ -0,0 +1,57 @@
+"""
+Checks building, shuffling and dealing shoes for both engines.
+"""
+
+import random
+from collections import Counter
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from ers.batch import decks_from_seeds, shuffled_decks
+from ers.engine import build_deck, deal_cards, seeded_deck, shuffle_deck
+
+@pytest.mark.parametrize("decks", [1, 2, 8])
+@pytest.mark.parametrize("players", [2, 3, 5])
+def test_every_deal_is_the_whole_shoe(decks, players):
+    shoe = sorted(build_deck(decks))
+    assert len(shoe) == 52 * decks
+    for seed in range(10):
+        deck = seeded_deck(seed, decks)
+        assert sorted(deck) == shoe
+        hands = deal_cards(deck, players)
+        assert sorted(card for hand in hands for card in hand) == shoe
+        # earlier seats get the extra cards
+        assert max(map(len, hands)) - min(map(len, hands)) <= 1
+        assert [len(hand) for hand in hands] == sorted((len(hand) for hand in hands), reverse=True)
+
+def test_same_seed_same_deal():
+    for decks in (1, 3):
+        assert seeded_deck(7, decks) == seeded_deck(7, decks)
+        assert seeded_deck(7, decks) != seeded_deck(8, decks)
+    assert np.array_equal(decks_from_seeds(range(5), 2), np.array([seeded_deck(seed, 2) for seed in range(5)]))
+
+def test_shuffle_gives_every_order_evenly():
+    rng = random.Random(0)
+    orders = Counter()
+    for _ in range(12000):
+        deck = [0, 1, 2, 3]
+        shuffle_deck(deck, rng)
+        orders[tuple(deck)] += 1
+    assert set(orders) == set(permutations(range(4)))
+    # each of the 24 orders is expected 500 times
+    assert all(380 < count < 620 for count in orders.values())
+
+@pytest.mark.parametrize("decks", [1, 2])
+def test_shuffled_decks(decks):
+    deck = build_deck(decks)
+    shoes = shuffled_decks(50, np.random.default_rng(3), deck)
+    assert shoes.shape == (50, 52 * decks)
+    assert shoes.dtype == np.int8
+    assert (np.sort(shoes, axis=1) == np.sort(deck)).all()
+    # the rows are shuffled on their own
+    assert len({row.tobytes() for row in shoes}) == 50
+    assert np.array_equal(shuffled_decks(50, np.random.default_rng(3), deck), shoes)
+    assert not np.array_equal(shuffled_decks(50, np.random.default_rng(4), deck), shoes)
+    assert shuffled_decks(4, np.random.default_rng(3)).shape == (4, 52)
@@ -0,0 +1,107 @@
+"""
+Checks that playing a game one card at a time, or forking it part way through, plays the same game as play.
+"""
+
+import pytest
+
+import ers.engine
+from ers.engine import GameState, Rules
+from ers.sinks import RingSink
+from tests.test_batch import CYCLING_DEALS
+
+RULES = [Rules(players=players, decks=decks) for players in (2, 3, 4) for decks in (1, 2)]
+
+# returns the result and the events of a game played with play
+def played(seed, rules):
+    sink = RingSink(10 ** 6)
+    result = GameState(seed, rules, sink=sink).play()
+    return result, list(sink.events)
+
+# returns the index in events of the draw of the given card, counting from 1
+def draw_index(events, card):
+    draws = 0
+    for i, (event, fields) in enumerate(events):
+        if(event == "draw"):
+            draws += 1
+            if(draws == card):
+                return i
+    return len(events)
+
+# returns every field of a snapshot, to compare before and after using it
+def snapshot_fields(snapshot):
+    fields = dict(vars(snapshot))
+    fields["watch"] = dict(vars(snapshot.watch))
+    return fields
+
+@pytest.mark.parametrize("rules", RULES)
+def test_stepping_plays_the_same_game(rules):
+    for seed in range(20):
+        result, events = played(seed, rules)
+        sink = RingSink(10 ** 6)
+        game = GameState(seed, rules, sink=sink)
+        cards = 0
+        while game.step() is not None:
+            cards += 1
+        assert cards == result.turns
+        assert repr(game.result()) == repr(result)
+        assert list(sink.events) == events
+
+@pytest.mark.parametrize("rules", RULES)
+def test_fork_plays_the_rest_of_the_same_game(rules):
+    for seed in range(20):
+        result, events = played(seed, rules)
+        for cards in (0, 1, result.turns // 3, result.turns - 1):
+            game = GameState(seed, rules)
+            assert game.advance(cards) == cards
+            sink = RingSink(10 ** 6)
+            fork = game.fork(sink)
+            assert repr(fork.play()) == repr(result)
+            assert list(sink.events) == events[draw_index(events, cards + 1):]
+            # the game forked from is not changed by the fork and plays on the same way
+            assert repr(game.play()) == repr(result)
+
+def test_fork_leaves_its_snapshot_unchanged():
+    game = GameState(5)
+    game.advance(40)
+    snapshot = game.snapshot()
+    before = snapshot_fields(snapshot)
+    results = []
+    for seat in (None, 0, 1):
+        fork = snapshot.fork()
+        # a fork that has not played yet reads the snapshot rather than copying it
+        assert fork.snapshot() is snapshot
+        if(seat is not None):
+            fork.slap(fork.players[seat])
+        results.append(repr(fork.play()))
+        assert snapshot_fields(snapshot) == before
+    assert results[0] == repr(game.play())
+
+def test_slaps_keep_every_card():
+    for seed in range(50):
+        game = GameState(seed)
+        game.advance(seed)
+        for seat in (0, 1, 0):
+            game.slap(game.players[seat])
+            game.advance(7)
+            assert sum(game.hand_counts()) + len(game.pile.pile) == 52
+        assert game.play().winner in (1, 2)
+
+@pytest.mark.parametrize("players, slaps, deal", CYCLING_DEALS[:3])
+def test_infinite_game_fork_and_cycle_start(players, slaps, deal, monkeypatch):
+    rules = Rules(slap_rules=slaps, players=players)
+    result = GameState(rules=rules, deck=deal).play()
+    assert result.is_infinite()
+
+    fork = GameState(rules=rules, deck=deal)
+    fork.advance(result.turns // 2)
+    assert repr(fork.fork().play()) == repr(result)
+
+    # the start of the cycle is found once, however many times the result is asked for
+    calls = []
+    find_cycle_start = ers.engine.find_cycle_start
+    monkeypatch.setattr(ers.engine, "find_cycle_start", lambda *args: calls.append(args) or find_cycle_start(*args))
+    game = GameState(rules=rules, deck=deal)
+    game.advance()
+    assert repr(game.play()) == repr(result)
+    assert repr(game.result()) == repr(result)
+    assert len(calls) == 1
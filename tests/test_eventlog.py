@@ -0,0 +1,69 @@
+"""
+Checks that the scalar and batch engines log the same events, and the queries over them.
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from ers.cards import JOKER
+from ers.engine import DEFAULT_RULES, GameState
+from ers.eventlog import HEADER, RECORD, by_game, capture_sizes, chain_lengths, read_events
+from ers.sinks import RingSink
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SEEDS = range(5, 9)
+
+# runs a command line from the top of the repository
+def run(*args):
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True, capture_output=True)
+
+# returns the size of each pile captured and the face cards played in its chain, from the game's events
+def captures_and_chains(seed):
+    sink = RingSink(10 ** 6)
+    GameState(seed, sink=sink).play()
+    sizes = []
+    chains = []
+    pile = faces = 0
+    for event, fields in sink.events:
+        if(event == "draw" and fields["card"] != JOKER):
+            pile += 1
+            if(DEFAULT_RULES.penalty[fields["card"]]):
+                faces += 1
+        elif(event == "round"):
+            sizes.append(pile)
+            chains.append(faces)
+            pile = faces = 0
+    return sizes, chains
+
+def test_scalar_and_batch_logs_match(tmp_path):
+    scalar = str(tmp_path / "scalar.ers")
+    batch = str(tmp_path / "batch.ers")
+    for seed in SEEDS:
+        run("ERS simulate.py", "--seed", str(seed), "--events", scalar)
+    run("-m", "ers.batch", "--games", str(len(SEEDS)), "--seed", str(SEEDS[0]), "--events", batch)
+
+    events = read_events(scalar)
+    assert RECORD.size == events.dtype.itemsize == 16
+    assert os.path.getsize(scalar) == HEADER.size + 16 * len(events)
+    assert len(events) > 0
+    # the batch mixes its games together, but each game's events stay in order
+    assert np.array_equal(by_game(read_events(batch)), events)
+
+def test_queries_match_the_games(tmp_path):
+    path = str(tmp_path / "scalar.ers")
+    for seed in SEEDS:
+        run("ERS simulate.py", "--seed", str(seed), "--events", path)
+    events = read_events(path)
+    sizes = []
+    chains = []
+    for seed in SEEDS:
+        game_sizes, game_chains = captures_and_chains(seed)
+        assert len(game_sizes) == GameState(seed).play().captures
+        sizes += game_sizes
+        chains += game_chains
+    assert capture_sizes(events).tolist() == sizes
+    assert chain_lengths(events).tolist() == chains
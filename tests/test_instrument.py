@@ -0,0 +1,40 @@
+"""
+Checks that the opt-in counters count what the game reports, and change nothing in games without them.
+"""
+
+import pytest
+
+from ers.engine import GameState, Rules
+from ers.instrument import PHASES, GameCounters
+from ers.sinks import RingSink
+
+# the methods GameCounters.attach swaps on a game and its pile
+WRAPPED = ("draw", "capture", "do_face_card", "checkpoint")
+
+@pytest.mark.parametrize("timers", [False, True])
+@pytest.mark.parametrize("rules", [Rules(), Rules(slap_rules=["double"], players=3, decks=2)])
+def test_counts_match_the_result(rules, timers):
+    total = GameCounters(timers)
+    for seed in range(20):
+        counters = GameCounters(timers)
+        sink = RingSink(10 ** 6)
+        game = GameState(seed, rules, counters=counters, sink=sink)
+        result = game.play()
+        assert counters.games == 1
+        assert counters.draws == result.turns
+        assert counters.captures == sum(counters.chain_depths.values()) == result.captures
+        assert counters.cards_captured == sum(size * count for size, count in counters.capture_sizes.items())
+        # the game can end on a face card, which the counters count as a chain nobody got to pay
+        assert counters.chains - sum(event == "face_chain" for event, fields in sink.events) in (0, 1)
+        assert counters.slap_checks > 0
+        if(timers):
+            assert set(counters.phase_calls) == set(PHASES)
+            assert counters.phase_calls["draw"] == result.turns
+        total.merge(counters)
+
+        # the same game without counters gives the same result and keeps the class's own methods
+        plain = GameState(seed, rules)
+        assert repr(plain.play()) == repr(result)
+        assert not set(WRAPPED) & set(vars(plain))
+        assert "is_valid_slap" not in vars(plain.pile)
+    assert total.games == 20
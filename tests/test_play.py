@@ -0,0 +1,89 @@
+"""
+Drives the interactive game with scripted keys, and checks the key backends.
+"""
+
+import asyncio
+import itertools
+import os
+from collections import deque
+
+from ers.keys import ScriptedKeys, TerminalKeys
+from ers.play import InteractiveGame
+from ers.sinks import RingSink
+from ers.timers import IGNORED_KEPT, Deadlines, Pacing
+
+# returns a game with no pauses that plays the given (delay, key) script, and moves for a player after timeout seconds
+def scripted_game(seed, script, timeout=0):
+    return InteractiveGame(seed, Pacing(0, 0, timeout), ScriptedKeys(script), RingSink(10 ** 6))
+
+# returns the number of cards held by both players and the pile
+def cards_in_play(game):
+    return len(game.player1.hand) + len(game.player2.hand) + len(game.pile.pile)
+
+def test_timeouts_play_a_whole_game(capsys):
+    game = scripted_game(1, [])
+    winner = asyncio.run(game.play())
+    assert winner in (1, 2)
+    assert cards_in_play(game) == 52
+    assert game.events.events[-1] == ("winner", {"player": winner})
+
+def test_scripted_keys_draw_slap_and_collect(capsys):
+    # both players draw, slap and collect as fast as the script allows, and time out when it is not their key
+    script = ((0.0005, key) for key in itertools.cycle("qowpqo"))
+    game = scripted_game(4, script, 0.002)
+    winner = asyncio.run(game.play())
+    assert winner in (1, 2)
+    assert cards_in_play(game) == 52
+    events = {event for event, fields in game.events.events}
+    assert {"burn", "collect", "round"} <= events
+    stats = game.reactions.to_dict().values()
+    assert sum(player["good_slaps"] + player["bad_slaps"] for player in stats) > 0
+    assert sum(player["input_latency"]["count"] for player in stats) > 0
+
+def test_slap_wins_a_slappable_pile(capsys):
+    game = scripted_game(0, [])
+    hand = len(game.player2.hand)
+    # two 2s on top of each other make a double
+    game.pile.pile = deque([4, 5, 40])
+    assert game.slap(game.player2)
+    assert len(game.player2.hand) == hand + 3 and not game.pile.pile
+    # nothing to slap now, so the next slap burns a card
+    assert not game.slap(game.player2)
+    assert len(game.player2.hand) == hand + 2 and len(game.pile.pile) == 1
+
+def test_terminal_keys_read_a_file(tmp_path):
+    path = tmp_path / "keys.txt"
+    path.write_text("qWop")
+
+    async def read():
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            async with TerminalKeys(fd) as keys:
+                return [(await asyncio.wait_for(keys.get(), 5)).key for _ in range(4)]
+        finally:
+            os.close(fd)
+    assert asyncio.run(read()) == ["q", "w", "o", "p"]
+
+def test_terminal_keys_open_dev_null():
+    async def read():
+        fd = os.open(os.devnull, os.O_RDONLY)
+        try:
+            async with TerminalKeys(fd) as keys:
+                await asyncio.sleep(0.01)
+                return keys.queue.empty()
+        finally:
+            os.close(fd)
+    assert asyncio.run(read())
+
+def test_keys_during_a_pause_are_counted_not_all_kept():
+    async def press():
+        deadlines = Deadlines()
+        async with ScriptedKeys([]) as keys:
+            deadlines.lock(0.05)
+            for _ in range(IGNORED_KEPT * 3):
+                keys.put("q")
+            assert await deadlines.next_key(keys, 0) is None
+        return deadlines
+    deadlines = asyncio.run(press())
+    assert deadlines.ignored_count == IGNORED_KEPT * 3
+    assert len(deadlines.ignored) == IGNORED_KEPT
@@ -0,0 +1,138 @@
+"""
+Checks the server's lobby, how it treats a player who stops reading, and that its games follow the engine.
+"""
+
+import asyncio
+
+import pytest
+
+import ers.server
+from ers.engine import Rules, run_game
+from ers.loadgen import run_load
+from ers.server import GameServer, Match, start_server
+
+# runs the coroutine function with a server listening on a Unix socket, and returns what it returns
+def with_server(tmp_path, test):
+    async def run():
+        server = GameServer()
+        listener = await start_server(server, unix_path=str(tmp_path / "ers.sock"))
+        async with listener:
+            return await test(server, str(tmp_path / "ers.sock"))
+    return asyncio.run(asyncio.wait_for(run(), 30))
+
+# returns the next line the server sent, without its newline
+async def read_line(reader):
+    return (await reader.readline()).decode().strip()
+
+def test_joining_twice_does_not_play_yourself(tmp_path):
+    async def test(server, path):
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b"join\njoin\n")
+        lines = [await read_line(reader), await read_line(reader)]
+        assert lines == ["wait", "error already waiting"]
+        assert len(server.waiting) == 1 and server.started == 0
+
+        other_reader, other_writer = await asyncio.open_unix_connection(path)
+        other_writer.write(b"join\n")
+        assert await read_line(other_reader) == "wait"
+        assert (await read_line(other_reader)).startswith("start ")
+        assert (await read_line(reader)).startswith("start ")
+        assert server.started == 1 and not server.waiting
+        writer.close()
+        other_writer.close()
+    with_server(tmp_path, test)
+
+def test_player_who_stops_reading_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(ers.server, "MAX_UNREAD", 1 << 16)
+
+    async def test(server, path):
+        # this player joins and never reads again
+        _, idle_writer = await asyncio.open_unix_connection(path)
+        idle_writer.write(b"join\n")
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b"join\n")
+        while not (await read_line(reader)).startswith("start "):
+            pass
+
+        # every slap is sent to both players, until the idle player has too much unread and is dropped
+        async def spam():
+            while True:
+                writer.write(b"slap\n" * 10)
+                await asyncio.sleep(0)
+        spammer = asyncio.create_task(spam())
+        while (await read_line(reader)) != "over 0":
+            pass
+        spammer.cancel()
+        assert server.abandoned == 1
+        writer.close()
+        idle_writer.close()
+    with_server(tmp_path, test)
+
+class LineCollector:
+    """
+    This class stands in for a connected player, keeping the lines they are sent.
+
+    Attributes:
+        lines (list): The lines sent, in order.
+    """
+
+    def __init__(self):
+        """
+        The constructor for LineCollector class.
+        """
+
+        self.lines = []
+
+    def send(self, line):
+        """
+        This function keeps a line.
+
+        Parameters:
+            line (str): The line.
+        """
+
+        self.lines.append(line)
+
+@pytest.mark.parametrize("players", [2, 3])
+def test_match_plays_the_same_game_as_run_game(players):
+    rules = Rules(players=players)
+    server = GameServer(rules)
+    for seed in range(30):
+        result = run_game(seed, rules)
+        if(result.is_infinite()):
+            continue
+        clients = [LineCollector() for _ in range(players)]
+        match = Match(server, seed, clients, rules)
+        match.start()
+        while not match.over:
+            match.draw(match.turn.player - 1)
+        lines = clients[0].lines
+        assert lines[-1] == f"over {result.winner}"
+        assert sum(line.startswith("card ") for line in lines) == result.turns
+        assert match.game.captures == result.captures
+
+@pytest.mark.parametrize("players", [2, 3])
+def test_load_generator_plays_whole_games(tmp_path, players):
+    rules = Rules(players=players)
+    games = 30
+    ended = []
+
+    async def run():
+        server = GameServer(rules)
+        finished = server.finished
+        server.finished = lambda match: ended.append(match) or finished(match)
+        path = str(tmp_path / "ers.sock")
+        listener = await start_server(server, unix_path=path)
+        async with listener:
+            result = await run_load(games, 6, rules, unix_path=path, false_slap_rate=0.05)
+        return server, result
+
+    server, (latency, played, elapsed) = asyncio.run(asyncio.wait_for(run(), 60))
+    assert played >= games
+    assert server.completed == len(ended) >= played
+    for match in ended:
+        game = match.game
+        assert sum(game.hand_counts()) + len(game.pile.pile) == 52
+        assert match.game.result().winner in range(1, players + 1)
+    assert latency.count > 0
+    assert 0 < latency.percentile(50) <= latency.percentile(99)
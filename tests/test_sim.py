@@ -0,0 +1,25 @@
+"""
+Checks the process pool simulation's summaries and command line.
+"""
+
+import pytest
+
+from ers.sim import SimSummary, main, simulate
+
+def test_empty_summary():
+    summary = simulate(0, workers=1)
+    assert summary.games == 0
+    assert summary.mean_turns() == 0
+    assert summary.turn_percentile(50) == summary.turn_percentile(99) == 0
+    assert SimSummary(3).turn_percentile(50) == 0
+
+def test_games_must_be_positive(capsys):
+    with pytest.raises(SystemExit):
+        main(["--games", "0", "--workers", "1"])
+    assert "--games must be at least 1" in capsys.readouterr().err
+
+def test_small_run_prints_every_line(capsys):
+    main(["--games", "5", "--workers", "1"])
+    out = capsys.readouterr().out
+    assert "games: 5" in out
+    assert "games/sec" in out
@@ -0,0 +1,53 @@
+"""
+Checks that games print exactly what they printed before they sent their output to sinks, and that the other sinks
+get the same events.
+"""
+
+import io
+import json
+import os
+
+from ers.bots import Bot, SlapGame
+from ers.engine import GameState
+from ers.sinks import JsonLinesSink, NullSink, RingSink, TextSink
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# returns the text of a file saved from "ERS simulate.py" before the sinks were added
+def saved_output(name):
+    with open(os.path.join(DATA, name)) as file:
+        return file.read()
+
+def test_game_prints_what_it_printed_before(capsys):
+    GameState(2, verbose=True).play()
+    assert capsys.readouterr().out == saved_output("game_seed2.txt")
+
+def test_bot_game_prints_what_it_printed_before(capsys):
+    SlapGame([Bot(), Bot()], 1, verbose=True).play()
+    assert capsys.readouterr().out == saved_output("bot_game_seed1.txt")
+
+def test_ring_and_json_sinks_get_the_same_events():
+    ring = RingSink(100000)
+    GameState(2, sink=ring).play()
+    file = io.StringIO()
+    GameState(2, sink=JsonLinesSink(file)).play()
+    events = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert [event.pop("event") for event in events] == [event for event, fields in ring.events]
+    assert events == [fields for event, fields in ring.events]
+    assert ring.text() + "\n" == saved_output("game_seed2.txt")
+
+def test_null_sink_is_no_sink():
+    game = GameState(2, sink=NullSink())
+    assert game.sink is None
+    assert game.play().winner == GameState(2).play().winner
+
+def test_hand_counts_are_spaced_like_the_games():
+    simulator = io.StringIO()
+    interactive = io.StringIO()
+    for sink in (TextSink(simulator), TextSink(interactive, padded=True)):
+        sink.emit("start", counts=[26, 26])
+        sink.emit("round", player=1, counts=[30, 22])
+        sink.close()
+    start = "Start!\nPlayer 1 # of cards:  26\nPlayer 2 # of cards:  26\nPlayer 1 won the round!\n"
+    assert simulator.getvalue() == start + "Player 1 # of cards:  30\nPlayer 2 # of cards: 22\n\n"
+    assert interactive.getvalue() == start + "Player 1 # of cards:   30\nPlayer 2 # of cards:   22\n\n"
@@ -0,0 +1,48 @@
+"""
+Checks the compiled slap tables against the slap rules checked one at a time.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from ers.cards import DECK_SIZE, KING, QUEEN, RANK
+from ers.engine import Pile
+from ers.slaps import SLAP_RULES, compile_slaps
+
+# the default rules written out the way Pile.is_valid_slap checked them before the table, index 0 the top card
+def old_is_valid_slap(pile):
+    ranks = [RANK[card] for card in pile]
+    if(len(ranks) >= 2):
+        if(ranks[0] == ranks[1] or {ranks[0], ranks[1]} == {KING, QUEEN}):
+            return True
+    if(len(ranks) >= 3):
+        if(ranks[0] == ranks[2]):
+            return True
+    return False
+
+# returns every pile of up to four cards with one card of each rank, then random longer piles
+def sample_piles():
+    rng = random.Random(0)
+    piles = []
+    for length in range(5):
+        piles += [list(ranks) for ranks in itertools.product(range(0, DECK_SIZE, 4), repeat=length)]
+    for _ in range(2000):
+        piles.append([rng.randrange(DECK_SIZE) for _ in range(rng.randrange(5, 30))])
+    return piles
+
+PILES = sample_piles()
+
+def test_default_table_matches_old_checks():
+    slaps = compile_slaps()
+    for pile in PILES:
+        assert Pile(pile, slaps).is_valid_slap() == old_is_valid_slap(pile), pile
+
+@pytest.mark.parametrize("names", [(name,) for name in sorted(SLAP_RULES)] + [tuple(sorted(SLAP_RULES))])
+def test_table_matches_rules(names):
+    slaps = compile_slaps(names)
+    for pile in PILES:
+        ranks = Pile(pile, slaps).top_ranks()
+        expected = any(SLAP_RULES[name][0](*ranks) for name in names)
+        assert Pile(pile, slaps).is_valid_slap() == expected, pile
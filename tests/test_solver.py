@@ -0,0 +1,23 @@
+"""
+Checks the exact solver against the scalar and batch engines.
+"""
+
+import pytest
+
+from ers.engine import Rules
+from ers.solver import CANONICAL, INFINITE, Solver, count_deals, distinct_deals, reduced_deck, solve_deals, validate
+from tests.test_batch import CYCLING_DEALS
+
+def test_every_deal_of_a_small_deck_matches_the_engines():
+    rules = Rules(slap_rules=["double"], players=4)
+    deck = bytes(reduced_deck(["Jack", "2", "3"], 3)).translate(CANONICAL)
+    deals = list(distinct_deals(deck))
+    assert len(deals) == count_deals(deck) == 1680
+    solver, wins, infinite = solve_deals(deals, rules)
+    assert infinite > 0
+    assert sum(wins) + infinite == len(deals)
+    assert validate(deals, rules, solver) == []
+
+@pytest.mark.parametrize("players, slaps, deal", CYCLING_DEALS)
+def test_known_infinite_deals(players, slaps, deal):
+    assert Solver(Rules(slap_rules=slaps, players=players)).solve(bytes(deal)) == INFINITE
@@ -0,0 +1,46 @@
+"""
+Checks the streaming statistics against NumPy over the same games.
+"""
+
+import numpy as np
+import pytest
+
+from ers.engine import Rules
+from ers.stream import GameStats, RunningStats, iter_games, summarize
+
+@pytest.mark.parametrize("players", [2, 3])
+def test_running_stats_match_numpy(players):
+    rules = Rules(slap_rules=["double"], players=players)
+    records = list(iter_games(500, 11, rules))
+    turns = np.array([record.turns for record in records])
+    captures = np.array([record.captures for record in records])
+
+    whole = summarize(records, players)
+    # the same games in two uneven streams, merged
+    merged = summarize(records[:137], players)
+    merged.merge(summarize(records[137:], players))
+    for stats in (whole, merged):
+        assert stats.games == len(records)
+        assert stats.turns.count == stats.captures.count == len(records)
+        assert stats.turns.mean == pytest.approx(np.mean(turns))
+        assert stats.turns.variance() == pytest.approx(np.var(turns, ddof=1))
+        assert stats.captures.mean == pytest.approx(np.mean(captures))
+        assert stats.captures.variance() == pytest.approx(np.var(captures, ddof=1))
+        assert (stats.turns.min, stats.turns.max) == (turns.min(), turns.max())
+        assert stats.wins == np.bincount([record.winner for record in records], minlength=players + 1).tolist()
+        assert sum(stats.wins) == stats.games
+        assert sum(stats.win_rate(player) for player in range(players + 1)) == pytest.approx(1)
+        assert stats.infinite == sum(record.is_infinite() for record in records)
+
+def test_merging_empty_stats_changes_nothing():
+    stats = RunningStats()
+    for value in (3, 5, 10):
+        stats.add(value)
+    stats.merge(RunningStats())
+    empty = RunningStats()
+    empty.merge(stats)
+    for merged in (stats, empty):
+        assert (merged.count, merged.min, merged.max) == (3, 3, 10)
+        assert merged.mean == pytest.approx(6)
+        assert merged.variance() == pytest.approx(np.var([3, 5, 10], ddof=1))
+    assert GameStats().win_rate(1) == 0
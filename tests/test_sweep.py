@@ -0,0 +1,71 @@
+"""
+Checks sweep points, and that stored results always match the number of games the sweep asks for.
+"""
+
+import pytest
+
+from ers.sweep import DEFAULT_POINT, ResultStore, chunk_sizes, describe, expand, point_key, run_sweep
+
+# returns the number of games merged for the sweep's only point, and the chunks left out
+def stored_games(sweep, store):
+    point = expand(sweep)[0]
+    key = point_key(point, sweep["seed"], sweep["chunk_size"])
+    summary, left_out = store.summary(key, point["players"], chunk_sizes(sweep["games"], sweep["chunk_size"]))
+    return summary.games, left_out
+
+def test_expand_does_not_change_the_defaults():
+    before = repr(DEFAULT_POINT)
+    points = expand({})
+    points[0]["players"] = 4
+    expand({"grid": {"slaps": [["sandwich", "double"]]}})
+    assert repr(DEFAULT_POINT) == before
+
+def test_describe_default_point():
+    assert describe(expand({})[0]) == "default rules"
+    assert describe(expand({"base": {"slaps": ["marriage", "double", "sandwich"]}})[0]) == "default rules"
+    assert describe(expand({"base": {"players": 3}})[0]) == "players=3"
+
+def test_fewer_games_never_merges_a_bigger_chunk(tmp_path):
+    store = ResultStore(str(tmp_path / "sweep.db"))
+    sweep = {"games": 250, "seed": 0, "chunk_size": 100}
+    assert run_sweep(sweep, store, workers=1, progress=False) == 3
+    assert stored_games(sweep, store) == (250, 0)
+
+    # the sweep's second chunk is now 20 games, so the stored 100 game chunk is played again at that size
+    fewer = dict(sweep, games=120)
+    assert stored_games(fewer, store) == (100, 1)
+    assert run_sweep(fewer, store, workers=1, progress=False) == 1
+    assert stored_games(fewer, store) == (120, 0)
+
+    # and back again, only the replaced chunk is played
+    assert stored_games(sweep, store) == (150, 1)
+    assert run_sweep(sweep, store, workers=1, progress=False) == 1
+    assert stored_games(sweep, store) == (250, 0)
+    store.close()
+
+def test_list_settings_by_seat():
+    sweep = {"base": {"bots": [{}, {"reaction": 0.4}]}, "grid": {"bots.1.reaction": [0.2, 0.3], "penalties.10": [1]}}
+    points = expand(sweep)
+    assert [point["bots"] for point in points] == [[{}, {"reaction": 0.2}], [{}, {"reaction": 0.3}]]
+    assert points[0]["penalties"]["10"] == 1
+    assert describe(points[0]).startswith('penalties={"Ace": 4')
+
+@pytest.mark.parametrize("sweep, message", [
+    ({"grid": {"playrs": [2, 3]}}, "unknown setting playrs"),
+    ({"grid": {"penalties.Ace.count": [2]}}, "unknown setting penalties.Ace.count"),
+    ({"points": [{"penalties.Eleven": 2}]}, "unknown setting penalties.Eleven"),
+    ({"grid": {"bots.0.reaction": [0.2]}}, "bots is not set"),
+    ({"base": {"bots": [{}, {}]}, "grid": {"bots.2.reaction": [0.2]}}, "bots has 2 entries"),
+    ({"base": {"bots": [{}, {}]}, "points": [{"bots.0.reacton": 0.2}]}, "unknown setting bots.0.reacton"),
+    ({"grid": {"players": []}}, "grid setting players"),
+    ({"base": {"bots": [{}, {}]}, "grid": {"bots.0.reaction": [0.2, 0]}}, "reaction must be"),
+    ({"base": {"bots": [{}]}}, "1 bots for 2 players"),
+])
+def test_bad_settings_are_reported_before_playing(sweep, message, tmp_path):
+    with pytest.raises(ValueError, match=message):
+        expand(sweep)
+    store = ResultStore(str(tmp_path / "sweep.db"))
+    with pytest.raises(ValueError, match=message):
+        run_sweep(dict(sweep, games=10), store, workers=1, progress=False)
+    assert store.connection.execute("SELECT COUNT(*) FROM chunks").fetchone() == (0,)
+    store.close()